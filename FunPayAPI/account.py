@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Literal, Any, Optional, IO
+from typing import TYPE_CHECKING, Literal, Any, Optional, IO, Generator, TypeVar
 
 import FunPayAPI.common.enums
 from FunPayAPI.common.utils import parse_currency, RegularExpressions
@@ -10,20 +10,251 @@ if TYPE_CHECKING:
 
 from requests_toolbelt import MultipartEncoder
 from bs4 import BeautifulSoup
+from lxml import etree
+import lxml.html
 from datetime import datetime, timedelta
+import concurrent.futures
+import http.cookiejar
 import requests
+import requests.adapters
 import logging
 import random
 import string
 import json
+import copy
+import os
+import threading
 import time
 import re
 
 from . import types
 from .common import exceptions, utils, enums
+from .common.image_cache import ImageCache
 
 logger = logging.getLogger("FunPayAPI.account")
 PRIVATE_CHAT_ID_RE = re.compile(r"users-\d+-\d+$")
+_T = TypeVar("_T")
+
+
+class _MethodCall:
+    """
+    Отложенный вызов :meth:`FunPayAPI.account.Account.method` (аргументы те же).
+    Сценарии запросов (методы Account._*_flow) возвращают его через yield и получают обратно объект ответа.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+
+_Flow = Generator[_MethodCall, requests.Response, _T]
+"""Сценарий запросов: генератор, который отдает :class:`_MethodCall` и возвращает результат метода."""
+
+
+def _xpath_class(tag: str, class_: str, first: bool = False) -> etree.XPath:
+    """
+    Компилирует XPath, находящий потомков с тегом `tag` и CSS-классом `class_` (аналог BeautifulSoup.find_all).
+
+    :param first: искать только первого потомка (аналог BeautifulSoup.find).
+    """
+    path = f'.//{tag}[contains(concat(" ", normalize-space(@class), " "), " {class_} ")]'
+    return etree.XPath(f"({path})[1]" if first else path)
+
+
+_LOTS_XPATHS = {
+    "username": _xpath_class("div", "user-link-name", True),
+    "offers": _xpath_class("a", "tc-item"),
+    "description": _xpath_class("div", "tc-desc-text", True),
+    "server": _xpath_class("div", "tc-server", True),
+    "price": _xpath_class("div", "tc-price", True),
+    "price_div": etree.XPath("(.//div)[1]"),
+    "unit": _xpath_class("span", "unit", True),
+    "user": _xpath_class("div", "tc-user", True),
+    "amount": _xpath_class("div", "tc-amount", True),
+    "seller_body": _xpath_class("div", "media-body", True),
+    "seller_name": _xpath_class("div", "media-user-name", True),
+    "stars": _xpath_class("div", "rating-stars", True),
+    "star": _xpath_class("i", "fas"),
+    "reviews": _xpath_class("div", "media-user-reviews", True),
+    "seller_link": _xpath_class("span", "pseudo-a", True),
+}
+"""Скомпилированные XPath'ы для разбора таблицы лотов подкатегории через lxml."""
+
+
+_MESSAGE_XPATHS = {
+    "author": _xpath_class("div", "media-user-name", True),
+    "badge": etree.XPath('(.//span[@class="chat-msg-author-label label label-success"])[1]'),
+    "default_label": etree.XPath('(.//span[@class="chat-msg-author-label label label-default"])[1]'),
+    "author_link": etree.XPath("(.//a)[1]"),
+    "image_link": _xpath_class("a", "chat-img-link", True),
+    "image": etree.XPath("(.//img)[1]"),
+    "alert": etree.XPath('(.//div[@role="alert"])[1]'),
+    "text": _xpath_class("div", "chat-msg-text", True),
+    "users": etree.XPath('.//a[contains(@href, "/users/")]'),
+}
+"""Скомпилированные XPath'ы для разбора сообщений чата через lxml."""
+
+_SALES_XPATHS = {
+    "username": _xpath_class("div", "user-link-name", True),
+    "continue": etree.XPath('(.//input[@type="hidden"][@name="continue"])[1]'),
+    "body": etree.XPath("(//body)[1]"),
+    "games": etree.XPath('(.//select[@name="game"])[1]'),
+    "game_options": etree.XPath('.//option[@value!=""]'),
+    "orders": _xpath_class("a", "tc-item"),
+    "order_id": _xpath_class("div", "tc-order", True),
+}
+"""Скомпилированные XPath'ы для разбора страницы продаж через lxml."""
+
+_OFFER_LIST_MORE_CLASSES = frozenset({"offer-list-more", "show-more"})
+"""CSS-классы кнопки / ссылки "Показать еще" под списком лотов подкатегории на странице пользователя."""
+
+
+def _lxml_text(elements: list) -> str | None:
+    """Текст первого из найденных элементов (аналог BeautifulSoup.Tag.text) или None."""
+    return "".join(elements[0].itertext()) if elements else None
+
+
+def _lxml_html(element) -> str:
+    """HTML-код элемента lxml."""
+    return etree.tostring(element, encoding="unicode", method="html", with_tail=False)
+
+
+_Catalog = tuple[list[types.Category], dict[int, types.Category], list[types.SubCategory],
+                 dict[types.SubCategoryTypes, dict[int, types.SubCategory]]]
+"""Каталог FunPay: (категории, {ID: категория}, подкатегории, {тип подкатегории: {ID: подкатегория}})."""
+
+
+def _build_catalog(categories: list[types.Category]) -> _Catalog:
+    """
+    Строит каталог из списка категорий (подкатегории берутся из категорий).
+    """
+    subcategories = sorted((j for i in categories for j in i.get_subcategories()), key=lambda x: x.position)
+    sorted_subcategories = {types.SubCategoryTypes.COMMON: {}, types.SubCategoryTypes.CURRENCY: {}}
+    for i in subcategories:
+        sorted_subcategories[i.type][i.id] = i
+    return categories, {i.id: i for i in categories}, subcategories, sorted_subcategories
+
+
+def _parse_catalog(html: str) -> _Catalog:
+    """
+    Парсит категории и подкатегории с основной страницы FunPay.
+
+    :param html: HTML страница.
+    """
+    parser = BeautifulSoup(html, "lxml")
+    games_table = parser.find_all("div", {"class": "promo-game-list"})
+    if not games_table:
+        return _build_catalog([])
+
+    games_table = games_table[1] if len(games_table) > 1 else games_table[0]
+    games_divs = games_table.find_all("div", {"class": "promo-game-item"})
+    categories = []
+    game_position = 0
+    subcategory_position = 0
+    for i in games_divs:
+        gid = int(i.find("div", {"class": "game-title"}).get("data-id"))
+        gname = i.find("a").text
+        regional_games = {
+            gid: types.Category(gid, gname, position=game_position)
+        }
+        game_position += 1
+        if regional_divs := i.find("div", {"role": "group"}):
+            for btn in regional_divs.find_all("button"):
+                regional_game_id = int(btn["data-id"])
+                regional_games[regional_game_id] = types.Category(regional_game_id, f"{gname} ({btn.text})",
+                                                                  position=game_position)
+                game_position += 1
+
+        subcategories_divs = i.find_all("ul", {"class": "list-inline"})
+        for j in subcategories_divs:
+            j_game_id = int(j["data-id"])
+            subcategories = j.find_all("li")
+            for k in subcategories:
+                a = k.find("a")
+                name, link = a.text, a["href"]
+                stype = types.SubCategoryTypes.CURRENCY if "chips" in link else types.SubCategoryTypes.COMMON
+                sid = int(link.split("/")[-2])
+                sobj = types.SubCategory(sid, name, stype, regional_games[j_game_id], subcategory_position)
+                subcategory_position += 1
+                regional_games[j_game_id].add_subcategory(sobj)
+
+        categories.extend(regional_games.values())
+    return _build_catalog(categories)
+
+
+class _CatalogCache:
+    """
+    Общий для всех аккаунтов процесса кэш каталога категорий и подкатегорий FunPay (по языкам) с сохранением
+    на диск: новым аккаунтам не нужно заново парсить список игр с основной страницы.
+    """
+
+    def __init__(self):
+        self.__catalogs: dict[str, tuple[float, _Catalog]] = {}
+        self.__lock = threading.Lock()
+
+    def get(self, locale: str, html: str | None, path: str | None, ttl: int | float) -> _Catalog:
+        """
+        Возвращает каталог: из памяти, со снимка на диске или (если оба устарели) парсит его из `html`.
+
+        :param locale: язык каталога.
+        :param html: HTML основной страницы FunPay (на языке `locale`).
+        :param path: путь к снимку на диске (None - не сохранять на диск).
+        :param ttl: время жизни каталога в секундах.
+        """
+        with self.__lock:
+            cached = self.__catalogs.get(locale)
+            if cached and time.time() - cached[0] < ttl:
+                return cached[1]
+            if path and (snapshot := self.__load(path, locale)) and time.time() - snapshot[0] < ttl:
+                self.__catalogs[locale] = snapshot
+                return snapshot[1]
+            if html is None:
+                return cached[1] if cached else _build_catalog([])
+
+            catalog = _parse_catalog(html)
+            self.__catalogs[locale] = (time.time(), catalog)
+            if path:
+                self.__dump(path, locale, catalog)
+            return catalog
+
+    @staticmethod
+    def __load(path: str, locale: str) -> tuple[float, _Catalog] | None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)[locale]
+        except (OSError, ValueError, KeyError):
+            return None
+        categories = []
+        for cid, name, position, subcategories in snapshot["games"]:
+            category = types.Category(cid, name, position=position)
+            for sid, sname, stype, sposition in subcategories:
+                category.add_subcategory(types.SubCategory(sid, sname, types.SubCategoryTypes(stype), category,
+                                                           sposition))
+            categories.append(category)
+        return snapshot["time"], _build_catalog(categories)
+
+    @staticmethod
+    def __dump(path: str, locale: str, catalog: _Catalog):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshots = json.load(f)
+        except (OSError, ValueError):
+            snapshots = {}
+        snapshots[locale] = {
+            "time": time.time(),
+            "games": [[i.id, i.name, i.position, [[j.id, j.name, j.type.value, j.position]
+                                                  for j in i.get_subcategories()]] for i in catalog[0]]
+        }
+        try:
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(snapshots, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(f"{path}.tmp", path)
+        except OSError:
+            logger.warning(f"Не удалось сохранить каталог категорий в {path}.")
+            logger.debug("TRACEBACK", exc_info=True)
+
+
+_catalog_cache = _CatalogCache()
 
 
 class Account:
@@ -44,11 +275,47 @@ class Account:
 
     :param locale: текущий язык аккаунта, опционально.
     :type locale: :obj:`Literal["ru", "en", "uk"]` or :obj:`None`
+
+    :param pool_connections: кол-во пулов соединений (по одному на хост), которые хранит сессия.
+    :type pool_connections: :obj:`int`, опционально
+
+    :param pool_maxsize: макс. кол-во keep-alive соединений с одним хостом.
+    :type pool_maxsize: :obj:`int`, опционально
+
+    :param pool_idle_timeout: через сколько секунд простоя сбрасывать открытые соединения (0 - не сбрасывать).
+    :type pool_idle_timeout: :obj:`int` or :obj:`float`, опционально
+
+    :param rate_limits: лимиты частоты запросов по типам запросов ({тип: (запросов в секунду, burst)}),
+        не указанные типы берутся из :attr:`FunPayAPI.common.utils.RateLimiter.DEFAULT_LIMITS`.
+    :type rate_limits: :obj:`dict` {:class:`FunPayAPI.common.enums.RequestTypes`: :obj:`tuple`} or :obj:`None`,
+        опционально
+    """
+
+    categories_cache_path: str | None = None
+    """
+    Путь к файлу, в котором сохраняется каталог категорий и подкатегорий (общий для всех аккаунтов процесса).
+    None - хранить каталог только в памяти процесса.
+    """
+    categories_cache_ttl: int | float = 24 * 60 * 60
+    """Время жизни каталога категорий и подкатегорий (в секундах)."""
+    chats_memory_limit: int | None = 10000
+    """
+    Сколько последних обновленных чатов помнит аккаунт (сохраненные чаты и ID собеседников).
+    Чаты, которые дольше всех не обновлялись, забываются (None - помнить все).
+    """
+    image_cache: ImageCache | None = None
+    """
+    Постоянный кэш ID выгруженных изображений лотов. Если задан, одинаковые по содержимому изображения лотов
+    выгружаются аккаунтом один раз (см. :meth:`upload_image`).
     """
+    lot_form_template_ttl: int | float = 60 * 60
+    """Время жизни шаблонов форм создания лотов (в секундах), см. :meth:`get_lot_form_template`."""
 
     def __init__(self, golden_key: str, user_agent: str | None = None,
                  requests_timeout: int | float = 10, proxy: Optional[dict] = None,
-                 locale: Literal["ru", "en", "uk"] | None = None):
+                 locale: Literal["ru", "en", "uk"] | None = None, pool_connections: int = 10,
+                 pool_maxsize: int = 10, pool_idle_timeout: int | float = 60,
+                 rate_limits: dict[enums.RequestTypes, tuple[float, float]] | None = None):
         self.golden_key: str = golden_key
         """Токен (golden_key) аккаунта."""
         self.user_agent: str | None = user_agent
@@ -57,6 +324,22 @@ class Account:
         """Тайм-аут ожидания ответа на запросы."""
         self.proxy = proxy
         """Прокси"""
+        self.session: requests.Session = requests.Session()
+        """HTTP-сессия с пулом keep-alive соединений, общая для всех запросов аккаунта."""
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # куки передаются вручную в заголовках, поэтому не даем сессии копить их у себя
+        self.session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        self.pool_idle_timeout: int | float = pool_idle_timeout
+        """Через сколько секунд простоя сбрасывать открытые соединения (0 - не сбрасывать)."""
+        self.__last_request_time: float = 0
+        """Время последнего запроса (для сброса простаивающих соединений)."""
+        self.rate_limiter: utils.RateLimiter | None = utils.RateLimiter(rate_limits)
+        """Ограничитель частоты запросов (None - не ограничивать)."""
+        self.__in_flight: dict[tuple, concurrent.futures.Future] = {}
+        """Выполняемые в данный момент сценарии запросов, результат которых можно разделить (см. _execute_shared)."""
+        self.__in_flight_lock = threading.Lock()
         self.html: str | None = None
         """HTML основной страницы FunPay."""
         self.app_data: dict | None = None
@@ -89,6 +372,12 @@ class Account:
         """Язык по умолчанию для Account.get_order()"""
         self.__lots_parse_locale: Literal["ru", "en", "uk"] | None = None
         """Язык по умолчанию для Account.get_subcategory_public_lots()"""
+        self.lots_parser: Literal["lxml", "bs4"] = "lxml"
+        """
+        Парсер таблицы лотов в Account.get_subcategory_public_lots(): "lxml" (XPath по дереву lxml, в несколько раз
+        быстрее) или "bs4" (BeautifulSoup). Результаты одинаковые, отличается только форматирование HTML-кода
+        в LotShortcut.html и SellerShortcut.html.
+        """
         self.__subcategories_parse_locale: Literal["ru", "en", "uk"] | None = None
         """Язык по для получения названий разделов."""
         self.__set_locale: Literal["ru", "en", "uk"] | None = None
@@ -104,24 +393,24 @@ class Account:
         self.last_update: int | None = None
         """Последнее время обновления аккаунта."""
 
-        self.interlocutor_ids: dict[int, int] = {}
+        self.interlocutor_ids: dict[int, int] = utils.LRUDict(self.chats_memory_limit)
         """{id чата: id собеседника}"""
 
         self.__initiated: bool = False
 
-        self.__saved_chats: dict[int, types.ChatShortcut] = {}
+        self.__saved_chats: dict[int, types.ChatShortcut] = utils.LRUDict(self.chats_memory_limit)
+        self.__sales_rows: dict[str, tuple[int, types.OrderShortcut]] = utils.LRUDict(1000)
+        """Разобранные строки страницы продаж ({ID заказа: (хэш HTML строки, заказ)}), см. _get_sales_flow."""
+        self.__lot_form_templates: dict[int, tuple[float, types.LotFormTemplate]] = {}
+        """Шаблоны форм создания лотов ({ID подкатегории: (время получения, шаблон)})."""
         self.runner: Runner | None = None
         """Объект Runner'а."""
         self._logout_link: str | None = None
         """Ссылка для выхода с аккаунта"""
-        self.__categories: list[types.Category] = []
-        self.__sorted_categories: dict[int, types.Category] = {}
-
-        self.__subcategories: list[types.SubCategory] = []
-        self.__sorted_subcategories: dict[types.SubCategoryTypes, dict[int, types.SubCategory]] = {
-            types.SubCategoryTypes.COMMON: {},
-            types.SubCategoryTypes.CURRENCY: {}
-        }
+        self.__catalog: _Catalog | None = None
+        """Каталог категорий и подкатегорий (загружается при первом обращении, см. __get_catalog)."""
+        self.__catalog_locale: str | None = None
+        """Язык основной страницы, полученной при первом Account.get() (язык каталога)."""
 
         self.__bot_character = "⁡"
         """Если сообщение начинается с этого символа, значит оно отправлено ботом."""
@@ -130,7 +419,8 @@ class Account:
 
     def method(self, request_method: Literal["post", "get"], api_method: str, headers: dict, payload: Any,
                exclude_phpsessid: bool = False, raise_not_200: bool = False,
-               locale: Literal["ru", "en", "uk"] | None = None) -> requests.Response:
+               locale: Literal["ru", "en", "uk"] | None = None, stream: bool = False,
+               pin_locale: bool = False) -> requests.Response:
         """
         Отправляет запрос к FunPay. Добавляет в заголовки запроса user_agent и куки.
 
@@ -152,10 +442,117 @@ class Account:
         :param raise_not_200: возбуждать ли исключение, если статус код ответа != 200?
         :type raise_not_200: :obj:`bool`
 
+        :param stream: не загружать тело ответа сразу (читать через response.iter_content()).
+        :type stream: :obj:`bool`
+
+        :param pin_locale: запросить страницу на языке `locale`, не меняя язык аккаунта: ссылка на нужный язык
+            (https://funpay.com/en/...) вместо setlocale. Такие запросы можно выполнять одновременно с запросами
+            на других языках.
+            Важно: если передан `locale`, запрос отправляется без PHPSESSID аккаунта (как с exclude_phpsessid=True),
+            иначе FunPay переключил бы на этот язык всю PHP-сессию аккаунта. Авторизация при этом сохраняется
+            (golden_key), но FunPay выдает запросу новую сессию: CSRF-токен и прочие данные сессии на полученной
+            странице к сессии аккаунта не относятся, а PHPSESSID из ответа не сохраняется.
+        :type pin_locale: :obj:`bool`
+
         :return: объект ответа.
         :rtype: :class:`requests.Response`
         """
 
+        link = self._prepare_request(request_method, api_method, headers, exclude_phpsessid, locale, pin_locale)
+        request_type = utils.RateLimiter.classify(request_method, api_method, payload)
+        if self.rate_limiter and (delay := self.rate_limiter.reserve(request_type)):
+            time.sleep(delay)
+        if self.pool_idle_timeout and time.time() - self.__last_request_time > self.pool_idle_timeout:
+            # сервер к этому времени уже закрыл keep-alive соединения, не пытаемся их переиспользовать
+            self.session.close()
+        self.__last_request_time = time.time()
+        for i in range(10):
+            response = self.session.request(request_method, link, headers=headers, data=payload,
+                                            timeout=self.requests_timeout,
+                                            proxies=self.proxy or {}, allow_redirects=False, stream=stream)
+            if not (300 <= response.status_code < 400) or 'Location' not in response.headers:
+                break
+            response.close()
+            link = response.headers['Location']
+            if not pin_locale:
+                self._update_locale(link)
+        else:
+            response = self.session.request(request_method, link, headers=headers, data=payload,
+                                            timeout=self.requests_timeout,
+                                            proxies=self.proxy or {}, stream=stream)
+        if stream and response.status_code != 200:
+            # как и в AsyncAccount, ответ с ошибкой загружается сразу и соединение освобождается, даже если
+            # _check_response возбудит исключение (текст ответа остается доступен исключению)
+            response.content
+            response.close()
+        return self._check_response(response, raise_not_200, request_type)
+
+    def _execute(self, flow: _Flow[_T]) -> _T:
+        """
+        Выполняет сценарий запросов: отправляет каждый запрос через :meth:`FunPayAPI.account.Account.method`
+        и передает ответ обратно в сценарий.
+        Вся логика разбора ответов FunPay живет в сценариях, поэтому её используют и
+        :class:`FunPayAPI.account.Account`, и :class:`FunPayAPI.async_account.AsyncAccount`.
+
+        :param flow: сценарий запросов.
+
+        :return: результат сценария.
+        """
+        try:
+            call = next(flow)
+            while True:
+                try:
+                    response = self.method(*call.args, **call.kwargs)
+                except Exception as e:
+                    call = flow.throw(e)
+                else:
+                    call = flow.send(response)
+        except StopIteration as e:
+            return e.value
+
+    def _execute_shared(self, key: tuple, flow: _Flow[_T]) -> _T:
+        """
+        Выполняет сценарий запросов, объединяя одинаковые одновременные вызовы: если сценарий с тем же ключом уже
+        выполняется в другом потоке, ждет его результата (один запрос и один разбор ответа на всех).
+        Используется только для методов, которые читают страницы и ничего не меняют.
+        Результат (или исключение) общий для всех ожидавших вызовов, поэтому изменять его нельзя.
+
+        :param key: ключ вызова (название метода и аргументы).
+        :param flow: сценарий запросов.
+
+        :return: результат сценария.
+        """
+        with self.__in_flight_lock:
+            future = self.__in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self.__in_flight[key] = concurrent.futures.Future()
+        if not owner:
+            flow.close()
+            return future.result()
+
+        try:
+            result = self._execute(flow)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.__in_flight_lock:
+                self.__in_flight.pop(key, None)
+
+    def _prepare_request(self, request_method: Literal["post", "get"], api_method: str, headers: dict,
+                         exclude_phpsessid: bool = False, locale: Literal["ru", "en", "uk"] | None = None,
+                         pin_locale: bool = False) -> str:
+        """
+        Добавляет в заголовки запроса user_agent и куки и формирует ссылку для запроса к FunPay.
+
+        :return: ссылка для запроса.
+        :rtype: :obj:`str`
+        """
+
         def normalize_url(api_method: str, locale: Literal["ru", "en", "uk"] | None = None) -> str:
             api_method = "https://funpay.com/" if api_method == "https://funpay.com" else api_method
             url = api_method if api_method.startswith("https://funpay.com/") else "https://funpay.com/" + api_method
@@ -168,18 +565,15 @@ class Account:
                 return url.replace(f"https://funpay.com/", f"https://funpay.com/{locale}/", 1)
             return url
 
-        def update_locale(redirect_url: str):
-            for locale in ("en", "uk"):
-                if redirect_url.startswith(f"https://funpay.com/{locale}/"):
-                    self.__locale = locale
-                    return
-            if redirect_url.startswith(f"https://funpay.com"):
-                self.__locale = "ru"
-
+        if pin_locale and locale:
+            # язык сессии (PHPSESSID) не трогаем: страница на нужном языке запрашивается по ссылке с префиксом
+            exclude_phpsessid = True
         headers["cookie"] = f"golden_key={self.golden_key}; cookie_prefs=1"
         headers["cookie"] += f"; PHPSESSID={self.phpsessid}" if self.phpsessid and not exclude_phpsessid else ""
         if self.user_agent:
             headers["user-agent"] = self.user_agent
+        if pin_locale and locale:
+            return normalize_url(api_method, locale)
         if request_method == "post" and locale:
             link = normalize_url(api_method, locale)
         else:
@@ -187,20 +581,37 @@ class Account:
         locale = locale or self.__set_locale
         if request_method == "get" and locale and locale != self.locale:
             link += f'{"&" if "?" in link else "?"}setlocale={locale}'
-        for i in range(10):
-            response = getattr(requests, request_method)(link, headers=headers, data=payload,
-                                                         timeout=self.requests_timeout,
-                                                         proxies=self.proxy or {}, allow_redirects=False)
-            if not (300 <= response.status_code < 400) or 'Location' not in response.headers:
-                break
-            link = response.headers['Location']
-            update_locale(link)
-        else:
-            response = getattr(requests, request_method)(link, headers=headers, data=payload,
-                                                         timeout=self.requests_timeout,
-                                                         proxies=self.proxy or {})
+        return link
+
+    def _update_locale(self, redirect_url: str):
+        """
+        Обновляет текущий язык аккаунта по ссылке, на которую FunPay перенаправил запрос.
+
+        :param redirect_url: ссылка из заголовка Location.
+        :type redirect_url: :obj:`str`
+        """
+        for locale in ("en", "uk"):
+            if redirect_url.startswith(f"https://funpay.com/{locale}/"):
+                self.__locale = locale
+                return
+        if redirect_url.startswith(f"https://funpay.com"):
+            self.__locale = "ru"
+
+    def _check_response(self, response: requests.Response, raise_not_200: bool = False,
+                        request_type: enums.RequestTypes | None = None) -> requests.Response:
+        """
+        Проверяет статус-код ответа FunPay, запоминает время 429 ошибки и подстраивает лимит частоты запросов.
+
+        :return: объект ответа.
+        :rtype: :class:`requests.Response`
+        """
         if response.status_code == 429:
             self.last_429_err_time = time.time()
+        if self.rate_limiter and request_type is not None:
+            if response.status_code == 429:
+                self.rate_limiter.penalize(request_type)
+            elif response.status_code == 200:
+                self.rate_limiter.reward(request_type)
 
         if response.status_code == 403:
             raise exceptions.UnauthorizedError(response)
@@ -219,9 +630,12 @@ class Account:
         :return: объект аккаунта с обновленными данными.
         :rtype: :class:`FunPayAPI.account.Account`
         """
+        return self._execute(self._get_flow(update_phpsessid))
+
+    def _get_flow(self, update_phpsessid: bool = True) -> _Flow[Account]:
         if not self.is_initiated:
             self.locale = self.__subcategories_parse_locale
-        response = self.method("get", "https://funpay.com/", {}, {}, update_phpsessid, raise_not_200=True)
+        response = yield _MethodCall("get", "https://funpay.com/", {}, {}, update_phpsessid, raise_not_200=True)
         if not self.is_initiated:
             self.locale = self.__default_locale
         html_response = response.content.decode()
@@ -251,7 +665,7 @@ class Account:
         if update_phpsessid or not self.phpsessid:
             self.phpsessid = cookies.get("PHPSESSID", self.phpsessid)
         if not self.is_initiated:
-            self.__setup_categories(html_response)
+            self.__catalog_locale = self.__locale or ""
 
         self.last_update = int(time.time())
         self.html = html_response
@@ -272,16 +686,24 @@ class Account:
         :return: список всех опубликованных лотов переданной подкатегории.
         :rtype: :obj:`list` of :class:`FunPayAPI.types.LotShortcut`
         """
+        return self._execute_shared(("get_subcategory_public_lots", subcategory_type, subcategory_id, locale),
+                                    self._get_subcategory_public_lots_flow(subcategory_type, subcategory_id, locale))
+
+    def _get_subcategory_public_lots_flow(self, subcategory_type: enums.SubCategoryTypes, subcategory_id: int,
+                                          locale: Literal["ru", "en", "uk"] | None = None) \
+            -> _Flow[list[types.LotShortcut]]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
         meth = f"lots/{subcategory_id}/" if subcategory_type is enums.SubCategoryTypes.COMMON else f"chips/{subcategory_id}/"
         if not locale:
             locale = self.__lots_parse_locale
-        response = self.method("get", meth, {"accept": "*/*"}, {}, raise_not_200=True, locale=locale)
+        response = yield _MethodCall("get", meth, {"accept": "*/*"}, {}, raise_not_200=True, locale=locale)
         if locale:
             self.locale = self.__default_locale
         html_response = response.content.decode()
+        if self.lots_parser == "lxml":
+            return self.__parse_subcategory_public_lots_lxml(response, html_response, subcategory_type, subcategory_id)
         parser = BeautifulSoup(html_response, "lxml")
 
         username = parser.find("div", {"class": "user-link-name"})
@@ -349,6 +771,161 @@ class Account:
             result.append(lot_obj)
         return result
 
+    def __parse_subcategory_public_lots_lxml(self, response: requests.Response, html_response: str,
+                                             subcategory_type: enums.SubCategoryTypes,
+                                             subcategory_id: int) -> list[types.LotShortcut]:
+        """
+        Разбирает таблицу лотов подкатегории напрямую через lxml (то же самое, что и разбор через BeautifulSoup
+        в Account.get_subcategory_public_lots(), но без построения дерева BeautifulSoup).
+        """
+        tree = lxml.html.fromstring(html_response)
+        if not _LOTS_XPATHS["username"](tree):
+            raise exceptions.UnauthorizedError(response)
+
+        self.__update_csrf_token(tree)
+        offers = _LOTS_XPATHS["offers"](tree)
+        if not offers:
+            return []
+
+        subcategory_obj = self.get_subcategory(subcategory_type, subcategory_id)
+        sellers = {}
+        return [self.__parse_lot_shortcut_lxml(offer, subcategory_type, subcategory_obj, sellers) for offer in offers]
+
+    def __parse_lot_shortcut_lxml(self, offer: etree.ElementBase, subcategory_type: enums.SubCategoryTypes,
+                                  subcategory_obj: types.SubCategory | None,
+                                  sellers: dict[str, types.SellerShortcut]) -> types.LotShortcut:
+        """
+        Разбирает один виджет лота (a.tc-item) из таблицы лотов подкатегории.
+
+        :param sellers: уже разобранные продавцы этой таблицы ({HTML-код продавца: продавец}), дополняется.
+        """
+        x = _LOTS_XPATHS
+        offer_id = offer.get("href").split("id=")[1]
+        promo = "offer-promo" in offer.get("class", "").split()
+        description = _lxml_text(x["description"](offer))
+        server = _lxml_text(x["server"](offer))
+        tc_price = x["price"](offer)[0]
+        if subcategory_type is types.SubCategoryTypes.COMMON:
+            price = float(tc_price.get("data-s"))
+        else:
+            price = float(_lxml_text(x["price_div"](tc_price)).rsplit(maxsplit=1)[0].replace(" ", ""))
+        currency = parse_currency(_lxml_text(x["unit"](tc_price)))
+        if self.currency != currency:
+            self.currency = currency
+        seller_key = _lxml_html(x["user"](offer)[0])
+        attributes = {k.replace("data-", "", 1): int(v) if v.isdigit() else v for k, v in offer.attrib.items()
+                      if k.startswith("data-")}
+
+        auto = attributes.get("auto") == 1
+        amount = _lxml_text(x["amount"](offer))
+        amount = amount.replace(" ", "") if amount else None
+        amount = int(amount) if amount and amount.isdigit() else None
+        if seller_key not in sellers:
+            online = attributes.get("online") == 1
+            seller_body = x["seller_body"](offer)[0]
+            username = _lxml_text(x["seller_name"](seller_body)).strip()
+            rating_stars = x["stars"](seller_body)
+            rating_stars = len(x["star"](rating_stars[0])) if rating_stars else None
+            k_reviews = _lxml_text(x["reviews"](seller_body))
+            if k_reviews:
+                k_reviews = "".join([i for i in k_reviews if i.isdigit()])
+            k_reviews = int(k_reviews) if k_reviews else 0
+            user_id = int(x["seller_link"](seller_body)[0].get("data-href").split("/")[-2])
+            seller = types.SellerShortcut(user_id, username, online, rating_stars, k_reviews, seller_key)
+            sellers[seller_key] = seller
+        else:
+            seller = sellers[seller_key]
+        for i in ("online", "auto"):
+            if i in attributes:
+                del attributes[i]
+
+        return types.LotShortcut(offer_id, server, description, amount, price, currency, subcategory_obj, seller,
+                                 auto, promo, attributes, _lxml_html(offer))
+
+    def iter_subcategory_public_lots(self, subcategory_type: enums.SubCategoryTypes, subcategory_id: int,
+                                     locale: Literal["ru", "en", "uk"] | None = None) \
+            -> Generator[types.LotShortcut, None, None]:
+        """
+        Потоковая версия :meth:`FunPayAPI.account.Account.get_subcategory_public_lots`: разбирает страницу
+        по мере загрузки и отдает лоты по одному, не дожидаясь загрузки всей страницы.
+        Если прервать перебор (break), загрузка страницы прекращается.
+
+        :param subcategory_type: тип подкатегории.
+        :type subcategory_type: :class:`FunPayAPI.enums.SubCategoryTypes`
+
+        :param subcategory_id: ID подкатегории.
+        :type subcategory_id: :obj:`int`
+
+        :return: генератор опубликованных лотов переданной подкатегории.
+        :rtype: :obj:`Generator` of :class:`FunPayAPI.types.LotShortcut`
+        """
+        flow = self._iter_subcategory_public_lots_flow(subcategory_type, subcategory_id, locale)
+        call = next(flow)
+        response = None
+        try:
+            response = self.method(*call.args, **call.kwargs)
+            flow.send(response)
+            for chunk in response.iter_content(chunk_size=65536):
+                yield from flow.send(chunk)
+            yield from flow.send(None)
+        finally:
+            flow.close()
+            if response is not None:
+                response.close()
+
+    def _iter_subcategory_public_lots_flow(self, subcategory_type: enums.SubCategoryTypes, subcategory_id: int,
+                                           locale: Literal["ru", "en", "uk"] | None = None) \
+            -> Generator[_MethodCall | list[types.LotShortcut], requests.Response | bytes | None, None]:
+        """
+        Сценарий потокового разбора таблицы лотов подкатегории: отдает :class:`_MethodCall` (с stream=True), получает
+        ответ, после чего получает куски тела ответа (None - конец ответа) и на каждый отдает список разобранных
+        из него лотов.
+        """
+        if not self.is_initiated:
+            raise exceptions.AccountNotInitiatedError()
+
+        meth = f"lots/{subcategory_id}/" if subcategory_type is enums.SubCategoryTypes.COMMON else f"chips/{subcategory_id}/"
+        if not locale:
+            locale = self.__lots_parse_locale
+        response = yield _MethodCall("get", meth, {"accept": "*/*"}, {}, raise_not_200=True, locale=locale,
+                                     stream=True)
+        if locale:
+            self.locale = self.__default_locale
+
+        subcategory_obj = self.get_subcategory(subcategory_type, subcategory_id)
+        parser = etree.HTMLPullParser(events=("start", "end"), encoding="utf-8")
+        sellers = {}
+        authorized = False
+        lots = []
+        while True:
+            chunk = yield lots
+            lots = []
+            if chunk is None:
+                parser.close()
+            else:
+                parser.feed(chunk)
+            for event, element in parser.read_events():
+                classes = (element.get("class") or "").split()
+                if event == "start":
+                    if element.tag == "body":
+                        # у body уже есть атрибуты (data-app-data), ищем его через родителя, как и в дереве целиком
+                        self.__update_csrf_token(element.getparent())
+                elif element.tag == "div" and "user-link-name" in classes:
+                    authorized = True
+                elif element.tag == "a" and "tc-item" in classes:
+                    if not authorized:
+                        raise exceptions.UnauthorizedError(response)
+                    lots.append(self.__parse_lot_shortcut_lxml(element, subcategory_type, subcategory_obj, sellers))
+                    # разобранные лоты больше не нужны, не держим их в памяти
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+            if chunk is None:
+                if not authorized:
+                    raise exceptions.UnauthorizedError(response)
+                yield lots
+                return
+
     def get_my_subcategory_lots(self, subcategory_id: int,
                                 locale: Literal["ru", "en", "uk"] | None = None) -> list[types.MyLotShortcut]:
         """
@@ -358,12 +935,17 @@ class Account:
         :return: список лотов переданной подкатегории на аккаунте.
         :rtype: :obj:`list` of :class:`FunPayAPI.types.MyLotShortcut`
         """
+        return self._execute(self._get_my_subcategory_lots_flow(subcategory_id, locale))
+
+    def _get_my_subcategory_lots_flow(self, subcategory_id: int,
+                                      locale: Literal["ru", "en", "uk"] | None = None) \
+            -> _Flow[list[types.MyLotShortcut]]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         meth = f"lots/{subcategory_id}/trade"
         if not locale:
             locale = self.__lots_parse_locale
-        response = self.method("get", meth, {"accept": "*/*"}, {}, raise_not_200=True, locale=locale)
+        response = yield _MethodCall("get", meth, {"accept": "*/*"}, {}, raise_not_200=True, locale=locale)
         if locale:
             self.locale = self.__default_locale
         html_response = response.content.decode()
@@ -410,24 +992,33 @@ class Account:
         :param lot_id: ID лота.
         :type lot_id: :obj:`int` or :obj:`str`
 
+        :param locale: язык страницы. Язык аккаунта при этом не меняется, поэтому страницы на разных языках
+            можно запрашивать одновременно. Страница на заданном языке запрашивается без PHPSESSID аккаунта
+            (см. параметр pin_locale в :meth:`method`), CSRF-токен аккаунта с неё не обновляется.
+        :type locale: :obj:`str` or :obj:`None`, опционально
+
         :return: объект страницы лота или :obj:`None`, если лот не найден.
         :rtype: :class:`FunPayAPI.types.lotPage` or :obj:`None`
         """
+        return self._execute_shared(("get_lot_page", lot_id, locale), self._get_lot_page_flow(lot_id, locale))
+
+    def _get_lot_page_flow(self, lot_id: int, locale: Literal["ru", "en", "uk"] | None = None):
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         headers = {
             "accept": "*/*"
         }
-        response = self.method("get", f"lots/offer?id={lot_id}", headers, {}, raise_not_200=True, locale=locale)
-        if locale:
-            self.locale = self.__default_locale
+        response = yield _MethodCall("get", f"lots/offer?id={lot_id}", headers, {}, raise_not_200=True, locale=locale,
+                                     pin_locale=True)
         html_response = response.content.decode()
         parser = BeautifulSoup(html_response, "lxml")
         username = parser.find("div", {"class": "user-link-name"})
         if not username:
             raise exceptions.UnauthorizedError(response)
 
-        self.__update_csrf_token(parser)
+        if not locale:
+            # страница на закрепленном языке получена без PHPSESSID аккаунта, её CSRF-токен к сессии не относится
+            self.__update_csrf_token(parser)
 
         if (page_header := parser.find("h1", class_="page-header")) \
                 and page_header.text in ("Предложение не найдено", "Пропозицію не знайдено", "Offer not found"):
@@ -448,9 +1039,10 @@ class Account:
         image_urls = []
         for param_item in parser.find_all("div", class_="param-item"):
             if param_name := param_item.find("h5"):
-                if param_name.text in ("Краткое описание", "Короткий опис", "Short description"):
+                param_name = param_name.text.strip()
+                if param_name in ("Краткое описание", "Короткий опис", "Short description"):
                     short_description = param_item.find("div").text
-                elif param_name.text in ("Подробное описание", "Докладний опис", "Detailed description"):
+                elif param_name in ("Подробное описание", "Докладний опис", "Detailed description"):
                     detailed_description = param_item.find("div").text
                 elif param_name in ("Картинки", "Зображення", "Images"):
                     photos = param_item.find_all("a", class_="attachments-thumb")
@@ -470,9 +1062,12 @@ class Account:
         :return: информацию о балансе пользователя.
         :rtype: :class:`FunPayAPI.types.Balance`
         """
+        return self._execute(self._get_balance_flow(lot_id))
+
+    def _get_balance_flow(self, lot_id: int) -> _Flow[types.Balance]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
-        response = self.method("get", f"lots/offer?id={lot_id}", {"accept": "*/*"}, {}, raise_not_200=True)
+        response = yield _MethodCall("get", f"lots/offer?id={lot_id}", {"accept": "*/*"}, {}, raise_not_200=True)
         html_response = response.content.decode()
         parser = BeautifulSoup(html_response, "lxml")
 
@@ -509,6 +1104,11 @@ class Account:
         :return: история указанного чата.
         :rtype: :obj:`list` of :class:`FunPayAPI.types.Message`
         """
+        return self._execute(self._get_chat_history_flow(chat_id, last_message_id, interlocutor_username, from_id))
+
+    def _get_chat_history_flow(self, chat_id: int | str, last_message_id: int = 99999999999999999999999,
+                               interlocutor_username: Optional[str] = None,
+                               from_id: int = 0) -> _Flow[list[types.Message]]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
@@ -520,8 +1120,8 @@ class Account:
             "node": chat_id,
             "last_message": last_message_id
         }
-        response = self.method("get", f"chat/history?node={chat_id}&last_message={last_message_id}",
-                               headers, payload, raise_not_200=True)
+        response = yield _MethodCall("get", f"chat/history?node={chat_id}&last_message={last_message_id}",
+                                     headers, payload, raise_not_200=True)
 
         json_response = response.json()
         if not json_response.get("chat") or not json_response["chat"].get("messages"):
@@ -550,6 +1150,10 @@ class Account:
         :return: словарь с историями чатов в формате {ID чата: [список сообщений]}
         :rtype: :obj:`dict` {:obj:`int`: :obj:`list` of :class:`FunPayAPI.types.Message`}
         """
+        return self._execute(self._get_chats_histories_flow(chats_data, interlocutor_ids))
+
+    def _get_chats_histories_flow(self, chats_data: dict[int | str, str | None],
+                                  interlocutor_ids: list[int] | None = None) -> _Flow[dict[int, list[types.Message]]]:
         headers = {
             "accept": "*/*",
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
@@ -566,7 +1170,7 @@ class Account:
             "request": False,
             "csrf_token": self.csrf_token
         }
-        response = self.method("post", "runner/", headers, payload, raise_not_200=True)
+        response = yield _MethodCall("post", "runner/", headers, payload, raise_not_200=True)
         json_response = response.json()
 
         result = {}
@@ -575,21 +1179,33 @@ class Account:
                 bv = self.parse_buyer_viewing(i)
                 self.runner.buyers_viewing[bv.buyer_id] = bv
             elif i.get("type") == "chat_node":
-                if not i.get("data"):
-                    result[i.get("id")] = []
-                    continue
-                if i["data"]["node"]["silent"]:
-                    interlocutor_id = None
-                    interlocutor_name = None
-                else:
-                    interlocutors = i["data"]["node"]["name"].split("-")[1:]
-                    interlocutors.remove(str(self.id))
-                    interlocutor_id = int(interlocutors[0])
-                    interlocutor_name = chats_data[i.get("id")]
-                messages = self.__parse_messages(i["data"]["messages"], i.get("id"), interlocutor_id, interlocutor_name)
-                result[i.get("id")] = messages
+                result[i.get("id")] = self.parse_chat_node(i, chats_data[i.get("id")])
         return result
 
+    def parse_chat_node(self, obj: dict, interlocutor_name: str | None = None) -> list[types.Message]:
+        """
+        Парсит объект "chat_node" из ответа runner/ (история чата).
+
+        :param obj: объект из ответа runner/, где "type" == "chat_node".
+        :type obj: :obj:`dict`
+
+        :param interlocutor_name: никнейм собеседника (None, если неизвестен).
+        :type interlocutor_name: :obj:`str` or :obj:`None`, опционально
+
+        :return: сообщения чата.
+        :rtype: :obj:`list` of :class:`FunPayAPI.types.Message`
+        """
+        if not obj.get("data"):
+            return []
+        if obj["data"]["node"]["silent"]:
+            interlocutor_id = None
+            interlocutor_name = None
+        else:
+            interlocutors = obj["data"]["node"]["name"].split("-")[1:]
+            interlocutors.remove(str(self.id))
+            interlocutor_id = int(interlocutors[0])
+        return self.__parse_messages(obj["data"]["messages"], obj.get("id"), interlocutor_id, interlocutor_name)
+
     def upload_image(self, image: str | IO[bytes], type_: Literal["chat", "offer"] = "chat") -> int:
         """
         Выгружает изображение на сервер FunPay для дальнейшей отправки в качестве сообщения.
@@ -604,7 +1220,24 @@ class Account:
         :return: ID изображения на серверах FunPay.
         :rtype: :obj:`int`
         """
+        if type_ != "offer" or self.image_cache is None:
+            return self._execute(self._upload_image_flow(image, type_))
+        # изображения лотов с одинаковым содержимым выгружаем один раз (в т.ч. одновременные выгрузки)
+        image = self.__read_image(image)
+        digest = ImageCache.digest(image)
+        return self._execute_shared(("upload_image", type_, digest), self._upload_image_flow(image, type_, digest))
 
+    @staticmethod
+    def __read_image(image: str | bytes | IO[bytes]) -> bytes:
+        if isinstance(image, str):
+            with open(image, "rb") as f:
+                return f.read()
+        if isinstance(image, bytes):
+            return image
+        return image.read()
+
+    def _upload_image_flow(self, image: str | IO[bytes], type_: Literal["chat", "offer"] = "chat",
+                           digest: str | None = None) -> _Flow[int]:
         assert type_ in ("chat", "offer")
 
         if not self.is_initiated:
@@ -615,6 +1248,12 @@ class Account:
                 img = f.read()
         else:
             img = image
+        cache = self.image_cache if type_ == "offer" else None
+        if cache is not None:
+            img = self.__read_image(img)
+            digest = digest or ImageCache.digest(img)
+            if (file_id := cache.get(self.id, type_, digest)) is not None:
+                return file_id
 
         fields = {
             'file': ("Отправлено_с_помощью_бота_FunPay_Cardinal.png", img, "image/png"),
@@ -629,7 +1268,7 @@ class Account:
             "content-type": m.content_type,
         }
         # file/addChatImage, file/addOfferImage
-        response = self.method("post", f"file/add{type_.title()}Image", headers, m)
+        response = yield _MethodCall("post", f"file/add{type_.title()}Image", headers, m)
 
         if response.status_code == 400:
             try:
@@ -643,6 +1282,8 @@ class Account:
 
         if not (document_id := response.json().get("fileId")):
             raise exceptions.ImageUploadError(response, None)
+        if cache is not None:
+            cache.save(self.id, type_, digest, int(document_id))
         return int(document_id)
 
     def send_message(self, chat_id: int | str, text: Optional[str] = None, chat_name: Optional[str] = None,
@@ -679,6 +1320,14 @@ class Account:
         :return: экземпляр отправленного сообщения.
         :rtype: :class:`FunPayAPI.types.Message`
         """
+        return self._execute(self._send_message_flow(chat_id, text, chat_name, interlocutor_id, image_id,
+                                                     add_to_ignore_list, update_last_saved_message, leave_as_unread))
+
+    def _send_message_flow(self, chat_id: int | str, text: Optional[str] = None, chat_name: Optional[str] = None,
+                           interlocutor_id: Optional[int] = None,
+                           image_id: Optional[int] = None, add_to_ignore_list: bool = True,
+                           update_last_saved_message: bool = False,
+                           leave_as_unread: bool = False) -> _Flow[types.Message]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
@@ -687,6 +1336,21 @@ class Account:
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
             "x-requested-with": "XMLHttpRequest"
         }
+        payload = {
+            "objects": "" if leave_as_unread else json.dumps([self._chat_node_object(chat_id)]),
+            "request": json.dumps(self._message_request(chat_id, text, image_id)),
+            "csrf_token": self.csrf_token
+        }
+
+        response = yield _MethodCall("post", "runner/", headers, payload, raise_not_200=True)
+        return self._parse_sent_message(response, chat_id, text, chat_name, interlocutor_id, add_to_ignore_list,
+                                        update_last_saved_message, leave_as_unread)
+
+    def _message_request(self, chat_id: int | str, text: Optional[str] = None,
+                         image_id: Optional[int] = None) -> dict:
+        """
+        Формирует поле "request" запроса к runner/ для отправки сообщения.
+        """
         request = {
             "action": "chat_message",
             "data": {"node": chat_id, "last_message": -1, "content": text}
@@ -697,37 +1361,54 @@ class Account:
             request["data"]["content"] = ""
         else:
             request["data"]["content"] = f"{self.__bot_character}{text}" if text else ""
+        return request
 
-        objects = [
-            {
-                "type": "chat_node",
-                "id": chat_id,
-                "tag": "00000000",
-                "data": {"node": chat_id, "last_message": -1, "content": ""}
-            }
-        ]
-        payload = {
-            "objects": "" if leave_as_unread else json.dumps(objects),
-            "request": json.dumps(request),
-            "csrf_token": self.csrf_token
+    @staticmethod
+    def _chat_node_object(chat_id: int | str, tag: str = "00000000", last_message: int = -1) -> dict:
+        """
+        Формирует объект "chat_node" запроса к runner/ (история чата).
+        """
+        return {
+            "type": "chat_node",
+            "id": chat_id,
+            "tag": tag,
+            "data": {"node": chat_id, "last_message": last_message, "content": ""}
         }
 
-        response = self.method("post", "runner/", headers, payload, raise_not_200=True)
+    def _parse_sent_message(self, response: requests.Response, chat_id: int | str, text: Optional[str] = None,
+                            chat_name: Optional[str] = None, interlocutor_id: Optional[int] = None,
+                            add_to_ignore_list: bool = True, update_last_saved_message: bool = False,
+                            leave_as_unread: bool = False) -> types.Message:
+        """
+        Разбирает ответ runner/ на запрос с отправкой сообщения (см. :meth:`_message_request`).
+        Параметры те же, что и у :meth:`FunPayAPI.account.Account.send_message`.
+
+        :return: экземпляр отправленного сообщения.
+        """
         json_response = response.json()
         if not (resp := json_response.get("response")):
             raise exceptions.MessageNotDeliveredError(response, None, chat_id)
 
         if (error_text := resp.get("error")) is not None:
+            flood = multiuser_flood = False
             if error_text in ("Нельзя отправлять сообщения слишком часто.",
                               "You cannot send messages too frequently.",
                               "Не можна надсилати повідомлення занадто часто."):
                 self.last_flood_err_time = time.time()
+                flood = True
+                if self.rate_limiter:
+                    self.rate_limiter.penalize(enums.RequestTypes.CHAT_MESSAGE)
             elif error_text in ("Нельзя слишком часто отправлять сообщения разным пользователям.",
                                 "Не можна надто часто надсилати повідомлення різним користувачам.",
                                 "You cannot message multiple users too frequently."):
                 self.last_multiuser_flood_err_time = time.time()
-            raise exceptions.MessageNotDeliveredError(response, error_text, chat_id)
-        if leave_as_unread:
+                multiuser_flood = True
+                if self.rate_limiter:
+                    self.rate_limiter.penalize(enums.RequestTypes.CHAT_MESSAGE)
+            raise exceptions.MessageNotDeliveredError(response, error_text, chat_id, flood, multiuser_flood)
+        node = next((i for i in json_response.get("objects") or []
+                     if i.get("type") == "chat_node" and i.get("id") == chat_id and i.get("data")), None)
+        if leave_as_unread or node is None:
             message_text = text
             fake_html = f"""
             <div class="chat-msg-item" id="message-0000000000">
@@ -742,7 +1423,7 @@ class Account:
                                         fake_html, None,
                                         None)
         else:
-            mes = json_response["objects"][0]["data"]["messages"][-1]
+            mes = node["data"]["messages"][-1]
             parser = BeautifulSoup(mes["html"].replace("<br>", "\n"), "lxml")
             image_name = None
             image_link = None
@@ -802,14 +1483,21 @@ class Account:
         :return: объект отправленного сообщения.
         :rtype: :class:`FunPayAPI.types.Message`
         """
+        return self._execute(self._send_image_flow(chat_id, image, chat_name, interlocutor_id, add_to_ignore_list,
+                                                   update_last_saved_message, leave_as_unread))
+
+    def _send_image_flow(self, chat_id: int, image: int | str | IO[bytes], chat_name: Optional[str] = None,
+                         interlocutor_id: Optional[int] = None,
+                         add_to_ignore_list: bool = True, update_last_saved_message: bool = False,
+                         leave_as_unread: bool = False) -> _Flow[types.Message]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
         if not isinstance(image, int):
-            image = self.upload_image(image, type_="chat")
-        result = self.send_message(chat_id, None, chat_name, interlocutor_id,
-                                   image, add_to_ignore_list, update_last_saved_message,
-                                   leave_as_unread)
+            image = yield from self._upload_image_flow(image, type_="chat")
+        result = yield from self._send_message_flow(chat_id, None, chat_name, interlocutor_id,
+                                                    image, add_to_ignore_list, update_last_saved_message,
+                                                    leave_as_unread)
         return result
 
     def send_review(self, order_id: str, text: str, rating: Literal[1, 2, 3, 4, 5] = 5) -> str:
@@ -828,6 +1516,9 @@ class Account:
         :return: ответ FunPay (HTML-код блока отзыва).
         :rtype: :obj:`str`
         """
+        return self._execute(self._send_review_flow(order_id, text, rating))
+
+    def _send_review_flow(self, order_id: str, text: str, rating: Literal[1, 2, 3, 4, 5] = 5) -> _Flow[str]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
@@ -844,7 +1535,7 @@ class Account:
             "orderId": order_id
         }
 
-        response = self.method("post", "orders/review", headers, payload)
+        response = yield _MethodCall("post", "orders/review", headers, payload)
         if response.status_code == 400:
             json_response = response.json()
             msg = json_response.get("msg")
@@ -864,6 +1555,9 @@ class Account:
         :return: ответ FunPay (HTML-код блока отзыва).
         :rtype: :obj:`str`
         """
+        return self._execute(self._delete_review_flow(order_id))
+
+    def _delete_review_flow(self, order_id: str) -> _Flow[str]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
@@ -877,7 +1571,7 @@ class Account:
             "orderId": order_id
         }
 
-        response = self.method("post", "orders/reviewDelete", headers, payload)
+        response = yield _MethodCall("post", "orders/reviewDelete", headers, payload)
 
         if response.status_code == 400:
             json_response = response.json()
@@ -895,6 +1589,9 @@ class Account:
         :param order_id: ID заказа.
         :type order_id: :obj:`str`
         """
+        return self._execute(self._refund_flow(order_id))
+
+    def _refund_flow(self, order_id):
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
@@ -909,7 +1606,7 @@ class Account:
             "csrf_token": self.csrf_token
         }
 
-        response = self.method("post", "orders/refund", headers, payload, raise_not_200=True)
+        response = yield _MethodCall("post", "orders/refund", headers, payload, raise_not_200=True)
 
         if response.json().get("error"):
             raise exceptions.RefundError(response, response.json().get("msg"), order_id)
@@ -933,6 +1630,10 @@ class Account:
         :return: кол-во выведенных средств с учетом комиссии FunPay.
         :rtype: :obj:`float`
         """
+        return self._execute(self._withdraw_flow(currency, wallet, amount, address))
+
+    def _withdraw_flow(self, currency: enums.Currency, wallet: enums.Wallet, amount: int | float,
+                       address: str) -> _Flow[float]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
@@ -957,7 +1658,7 @@ class Account:
             "wallet": address,
             "amount_int": str(amount)
         }
-        response = self.method("post", "withdraw/withdraw", headers, payload, raise_not_200=True)
+        response = yield _MethodCall("post", "withdraw/withdraw", headers, payload, raise_not_200=True)
         json_response = response.json()
         if json_response.get("error"):
             error_message = json_response.get("msg")
@@ -976,6 +1677,9 @@ class Account:
         :return: ответ FunPay.
         :rtype: :obj:`dict`
         """
+        return self._execute(self._get_raise_modal_flow(category_id))
+
+    def _get_raise_modal_flow(self, category_id: int) -> _Flow[dict]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         category = self.get_category(category_id)
@@ -989,7 +1693,7 @@ class Account:
             "game_id": category_id,
             "node_id": subcategory.id
         }
-        response = self.method("post", "https://funpay.com/lots/raise", headers, payload, raise_not_200=True)
+        response = yield _MethodCall("post", "https://funpay.com/lots/raise", headers, payload, raise_not_200=True)
         json_response = response.json()
         return json_response
 
@@ -1011,6 +1715,10 @@ class Account:
         :return: `True`
         :rtype: :obj:`bool`
         """
+        return self._execute(self._raise_lots_flow(category_id, subcategories, exclude))
+
+    def _raise_lots_flow(self, category_id: int, subcategories: Optional[list[int | types.SubCategory]] = None,
+                         exclude: list[int] | None = None) -> _Flow[bool]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         if not (category := self.get_category(category_id)):
@@ -1042,7 +1750,7 @@ class Account:
             "node_ids[]": [i.id for i in subcats]
         }
 
-        response = self.method("post", "lots/raise", headers, payload, raise_not_200=True)
+        response = yield _MethodCall("post", "lots/raise", headers, payload, raise_not_200=True)
         json_response = response.json()
         logger.debug(f"Ответ FunPay (поднятие категорий): {json_response}.")  # locale
         if not json_response.get("error") and not json_response.get("url"):
@@ -1066,11 +1774,15 @@ class Account:
         :return: объект профиля пользователя.
         :rtype: :class:`FunPayAPI.types.UserProfile`
         """
+        return self._execute_shared(("get_user", user_id, locale), self._get_user_flow(user_id, locale))
+
+    def _get_user_flow(self, user_id: int, locale: Literal["ru", "en", "uk"] | None = None) -> _Flow[types.UserProfile]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         if not locale:
             locale = self.__profile_parse_locale
-        response = self.method("get", f"users/{user_id}/", {"accept": "*/*"}, {}, raise_not_200=True, locale=locale)
+        response = yield _MethodCall("get", f"users/{user_id}/", {"accept": "*/*"}, {}, raise_not_200=True,
+                                     locale=locale)
         if locale:
             self.locale = self.__default_locale
         html_response = response.content.decode()
@@ -1106,6 +1818,8 @@ class Account:
                 continue
 
             offers = i.parent.find_all("a", {"class": "tc-item"})
+            if self.__is_offer_list_truncated(i.parent):
+                user_obj.truncated_subcategories.add(subcategory_obj)
             currency = None
             for j in offers:
                 offer_id = j["href"].split("id=")[1]
@@ -1126,12 +1840,86 @@ class Account:
                     currency = parse_currency(tc_price.find("span", class_="unit").text)
                     if self.currency != currency:
                         self.currency = currency
+                attributes = {k.replace("data-", "", 1): int(v) if v.isdigit() else v for k, v in j.attrs.items()
+                              if k.startswith("data-") and k not in ("data-online", "data-auto")} or None
                 lot_obj = types.LotShortcut(offer_id, server, description, amount, price, currency, subcategory_obj,
                                             None, auto,
-                                            None, None, str(j))
+                                            None, attributes, str(j))
                 user_obj.add_lot(lot_obj)
         return user_obj
 
+    @staticmethod
+    def __is_offer_list_truncated(section: BeautifulSoup) -> bool:
+        """
+        Проверяет, показаны ли лоты подкатегории на странице пользователя не полностью
+        (есть кнопка / ссылка "Показать еще").
+        """
+        # класс сравнивается целиком: "more" в других классах (описания лотов и т.п.) - не кнопка
+        return section.find(class_=lambda c: c in _OFFER_LIST_MORE_CLASSES) is not None
+
+    def get_user_lots(self, user_id: int, subcategory_type: enums.SubCategoryTypes, subcategory_id: int,
+                      cross_check: bool = False,
+                      locale: Literal["ru", "en", "uk"] | None = None) -> list[types.LotShortcut]:
+        """
+        Получает лоты пользователя в подкатегории со страницы пользователя (один запрос вместо загрузки
+        всей таблицы лотов подкатегории с лотами всех продавцов).
+        Если лоты подкатегории показаны на странице пользователя не полностью или страницу не удалось разобрать,
+        лоты берутся из таблицы лотов подкатегории.
+
+        :param user_id: ID пользователя.
+        :type user_id: :obj:`int`
+
+        :param subcategory_type: тип подкатегории.
+        :type subcategory_type: :class:`FunPayAPI.enums.SubCategoryTypes`
+
+        :param subcategory_id: ID подкатегории.
+        :type subcategory_id: :obj:`int`
+
+        :param cross_check: если на странице пользователя нет атрибутов лотов, дополнить лоты данными из таблицы
+            лотов подкатегории (атрибуты, рейтинг продавца, закреп). Требует загрузки таблицы лотов подкатегории.
+        :type cross_check: :obj:`bool`, опционально
+
+        :return: лоты пользователя в подкатегории.
+        :rtype: :obj:`list` of :class:`FunPayAPI.types.LotShortcut`
+        """
+        return self._execute(self._get_user_lots_flow(user_id, subcategory_type, subcategory_id, cross_check, locale))
+
+    def _get_user_lots_flow(self, user_id: int, subcategory_type: enums.SubCategoryTypes, subcategory_id: int,
+                            cross_check: bool = False, locale: Literal["ru", "en", "uk"] | None = None) \
+            -> _Flow[list[types.LotShortcut]]:
+        profile = None
+        try:
+            profile = yield from self._get_user_flow(user_id, locale)
+        except exceptions.RequestFailedError:
+            raise
+        except Exception:
+            logger.warning(f"Не удалось разобрать страницу пользователя {user_id}, "
+                           f"лоты будут получены из таблицы лотов подкатегории.")
+            logger.debug("TRACEBACK", exc_info=True)
+
+        def in_subcategory(subcategory: types.SubCategory | None) -> bool:
+            return subcategory is not None and subcategory.id == subcategory_id and subcategory.type is subcategory_type
+
+        if profile is None or any(in_subcategory(i) for i in profile.truncated_subcategories):
+            lots = yield from self._get_subcategory_public_lots_flow(subcategory_type, subcategory_id, locale)
+            return [lot for lot in lots if lot.seller and lot.seller.id == user_id]
+
+        seller = types.SellerShortcut(profile.id, profile.username, profile.online, None, 0, "")
+        lots = [lot for lot in profile.get_lots() if in_subcategory(lot.subcategory)]
+        for lot in lots:
+            lot.seller = seller
+        if cross_check and any(lot.attributes is None for lot in lots):
+            listing = {lot.id: lot for lot in
+                       (yield from self._get_subcategory_public_lots_flow(subcategory_type, subcategory_id, locale))}
+            for lot in lots:
+                if (listed := listing.get(lot.id)) is None:
+                    continue
+                lot.seller = listed.seller
+                lot.promo = listed.promo
+                if lot.attributes is None:
+                    lot.attributes = listed.attributes
+        return lots
+
     def get_chat(self, chat_id: int, with_history: bool = True,
                  locale: Literal["ru", "en", "uk"] | None = None) -> types.Chat:
         """
@@ -1146,12 +1934,17 @@ class Account:
         :return: объект чата.
         :rtype: :class:`FunPayAPI.types.Chat`
         """
+        return self._execute(self._get_chat_flow(chat_id, with_history, locale))
+
+    def _get_chat_flow(self, chat_id: int, with_history: bool = True,
+                       locale: Literal["ru", "en", "uk"] | None = None) -> _Flow[types.Chat]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
         if not locale:
             locale = self.__chat_parse_locale
-        response = self.method("get", f"chat/?node={chat_id}", {"accept": "*/*"}, {}, raise_not_200=True, locale=locale)
+        response = yield _MethodCall("get", f"chat/?node={chat_id}", {"accept": "*/*"}, {}, raise_not_200=True,
+                                     locale=locale)
         if locale:
             self.locale = self.__default_locale
         html_response = response.content.decode()
@@ -1168,7 +1961,7 @@ class Account:
             a = chat_panel.find("a")
             text, link = a.text, a["href"]
         if with_history:
-            history = self.get_chat_history(chat_id, interlocutor_username=name)
+            history = yield from self._get_chat_history_flow(chat_id, interlocutor_username=name)
         else:
             history = []
         return types.Chat(chat_id, name, link, text, html_response, history)
@@ -1183,8 +1976,12 @@ class Account:
         :return: объекст заказа.
         :rtype: :class:`FunPayAPI.types.OrderShortcut`
         """
+        return self._execute(self._get_order_shortcut_flow(order_id))
+
+    def _get_order_shortcut_flow(self, order_id: str) -> _Flow[types.OrderShortcut]:
         # todo взаимодействие с покупками
-        return self.runner.saved_orders.get(order_id, self.get_sales(id=order_id)[1][0])
+        sales = yield from self._get_sales_flow(id=order_id)
+        return self.runner.saved_orders.get(order_id, sales[1][0])
 
     def get_order(self, order_id: str, locale: Literal["ru", "en", "uk"] | None = None) -> types.Order:
         """
@@ -1196,6 +1993,9 @@ class Account:
         :return: объекст заказа.
         :rtype: :class:`FunPayAPI.types.Order`
         """
+        return self._execute(self._get_order_flow(order_id, locale))
+
+    def _get_order_flow(self, order_id: str, locale: Literal["ru", "en", "uk"] | None = None) -> _Flow[types.Order]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         headers = {
@@ -1203,7 +2003,7 @@ class Account:
         }
         if not locale:
             locale = self.__order_parse_locale
-        response = self.method("get", f"orders/{order_id}/", headers, {}, raise_not_200=True, locale=locale)
+        response = yield _MethodCall("get", f"orders/{order_id}/", headers, {}, raise_not_200=True, locale=locale)
         if locale:
             self.locale = self.__default_locale
         html_response = response.content.decode()
@@ -1377,6 +2177,19 @@ class Account:
         :return: (ID след. заказа (для start_from), список заказов)
         :rtype: :obj:`tuple` (:obj:`str` or :obj:`None`, :obj:`list` of :class:`FunPayAPI.types.OrderShortcut`)
         """
+        return self._execute(self._get_sales_flow(start_from, include_paid, include_closed, include_refunded,
+                                                  exclude_ids, id, buyer, state, game, section, server, side, locale,
+                                                  subcategories, **more_filters))
+
+    def _get_sales_flow(self, start_from: str | None = None, include_paid: bool = True, include_closed: bool = True,
+                        include_refunded: bool = True, exclude_ids: list[str] | None = None,
+                        id: Optional[str] = None, buyer: Optional[str] = None,
+                        state: Optional[Literal["closed", "paid", "refunded"]] = None, game: Optional[int] = None,
+                        section: Optional[str] = None, server: Optional[int] = None,
+                        side: Optional[int] = None, locale: Literal["ru", "en", "uk"] | None = None,
+                        subcategories: dict[str, tuple[types.SubCategoryTypes, int]] | None = None,
+                        **more_filters) -> _Flow[tuple[str | None, list[types.OrderShortcut],
+                                                       Literal["ru", "en", "uk"], dict[str, types.SubCategory]]]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
@@ -1397,32 +2210,34 @@ class Account:
             filters["continue"] = start_from
 
         locale = locale or self.__profile_parse_locale
-        response = self.method("post" if start_from else "get", link, {}, filters, raise_not_200=True, locale=locale)
+        response = yield _MethodCall("post" if start_from else "get", link, {}, filters, raise_not_200=True,
+                                     locale=locale)
         if not start_from:
             self.locale = self.__default_locale
         html_response = response.content.decode()
 
-        parser = BeautifulSoup(html_response, "lxml")
+        # страница разбирается через lxml, а через BeautifulSoup - только строки заказов, которых еще не было
+        # или HTML которых изменился с прошлого раза (статус, дата)
+        tree = etree.HTML(html_response)
 
         if not start_from:
-            username = parser.find("div", {"class": "user-link-name"})
+            username = _SALES_XPATHS["username"](tree)
             if not username:
                 raise exceptions.UnauthorizedError(response)
 
-        next_order_id = parser.find("input", {"type": "hidden", "name": "continue"})
-        next_order_id = next_order_id.get("value") if next_order_id else None
+        next_order_id = _SALES_XPATHS["continue"](tree)
+        next_order_id = next_order_id[0].get("value") if next_order_id else None
 
-        order_divs = parser.find_all("a", {"class": "tc-item"})
+        order_divs = _SALES_XPATHS["orders"](tree)
         if not start_from:
             subcategories = dict()
-            app_data = json.loads(parser.find("body").get("data-app-data"))
+            app_data = json.loads(_SALES_XPATHS["body"](tree)[0].get("data-app-data"))
             locale = app_data.get("locale")
             self.csrf_token = app_data.get("csrf-token") or self.csrf_token
-            games_options = parser.find("select", attrs={"name": "game"})
+            games_options = _SALES_XPATHS["games"](tree)
             if games_options:
-                games_options = games_options.find_all(lambda x: x.name == "option" and x.get("value"))
-                for game_option in games_options:
-                    game_name = game_option.text
+                for game_option in _SALES_XPATHS["game_options"](games_options[0]):
+                    game_name = "".join(game_option.itertext())
                     sections_list = json.loads(game_option.get("data-data"))
                     for key, section_name in sections_list:
                         section_type, section_id = key.split("-")
@@ -1434,9 +2249,9 @@ class Account:
         if not order_divs:
             return None, [], locale, subcategories
 
-        sales = []
-        for div in order_divs:
-            classname = div.get("class")
+        rows = []
+        for row in order_divs:
+            classname = row.get("class", "").split()
             if "warning" in classname:
                 if not include_refunded:
                     continue
@@ -1450,10 +2265,28 @@ class Account:
                     continue
                 order_status = types.OrderStatuses.CLOSED
 
-            order_id = div.find("div", {"class": "tc-order"}).text[1:]
+            order_id = _lxml_text(_SALES_XPATHS["order_id"](row))[1:]
             if order_id in exclude_ids:
                 continue
 
+            row_html = _lxml_html(row)
+            row_hash = hash(row_html)
+            cached = self.__sales_rows.get(order_id)
+            rows.append((order_status, order_id, row_html, row_hash,
+                         cached[1] if cached and cached[0] == row_hash else None))
+
+        # все новые / изменившиеся строки разбираются одним документом
+        divs = iter(BeautifulSoup("".join(i[2] for i in rows if i[4] is None), "lxml")
+                    .find_all("a", {"class": "tc-item"}) if any(i[4] is None for i in rows) else [])
+        sales = []
+        for order_status, order_id, row_html, row_hash, cached in rows:
+            if cached:
+                order_obj = copy.copy(cached)
+                order_obj.subcategory = subcategories.get(order_obj.subcategory_name) if subcategories else None
+                sales.append(order_obj)
+                continue
+
+            div = next(divs)
             description = div.find("div", {"class": "order-desc"}).find("div").text
             tc_price = div.find("div", {"class": "tc-price"}).text
             price, currency = tc_price.rsplit(maxsplit=1)
@@ -1493,7 +2326,8 @@ class Account:
             chat_id = f"users-{id1}-{id2}"
             order_obj = types.OrderShortcut(order_id, description, price, currency, buyer_username, buyer_id, chat_id,
                                             order_status, order_date, subcategory_name, subcategory, str(div))
-            sales.append(order_obj)
+            self.__sales_rows[order_id] = (row_hash, order_obj)
+            sales.append(copy.copy(order_obj))
 
         return next_order_id, sales, locale, subcategories
 
@@ -1504,9 +2338,21 @@ class Account:
                   section: Optional[str] = None, server: Optional[int] = None,
                   side: Optional[int] = None, **more_filters) -> tuple[str | None, list[types.OrderShortcut]]:
         """Эта функция вскоре будет удалена. Используйте Account.get_sales()."""
-        start_from, orders, loc, subcs = self.get_sales(start_from, include_paid, include_closed, include_refunded,
-                                                        exclude_ids, id, buyer, state, game, section, server,
-                                                        side, None, None, **more_filters)
+        return self._execute(self._get_sells_flow(start_from, include_paid, include_closed, include_refunded,
+                                                  exclude_ids, id, buyer, state, game, section, server, side,
+                                                  **more_filters))
+
+    def _get_sells_flow(self, start_from: str | None = None, include_paid: bool = True, include_closed: bool = True,
+                        include_refunded: bool = True, exclude_ids: list[str] | None = None,
+                        id: Optional[str] = None, buyer: Optional[str] = None,
+                        state: Optional[Literal["closed", "paid", "refunded"]] = None, game: Optional[int] = None,
+                        section: Optional[str] = None, server: Optional[int] = None,
+                        side: Optional[int] = None,
+                        **more_filters) -> _Flow[tuple[str | None, list[types.OrderShortcut]]]:
+        start_from, orders, loc, subcs = yield from self._get_sales_flow(start_from, include_paid, include_closed,
+                                                                         include_refunded, exclude_ids, id, buyer,
+                                                                         state, game, section, server, side, None,
+                                                                         None, **more_filters)
         return start_from, orders
 
     def add_chats(self, chats: list[types.ChatShortcut]):
@@ -1526,6 +2372,9 @@ class Account:
         :return: объекты чатов (не больше 50).
         :rtype: :obj:`list` of :class:`FunPayAPI.types.ChatShortcut`
         """
+        return self._execute(self._request_chats_flow())
+
+    def _request_chats_flow(self) -> _Flow[list[types.ChatShortcut]]:
         chats = {
             "type": "chat_bookmarks",
             "id": self.id,
@@ -1542,7 +2391,7 @@ class Account:
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
             "x-requested-with": "XMLHttpRequest"
         }
-        response = self.method("post", "https://funpay.com/runner/", headers, payload, raise_not_200=True)
+        response = yield _MethodCall("post", "https://funpay.com/runner/", headers, payload, raise_not_200=True)
         json_response = response.json()
 
         msgs = ""
@@ -1591,10 +2440,13 @@ class Account:
         :return: словарь с сохраненными чатами.
         :rtype: :obj:`dict` {:obj:`int`: :class:`FunPayAPi.types.ChatShortcut`}
         """
+        return self._execute(self._get_chats_flow(update))
+
+    def _get_chats_flow(self, update: bool = False) -> _Flow[dict[int, types.ChatShortcut]]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         if update:
-            chats = self.request_chats()
+            chats = yield from self._request_chats_flow()
             self.add_chats(chats)
         return self.__saved_chats
 
@@ -1611,16 +2463,19 @@ class Account:
         :return: объект чата или :obj:`None`, если чат не был найден.
         :rtype: :class:`FunPayAPI.types.ChatShortcut` or :obj:`None`
         """
+        return self._execute(self._get_chat_by_name_flow(name, make_request))
+
+    def _get_chat_by_name_flow(self, name: str, make_request: bool = False) -> _Flow[types.ChatShortcut | None]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
-        for i in self.__saved_chats:
-            if self.__saved_chats[i].name == name:
-                return self.__saved_chats[i]
+        for chat in self.__saved_chats.values():
+            if chat.name == name:
+                return chat
 
         if make_request:
-            self.add_chats(self.request_chats())
-            return self.get_chat_by_name(name)
+            self.add_chats((yield from self._request_chats_flow()))
+            return (yield from self._get_chat_by_name_flow(name))
         else:
             return None
 
@@ -1637,17 +2492,24 @@ class Account:
         :return: объект чата или :obj:`None`, если чат не был найден.
         :rtype: :class:`FunPayAPI.types.ChatShortcut` or :obj:`None`
         """
+        return self._execute(self._get_chat_by_id_flow(chat_id, make_request))
+
+    def _get_chat_by_id_flow(self, chat_id: int, make_request: bool = False) -> _Flow[types.ChatShortcut | None]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
         if not make_request or chat_id in self.__saved_chats:
             return self.__saved_chats.get(chat_id)
 
-        self.add_chats(self.request_chats())
-        return self.get_chat_by_id(chat_id)
+        self.add_chats((yield from self._request_chats_flow()))
+        return (yield from self._get_chat_by_id_flow(chat_id))
 
     def calc(self, subcategory_type: enums.SubCategoryTypes, subcategory_id: int | None = None,
              game_id: int | None = None, price: int | float = 1000):
+        return self._execute(self._calc_flow(subcategory_type, subcategory_id, game_id, price))
+
+    def _calc_flow(self, subcategory_type: enums.SubCategoryTypes, subcategory_id: int | None = None,
+                   game_id: int | None = None, price: int | float = 1000):
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
@@ -1668,8 +2530,8 @@ class Account:
             "x-requested-with": "XMLHttpRequest"
         }
 
-        r = self.method("post", f"{type_}/calc", headers, {key: value, "price": price},
-                        raise_not_200=True)
+        r = yield _MethodCall("post", f"{type_}/calc", headers, {key: value, "price": price},
+                              raise_not_200=True)
         json_resp = r.json()
         if (error := json_resp.get("error")):
             raise Exception(f"Произошел бабах, не нашелся ответ: {error}")  # todo
@@ -1696,10 +2558,13 @@ class Account:
         :return: объект с полями лота.
         :rtype: :class:`FunPayAPI.types.LotFields`
         """
+        return self._execute(self._get_lot_fields_flow(lot_id))
+
+    def _get_lot_fields_flow(self, lot_id: int) -> _Flow[types.LotFields]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         headers = {}
-        response = self.method("get", f"lots/offerEdit?offer={lot_id}", headers, {}, raise_not_200=True)
+        response = yield _MethodCall("get", f"lots/offerEdit?offer={lot_id}", headers, {}, raise_not_200=True)
 
         html_response = response.content.decode()
         bs = BeautifulSoup(html_response, "lxml")
@@ -1731,11 +2596,85 @@ class Account:
                                  float(result["price"]), None, types.Currency.UNKNOWN, currency)
         return types.LotFields(lot_id, result, subcategory, currency, calc_result)
 
+    def get_lot_form_template(self, subcategory_id: int) -> types.LotFormTemplate:
+        """
+        Получает шаблон формы создания лота в подкатегории: значения полей по умолчанию, обязательные поля,
+        варианты select и скрытые поля.
+        Шаблон кэшируется на :attr:`lot_form_template_ttl` секунд (см. :meth:`invalidate_lot_form_template`),
+        поэтому создание нескольких лотов в одной подкатегории требует одного запроса формы.
+
+        :param subcategory_id: ID подкатегории.
+        :type subcategory_id: :obj:`int`
+
+        :return: шаблон формы создания лота.
+        :rtype: :class:`FunPayAPI.types.LotFormTemplate`
+        """
+        return self._execute_shared(("get_lot_form_template", subcategory_id),
+                                    self._get_lot_form_template_flow(subcategory_id))
+
+    def _get_lot_form_template_flow(self, subcategory_id: int) -> _Flow[types.LotFormTemplate]:
+        if not self.is_initiated:
+            raise exceptions.AccountNotInitiatedError()
+        cached = self.__lot_form_templates.get(subcategory_id)
+        if cached and time.time() - cached[0] < self.lot_form_template_ttl:
+            return cached[1]
+
+        response = yield _MethodCall("get", f"lots/offerEdit?offer=0&node={subcategory_id}", {}, {},
+                                     raise_not_200=True)
+        html_response = response.content.decode()
+        bs = BeautifulSoup(html_response, "lxml")
+        error_message = bs.find("p", class_="lead")
+        if error_message:
+            raise exceptions.LotParsingError(response, error_message.text, 0)
+
+        def is_hidden(field) -> bool:
+            group = field.find_parent(class_="form-group")
+            return group is not None and "hidden" in group.get("class", [])
+
+        fields, required, options, hidden, checked = {}, set(), {}, set(), set()
+        for field in bs.find_all(["input", "textarea", "select"]):
+            name = field.get("name")
+            if name is None:
+                continue
+            if field.get("required") is not None:
+                required.add(name)
+            if is_hidden(field):
+                hidden.add(name)
+            if field.name == "input":
+                fields[name] = field.get("value", "")
+                if field.get("type") == "checkbox" and field.get("checked") is not None:
+                    checked.add(name)
+            elif field.name == "textarea":
+                fields[name] = field.get_text(strip=True)
+            else:
+                options[name] = {i.get("value", ""): i.text.strip() for i in field.find_all("option")}
+                if (selected := field.find("option", selected=True)) is not None:
+                    fields[name] = selected.get("value", "")
+        self.csrf_token = fields.get("csrf_token") or self.csrf_token
+        template = types.LotFormTemplate(subcategory_id, fields, required, options, hidden, checked, html_response)
+        self.__lot_form_templates[subcategory_id] = (time.time(), template)
+        return template
+
+    def invalidate_lot_form_template(self, subcategory_id: int | None = None):
+        """
+        Удаляет шаблон формы создания лота из кэша (например, если FunPay отклонил лот, созданный по шаблону).
+
+        :param subcategory_id: ID подкатегории (None - удалить шаблоны всех подкатегорий).
+        :type subcategory_id: :obj:`int` or :obj:`None`, опционально
+        """
+        if subcategory_id is None:
+            self.__lot_form_templates.clear()
+        else:
+            self.__lot_form_templates.pop(subcategory_id, None)
+
     def get_chip_fields(self, subcategory_id: int) -> types.ChipFields:
+        return self._execute(self._get_chip_fields_flow(subcategory_id))
+
+    def _get_chip_fields_flow(self, subcategory_id: int) -> _Flow[types.ChipFields]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         headers = {}
-        response = self.method("get", f"chips/{subcategory_id}/trade", headers, {}, raise_not_200=True)
+        response = yield _MethodCall("get", f"chips/{subcategory_id}/trade", headers, {}, raise_not_200=True)
 
         html_response = response.content.decode()
         bs = BeautifulSoup(html_response, "lxml")
@@ -1750,6 +2689,9 @@ class Account:
         :param offer_fields: объект с полями лота.
         :type offer_fields: :class:`FunPayAPI.types.LotFields`
         """
+        return self._execute(self._save_offer_flow(offer_fields))
+
+    def _save_offer_flow(self, offer_fields: types.LotFields | types.ChipFields):
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         headers = {
@@ -1768,7 +2710,7 @@ class Account:
             id_ = offer_fields.subcategory_id
             fields = offer_fields.renew_fields().fields
             api_method = "chips/saveOffers"
-        response = self.method("post", api_method, headers, fields, raise_not_200=True)
+        response = yield _MethodCall("post", api_method, headers, fields, raise_not_200=True)
         json_response = response.json()
         errors_dict = {}
         if (errors := json_response.get("errors")) or json_response.get("error"):
@@ -1779,10 +2721,10 @@ class Account:
             raise exceptions.LotSavingError(response, json_response.get("error"), id_, errors_dict)
 
     def save_chip(self, chip_fields: types.ChipFields):
-        self.save_offer(chip_fields)
+        return self.save_offer(chip_fields)
 
     def save_lot(self, lot_fields: types.LotFields):
-        self.save_offer(lot_fields)
+        return self.save_offer(lot_fields)
 
     def delete_lot(self, lot_id: int) -> None:
         """
@@ -1791,7 +2733,8 @@ class Account:
         :param lot_id: ID лота.
         :type lot_id: :obj:`int`
         """
-        self.save_lot(types.LotFields(lot_id, {"csrf_token": self.csrf_token, "offer_id": lot_id, "deleted": "1"}))
+        return self.save_lot(types.LotFields(lot_id, {"csrf_token": self.csrf_token, "offer_id": lot_id,
+                                                      "deleted": "1"}))
 
     def get_exchange_rate(self, currency: types.Currency) -> tuple[float, types.Currency]:
         """
@@ -1804,11 +2747,14 @@ class Account:
         :return: Кортеж, содержащий коэффициент обмена и текущую валюту аккаунта.
         :rtype: :obj:`tuple[float, types.Currency]`
         """
-        r = self.method("post", "https://funpay.com/account/switchCurrency",
-                        {"accept": "*/*", "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
-                         "x-requested-with": "XMLHttpRequest"},
-                        {"cy": currency.code, "csrf_token": self.csrf_token, "confirmed": "false"},
-                        raise_not_200=True)
+        return self._execute(self._get_exchange_rate_flow(currency))
+
+    def _get_exchange_rate_flow(self, currency: types.Currency) -> _Flow[tuple[float, types.Currency]]:
+        r = yield _MethodCall("post", "https://funpay.com/account/switchCurrency",
+                              {"accept": "*/*", "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
+                               "x-requested-with": "XMLHttpRequest"},
+                              {"cy": currency.code, "csrf_token": self.csrf_token, "confirmed": "false"},
+                              raise_not_200=True)
         b = json.loads(r.text)
         if "url" in b and not b["url"]:
             self.currency = currency
@@ -1840,7 +2786,7 @@ class Account:
         :return: объект категории (игры) или :obj:`None`, если категория не была найдена.
         :rtype: :class:`FunPayAPI.types.Category` or :obj:`None`
         """
-        return self.__sorted_categories.get(category_id)
+        return self.__get_catalog()[1].get(category_id)
 
     @property
     def categories(self) -> list[types.Category]:
@@ -1850,7 +2796,7 @@ class Account:
         :return: все категории (игры) FunPay.
         :rtype: :obj:`list` of :class:`FunPayAPI.types.Category`
         """
-        return self.__categories
+        return self.__get_catalog()[0]
 
     def get_sorted_categories(self) -> dict[int, types.Category]:
         """
@@ -1860,7 +2806,7 @@ class Account:
         :return: все категории (игры) FunPay в виде словаря {ID: категория}
         :rtype: :obj:`dict` {:obj:`int`: :class:`FunPayAPI.types.Category`}
         """
-        return self.__sorted_categories
+        return self.__get_catalog()[1]
 
     def get_subcategory(self, subcategory_type: types.SubCategoryTypes,
                         subcategory_id: int) -> types.SubCategory | None:
@@ -1876,7 +2822,7 @@ class Account:
         :return: объект подкатегории или :obj:`None`, если подкатегория не была найдена.
         :rtype: :class:`FunPayAPI.types.SubCategory` or :obj:`None`
         """
-        return self.__sorted_subcategories[subcategory_type].get(subcategory_id)
+        return self.__get_catalog()[3][subcategory_type].get(subcategory_id)
 
     @property
     def subcategories(self) -> list[types.SubCategory]:
@@ -1886,7 +2832,7 @@ class Account:
         :return: все подкатегории FunPay.
         :rtype: :obj:`list` of :class:`FunPayAPI.types.SubCategory`
         """
-        return self.__subcategories
+        return self.__get_catalog()[2]
 
     def get_sorted_subcategories(self) -> dict[types.SubCategoryTypes, dict[int, types.SubCategory]]:
         """
@@ -1896,15 +2842,18 @@ class Account:
         :return: все подкатегории FunPay в виде словаря {тип подкатегории: {ID: подкатегория}}
         :rtype: :obj:`dict` {:class:`FunPayAPI.common.enums.SubCategoryTypes`: :obj:`dict` {:obj:`int` :class:`FunPayAPI.types.SubCategory`}}
         """
-        return self.__sorted_subcategories
+        return self.__get_catalog()[3]
 
     def logout(self) -> None:
         """
         Выходит с аккаунта FunPay (сбрасывает golden_key).
         """
+        return self._execute(self._logout_flow())
+
+    def _logout_flow(self) -> _Flow[None]:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
-        self.method("get", self._logout_link, {"accept": "*/*"}, {}, raise_not_200=True)
+        yield _MethodCall("get", self._logout_link, {"accept": "*/*"}, {}, raise_not_200=True)
 
     @property
     def is_initiated(self) -> bool:
@@ -1916,55 +2865,17 @@ class Account:
         """
         return self.__initiated
 
-    def __setup_categories(self, html: str):
-        """
-        Парсит категории и подкатегории с основной страницы и добавляет их в свойства класса.
-
-        :param html: HTML страница.
-        """
-        parser = BeautifulSoup(html, "lxml")
-        games_table = parser.find_all("div", {"class": "promo-game-list"})
-        if not games_table:
-            return
-
-        games_table = games_table[1] if len(games_table) > 1 else games_table[0]
-        games_divs = games_table.find_all("div", {"class": "promo-game-item"})
-        if not games_divs:
-            return
-        game_position = 0
-        subcategory_position = 0
-        for i in games_divs:
-            gid = int(i.find("div", {"class": "game-title"}).get("data-id"))
-            gname = i.find("a").text
-            regional_games = {
-                gid: types.Category(gid, gname, position=game_position)
-            }
-            game_position += 1
-            if regional_divs := i.find("div", {"role": "group"}):
-                for btn in regional_divs.find_all("button"):
-                    regional_game_id = int(btn["data-id"])
-                    regional_games[regional_game_id] = types.Category(regional_game_id, f"{gname} ({btn.text})",
-                                                                      position=game_position)
-                    game_position += 1
-
-            subcategories_divs = i.find_all("ul", {"class": "list-inline"})
-            for j in subcategories_divs:
-                j_game_id = int(j["data-id"])
-                subcategories = j.find_all("li")
-                for k in subcategories:
-                    a = k.find("a")
-                    name, link = a.text, a["href"]
-                    stype = types.SubCategoryTypes.CURRENCY if "chips" in link else types.SubCategoryTypes.COMMON
-                    sid = int(link.split("/")[-2])
-                    sobj = types.SubCategory(sid, name, stype, regional_games[j_game_id], subcategory_position)
-                    subcategory_position += 1
-                    regional_games[j_game_id].add_subcategory(sobj)
-                    self.__subcategories.append(sobj)
-                    self.__sorted_subcategories[stype][sid] = sobj
-
-            for gid in regional_games:
-                self.__categories.append(regional_games[gid])
-                self.__sorted_categories[gid] = regional_games[gid]
+    def __get_catalog(self) -> _Catalog:
+        """
+        Возвращает каталог категорий и подкатегорий (при первом обращении берет его из общего кэша процесса /
+        снимка на диске или парсит с основной страницы, полученной при первом Account.get()).
+        """
+        if self.__catalog is None:
+            if not self.is_initiated:
+                return _build_catalog([])
+            self.__catalog = _catalog_cache.get(self.__catalog_locale, self.html, self.categories_cache_path,
+                                                self.categories_cache_ttl)
+        return self.__catalog
 
     def __parse_messages(self, json_messages: dict, chat_id: int | str,
                          interlocutor_id: Optional[int] = None, interlocutor_username: Optional[str] = None,
@@ -1975,20 +2886,25 @@ class Account:
         if interlocutor_id is not None:
             ids[interlocutor_id] = interlocutor_username
 
+        x = _MESSAGE_XPATHS
+        # HTML каждого сообщения разбирается один раз: ссылки на пользователей и метки автоответа
+        # запоминаются здесь и используются ниже, когда станут известны ники и бейджи всех авторов.
+        parsed = []
         for i in json_messages:
             if i["id"] < from_id:
                 continue
             author_id = i["author"]
-            parser = BeautifulSoup(i["html"].replace("<br>", "\n"), "lxml")
+            parser = etree.HTML(i["html"].replace("<br>", "\n"))
+            author_div = x["author"](parser)
+            author_div = author_div[0] if author_div else None
 
             # Если ник или бейдж написавшего неизвестен, но есть блок с данными об авторе сообщения
-            if None in [ids.get(author_id), badges.get(author_id)] and (
-                    author_div := parser.find("div", {"class": "media-user-name"})):
+            if None in [ids.get(author_id), badges.get(author_id)] and author_div is not None:
                 if badges.get(author_id) is None:
-                    badge = author_div.find("span", {"class": "chat-msg-author-label label label-success"})
-                    badges[author_id] = badge.text if badge else 0
+                    badge = _lxml_text(x["badge"](author_div))
+                    badges[author_id] = badge if badge is not None else 0
                 if ids.get(author_id) is None:
-                    author = author_div.find("a").text.strip()
+                    author = _lxml_text(x["author_link"](author_div)).strip()
                     ids[author_id] = author
                     if self.chat_id_private(chat_id) and author_id == interlocutor_id and not interlocutor_username:
                         interlocutor_username = author
@@ -1996,9 +2912,10 @@ class Account:
             by_bot = False
             by_vertex = False
             image_name = None
-            if self.chat_id_private(chat_id) and (image_tag := parser.find("a", {"class": "chat-img-link"})):
-                image_name = image_tag.find("img")
-                image_name = image_name.get('alt') if image_name else None
+            if self.chat_id_private(chat_id) and (image_tag := x["image_link"](parser)):
+                image_tag = image_tag[0]
+                image_name = x["image"](image_tag)
+                image_name = image_name[0].get('alt') if image_name else None
                 image_link = image_tag.get("href")
                 message_text = None
                 # "Отправлено_с_помощью_бота_FunPay_Cardinal.png", "funpay_cardinal_image.png"
@@ -2010,9 +2927,9 @@ class Account:
             else:
                 image_link = None
                 if author_id == 0:
-                    message_text = parser.find("div", role="alert").text.strip()
+                    message_text = _lxml_text(x["alert"](parser)).strip()
                 else:
-                    message_text = parser.find("div", {"class": "chat-msg-text"}).text
+                    message_text = _lxml_text(x["text"](parser))
 
                 if message_text.startswith(self.__bot_character) or \
                         message_text.startswith(self.__old_bot_character) and author_id == self.id:
@@ -2028,13 +2945,16 @@ class Account:
             message_obj.by_vertex = by_vertex
             message_obj.type = types.MessageTypes.NON_SYSTEM if author_id != 0 else message_obj.get_message_type()
 
+            default_label = _lxml_text(x["default_label"](author_div)) if author_div is not None else None
+            users = [(_lxml_text([a]), a.get("href")) for a in x["users"](parser)] \
+                if message_obj.type != types.MessageTypes.NON_SYSTEM else []
             messages.append(message_obj)
+            parsed.append((message_obj, default_label, users))
 
-        for i in messages:
+        for i, default_label, users in parsed:
             i.author = ids.get(i.author_id)
             i.chat_name = interlocutor_username
             i.badge = badges.get(i.author_id) if badges.get(i.author_id) != 0 else None
-            parser = BeautifulSoup(i.html, "lxml")
             if i.badge:
                 i.is_employee = True
                 if i.badge in ("поддержка", "підтримка", "support"):
@@ -2043,18 +2963,14 @@ class Account:
                     i.is_moderation = True
                 elif i.badge in ("арбитраж", "арбітраж", "arbitration"):
                     i.is_arbitration = True
-            default_label = parser.find("div", {"class": "media-user-name"})
-            default_label = default_label.find("span", {
-                "class": "chat-msg-author-label label label-default"}) if default_label else None
             if default_label:
-                if default_label.text in ("автовідповідь", "автоответ", "auto-reply"):
+                if default_label in ("автовідповідь", "автоответ", "auto-reply"):
                     i.is_autoreply = True
-            i.badge = default_label.text if (i.badge is None and default_label is not None) else i.badge
+            i.badge = default_label if (i.badge is None and default_label is not None) else i.badge
             if i.type != types.MessageTypes.NON_SYSTEM:
-                users = parser.find_all('a', href=lambda href: href and '/users/' in href)
                 if users:
-                    i.initiator_username = users[0].text
-                    i.initiator_id = int(users[0]["href"].split("/")[-2])
+                    i.initiator_username = users[0][0]
+                    i.initiator_id = int(users[0][1].split("/")[-2])
                     if i.type in (types.MessageTypes.ORDER_PURCHASED, types.MessageTypes.ORDER_CONFIRMED,
                                   types.MessageTypes.NEW_FEEDBACK,
                                   types.MessageTypes.FEEDBACK_CHANGED,
@@ -2074,7 +2990,7 @@ class Account:
                             i.i_am_seller = False
                             i.i_am_buyer = True
                     elif len(users) > 1:
-                        last_user_id = int(users[-1]["href"].split("/")[-2])
+                        last_user_id = int(users[-1][1].split("/")[-2])
                         if i.type == types.MessageTypes.ORDER_CONFIRMED_BY_ADMIN:
                             if last_user_id == self.id:
                                 i.i_am_seller = True
@@ -2092,7 +3008,7 @@ class Account:
 
         return messages
 
-    def __update_csrf_token(self, parser: BeautifulSoup):
+    def __update_csrf_token(self, parser: BeautifulSoup | lxml.html.HtmlElement):
         try:
             app_data = json.loads(parser.find("body").get("data-app-data"))
             self.csrf_token = app_data.get("csrf-token") or self.csrf_token
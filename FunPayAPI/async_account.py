@@ -0,0 +1,234 @@
+"""
+В данном модуле описан асинхронный аккаунт FunPay (требует aiohttp).
+"""
+from __future__ import annotations
+from typing import Literal, Any, Optional, AsyncGenerator
+from urllib.parse import urlencode
+
+from requests.cookies import cookiejar_from_dict
+from requests.structures import CaseInsensitiveDict
+from requests_toolbelt import MultipartEncoder
+import requests
+import asyncio
+import aiohttp
+
+from .account import Account, _Flow, _T
+from .common import enums, utils
+from . import types
+
+
+class AsyncAccount(Account):
+    """
+    Асинхронная версия :class:`FunPayAPI.account.Account` на aiohttp.
+
+    Все методы, отправляющие запросы к FunPay (:meth:`get`, :meth:`get_subcategory_public_lots`,
+    :meth:`get_lot_page`, :meth:`get_lot_fields`, :meth:`save_lot`, :meth:`send_message`, :meth:`get_sales` и т.д.),
+    возвращают корутины. Параметры, возвращаемые значения и разбор ответов FunPay те же, что и у
+    :class:`FunPayAPI.account.Account`: оба класса выполняют одни и те же сценарии запросов (Account._*_flow).
+    :meth:`iter_subcategory_public_lots` возвращает асинхронный генератор (`async for`).
+
+    Параметры конструктора те же, что и у :class:`FunPayAPI.account.Account`. Пул соединений aiohttp:
+    не больше `pool_maxsize` соединений с одним хостом, не больше `pool_connections` * `pool_maxsize` всего,
+    keep-alive соединения закрываются через `pool_idle_timeout` секунд простоя.
+
+    После работы необходимо закрыть сессию с помощью :meth:`close` (или использовать `async with`).
+    """
+
+    def __init__(self, golden_key: str, user_agent: str | None = None,
+                 requests_timeout: int | float = 10, proxy: Optional[dict] = None,
+                 locale: Literal["ru", "en", "uk"] | None = None, pool_connections: int = 10,
+                 pool_maxsize: int = 10, pool_idle_timeout: int | float = 60,
+                 rate_limits: dict[enums.RequestTypes, tuple[float, float]] | None = None):
+        super(AsyncAccount, self).__init__(golden_key, user_agent, requests_timeout, proxy, locale, pool_connections,
+                                           pool_maxsize, pool_idle_timeout, rate_limits)
+        self.pool_connections: int = pool_connections
+        """Кол-во пулов соединений (общий лимит соединений - pool_connections * pool_maxsize)."""
+        self.pool_maxsize: int = pool_maxsize
+        """Макс. кол-во соединений с одним хостом."""
+        self.__aiohttp_session: aiohttp.ClientSession | None = None
+        self.__shared_session: bool = False
+        """Задана ли HTTP-сессия извне (общая с другими аккаунтами)."""
+        self.__in_flight: dict[tuple, asyncio.Task] = {}
+        """Выполняемые в данный момент сценарии запросов, результат которых можно разделить (см. _execute_shared)."""
+
+    @property
+    def aiohttp_session(self) -> aiohttp.ClientSession:
+        """
+        Возвращает HTTP-сессию aiohttp (создается при первом запросе внутри event loop'а).
+
+        :return: HTTP-сессия aiohttp.
+        :rtype: :class:`aiohttp.ClientSession`
+        """
+        if self.__aiohttp_session is None or self.__aiohttp_session.closed:
+            self.__aiohttp_session = self._new_aiohttp_session()
+            self.__shared_session = False
+        return self.__aiohttp_session
+
+    @aiohttp_session.setter
+    def aiohttp_session(self, session: aiohttp.ClientSession):
+        """
+        Задает HTTP-сессию aiohttp, общую с другими аккаунтами (например, работающими через один прокси).
+        Такую сессию :meth:`close` не закрывает: её закрывает владелец.
+        """
+        self.__aiohttp_session = session
+        self.__shared_session = True
+
+    def _new_aiohttp_session(self, pool_maxsize: int | None = None) -> aiohttp.ClientSession:
+        """
+        Создает HTTP-сессию aiohttp с настройками пула соединений аккаунта (вызывать внутри event loop'а).
+
+        :param pool_maxsize: макс. кол-во соединений (всего и с одним хостом) вместо настроек пула аккаунта,
+            например, для сессии, общей для нескольких аккаунтов.
+        """
+        limit = pool_maxsize or self.pool_connections * self.pool_maxsize
+        connector = aiohttp.TCPConnector(limit=limit, limit_per_host=pool_maxsize or self.pool_maxsize,
+                                         keepalive_timeout=self.pool_idle_timeout or None)
+        timeout = aiohttp.ClientTimeout(sock_connect=self.requests_timeout, sock_read=self.requests_timeout)
+        # куки передаются вручную в заголовках, поэтому не даем сессии копить их у себя
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, cookie_jar=aiohttp.DummyCookieJar())
+
+    async def close(self) -> None:
+        """
+        Закрывает HTTP-сессию aiohttp (если она не общая, см. :attr:`aiohttp_session`).
+        """
+        if self.__aiohttp_session is not None and not self.__aiohttp_session.closed and not self.__shared_session:
+            await self.__aiohttp_session.close()
+        self.session.close()
+
+    async def __aenter__(self) -> AsyncAccount:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def _execute(self, flow: _Flow[_T]) -> _T:
+        """
+        Асинхронная версия :meth:`FunPayAPI.account.Account._execute`.
+        """
+        try:
+            call = next(flow)
+            while True:
+                try:
+                    response = await self.method(*call.args, **call.kwargs)
+                except Exception as e:
+                    call = flow.throw(e)
+                else:
+                    call = flow.send(response)
+        except StopIteration as e:
+            return e.value
+
+    async def _execute_shared(self, key: tuple, flow: _Flow[_T]) -> _T:
+        """
+        Асинхронная версия :meth:`FunPayAPI.account.Account._execute_shared`.
+        """
+        task = self.__in_flight.get(key)
+        if task is None:
+            task = self.__in_flight[key] = asyncio.ensure_future(self._execute(flow))
+            task.add_done_callback(lambda _: self.__in_flight.pop(key, None))
+        else:
+            flow.close()
+        # отмена одного из ожидающих не должна отменять запрос для остальных
+        return await asyncio.shield(task)
+
+    async def method(self, request_method: Literal["post", "get"], api_method: str, headers: dict, payload: Any,
+                     exclude_phpsessid: bool = False, raise_not_200: bool = False,
+                     locale: Literal["ru", "en", "uk"] | None = None, stream: bool = False,
+                     pin_locale: bool = False) -> requests.Response:
+        """
+        Асинхронная версия :meth:`FunPayAPI.account.Account.method`.
+
+        :param stream: не загружать тело ответа сразу: ответ aiohttp (:class:`aiohttp.ClientResponse`) доступен
+            в response.raw, его необходимо освободить (response.raw.release()) после чтения.
+        :type stream: :obj:`bool`
+
+        :return: объект ответа (ответ aiohttp, приведенный к :class:`requests.Response`).
+        :rtype: :class:`requests.Response`
+        """
+        link = self._prepare_request(request_method, api_method, headers, exclude_phpsessid, locale, pin_locale)
+        request_type = utils.RateLimiter.classify(request_method, api_method, payload)
+        if self.rate_limiter and (delay := self.rate_limiter.reserve(request_type)):
+            await asyncio.sleep(delay)
+        body = self.__encode_payload(payload, headers)
+        for i in range(10):
+            response = await self.__request(request_method, link, headers, body, allow_redirects=False,
+                                            stream=stream)
+            if not (300 <= response.status_code < 400) or 'Location' not in response.headers:
+                break
+            link = response.headers['Location']
+            if not pin_locale:
+                self._update_locale(link)
+        else:
+            response = await self.__request(request_method, link, headers, body, stream=stream)
+        return self._check_response(response, raise_not_200, request_type)
+
+    async def iter_subcategory_public_lots(self, subcategory_type: enums.SubCategoryTypes, subcategory_id: int,
+                                           locale: Literal["ru", "en", "uk"] | None = None) \
+            -> AsyncGenerator[types.LotShortcut, None]:
+        """
+        Асинхронная версия :meth:`FunPayAPI.account.Account.iter_subcategory_public_lots` (async for).
+        """
+        flow = self._iter_subcategory_public_lots_flow(subcategory_type, subcategory_id, locale)
+        call = next(flow)
+        response = None
+        try:
+            response = await self.method(*call.args, **call.kwargs)
+            flow.send(response)
+            async for chunk in response.raw.content.iter_chunked(65536):
+                for lot in flow.send(chunk):
+                    yield lot
+            for lot in flow.send(None):
+                yield lot
+        finally:
+            flow.close()
+            if response is not None:
+                response.raw.release()
+
+    async def __request(self, request_method: Literal["post", "get"], url: str, headers: dict, body: bytes | None,
+                        allow_redirects: bool = True, stream: bool = False) -> requests.Response:
+        proxy = (self.proxy or {}).get("https") or (self.proxy or {}).get("http")
+        resp = await self.aiohttp_session.request(request_method.upper(), url, headers=headers, data=body,
+                                                  proxy=proxy, allow_redirects=allow_redirects)
+        if stream and resp.status == 200:
+            content = b""
+        else:
+            try:
+                content = await resp.read()
+            finally:
+                resp.release()
+
+        # Сценарии запросов и исключения работают с requests.Response, поэтому приводим ответ к нему.
+        response = requests.Response()
+        response._content = content
+        response.raw = resp
+        response.status_code = resp.status
+        response.reason = resp.reason
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response.encoding = resp.charset
+        response.url = str(resp.url)
+        response.cookies = cookiejar_from_dict({name: morsel.value for name, morsel in resp.cookies.items()})
+        request = requests.PreparedRequest()
+        request.method = request_method.upper()
+        request.url = url
+        request.headers = CaseInsensitiveDict(headers)
+        request.body = body
+        response.request = request
+        return response
+
+    @staticmethod
+    def __encode_payload(payload: Any, headers: dict) -> bytes | None:
+        """
+        Кодирует полезную нагрузку так же, как это делает requests.
+        """
+        if isinstance(payload, MultipartEncoder):
+            return payload.to_string()
+        if not payload:
+            return None
+        if isinstance(payload, dict):
+            fields = []
+            for key, value in payload.items():
+                values = value if isinstance(value, (list, tuple)) else [value]
+                fields.extend((key, i) for i in values if i is not None)
+            if not any(i.lower() == "content-type" for i in headers):
+                headers["content-type"] = "application/x-www-form-urlencoded"
+            return urlencode(fields).encode()
+        return payload.encode() if isinstance(payload, str) else payload
@@ -160,3 +160,21 @@ class Wallet(Enum):
     """WebMoney WMZ."""
     YOUMONEY = 7
     """ЮMoney."""
+
+
+class RequestTypes(Enum):
+    """
+    В данном классе перечислены типы запросов к FunPay, у каждого из которых свой лимит частоты.
+    """
+    PAGE = 0
+    """Получение страниц (GET запросы)."""
+    RUNNER = 1
+    """Запросы к runner'у (получение обновлений)."""
+    CHAT_MESSAGE = 2
+    """Отправка сообщений в чат (запросы к runner'у с полем request)."""
+    OFFER_SAVE = 3
+    """Сохранение лотов (lots/offerSave)."""
+    IMAGE_UPLOAD = 4
+    """Выгрузка изображений (file/addChatImage, file/addOfferImage)."""
+    OTHER = 5
+    """Прочие POST запросы."""
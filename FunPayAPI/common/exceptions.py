@@ -115,10 +115,15 @@ class MessageNotDeliveredError(RequestFailedError):
     Исключение, которое возбуждается, если при отправке сообщения произошла ошибка.
     """
 
-    def __init__(self, response: requests.Response, error_message: str | None, chat_id: int):
+    def __init__(self, response: requests.Response, error_message: str | None, chat_id: int,
+                 flood: bool = False, multiuser_flood: bool = False):
         super(MessageNotDeliveredError, self).__init__(response)
         self.error_message = error_message
         self.chat_id = chat_id
+        self.flood = flood
+        """Сообщения в этот чат отправляются слишком часто."""
+        self.multiuser_flood = multiuser_flood
+        """Сообщения разным пользователям отправляются слишком часто."""
         if not self.error_message:
             self.log_response = True
 
@@ -0,0 +1,124 @@
+"""
+В данном модуле описан постоянный кэш изображений, выгруженных на FunPay (SQLite).
+"""
+from __future__ import annotations
+
+from contextlib import closing
+import threading
+import hashlib
+import sqlite3
+import logging
+import time
+
+logger = logging.getLogger("FunPayAPI.image_cache")
+
+
+class ImageCache:
+    """
+    Кэш ID изображений, выгруженных на FunPay ({аккаунт, хэш содержимого: fileId}), в файле SQLite.
+    Одинаковые изображения (например, общие для нескольких лотов продавца) выгружаются аккаунтом один раз,
+    в т.ч. после перезапуска.
+
+    В одном файле можно хранить изображения нескольких аккаунтов.
+
+    :param path: путь к файлу SQLite.
+    :type path: :obj:`str`
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        """Путь к файлу SQLite."""
+        self.__lock = threading.Lock()
+        with self.__lock, closing(self.__connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS images (account_id INTEGER NOT NULL, type TEXT NOT NULL, "
+                         "digest TEXT NOT NULL, file_id INTEGER NOT NULL, saved_at REAL NOT NULL, "
+                         "PRIMARY KEY (account_id, type, digest))")
+
+    def __connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    @staticmethod
+    def digest(image: bytes) -> str:
+        """
+        Возвращает хэш содержимого изображения.
+
+        :param image: изображение.
+        :type image: :obj:`bytes`
+
+        :return: SHA-256 изображения (hex).
+        :rtype: :obj:`str`
+        """
+        return hashlib.sha256(image).hexdigest()
+
+    def get(self, account_id: int, type_: str, digest: str) -> int | None:
+        """
+        Возвращает ID ранее выгруженного изображения.
+
+        :param account_id: ID аккаунта.
+        :type account_id: :obj:`int`
+
+        :param type_: тип изображения ("chat" / "offer").
+        :type type_: :obj:`str`
+
+        :param digest: хэш содержимого изображения (см. :meth:`digest`).
+        :type digest: :obj:`str`
+
+        :return: ID изображения на серверах FunPay или None, если изображение не выгружалось.
+        :rtype: :obj:`int` or :obj:`None`
+        """
+        try:
+            with self.__lock, closing(self.__connect()) as conn:
+                row = conn.execute("SELECT file_id FROM images WHERE account_id = ? AND type = ? AND digest = ?",
+                                   (account_id, type_, digest)).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error:
+            logger.warning(f"Не удалось прочитать кэш изображений {self.path}.")
+            logger.debug("TRACEBACK", exc_info=True)
+            return None
+
+    def save(self, account_id: int, type_: str, digest: str, file_id: int):
+        """
+        Сохраняет ID выгруженного изображения.
+
+        :param account_id: ID аккаунта.
+        :type account_id: :obj:`int`
+
+        :param type_: тип изображения ("chat" / "offer").
+        :type type_: :obj:`str`
+
+        :param digest: хэш содержимого изображения (см. :meth:`digest`).
+        :type digest: :obj:`str`
+
+        :param file_id: ID изображения на серверах FunPay.
+        :type file_id: :obj:`int`
+        """
+        try:
+            with self.__lock, closing(self.__connect()) as conn, conn:
+                conn.execute("INSERT OR REPLACE INTO images (account_id, type, digest, file_id, saved_at) "
+                             "VALUES (?, ?, ?, ?, ?)", (account_id, type_, digest, file_id, time.time()))
+        except sqlite3.Error:
+            logger.warning(f"Не удалось сохранить изображение в кэш {self.path}.")
+            logger.debug("TRACEBACK", exc_info=True)
+
+    def delete(self, account_id: int, type_: str | None = None, digest: str | None = None):
+        """
+        Удаляет изображения аккаунта из кэша (например, если FunPay перестал принимать сохраненный ID).
+
+        :param account_id: ID аккаунта.
+        :type account_id: :obj:`int`
+
+        :param type_: тип изображений (None - все типы).
+        :type type_: :obj:`str` or :obj:`None`, опционально
+
+        :param digest: хэш содержимого изображения (None - все изображения).
+        :type digest: :obj:`str` or :obj:`None`, опционально
+        """
+        query, args = "DELETE FROM images WHERE account_id = ?", [account_id]
+        if type_ is not None:
+            query += " AND type = ?"
+            args.append(type_)
+        if digest is not None:
+            query += " AND digest = ?"
+            args.append(digest)
+        with self.__lock, closing(self.__connect()) as conn, conn:
+            conn.execute(query, args)
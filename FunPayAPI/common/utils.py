@@ -4,8 +4,11 @@
 
 import string
 import random
+import threading
+import time
 import re
-from .enums import Currency
+from collections import OrderedDict
+from .enums import Currency, RequestTypes, MessageTypes
 
 MONTHS = {
     "января": 1,
@@ -75,6 +78,215 @@ def parse_wait_time(response: str) -> int:
         return 10
 
 
+class TokenBucket:
+    """
+    Адаптивный token bucket: ограничивает частоту запросов одного типа.
+    При ошибках 429 / флуда частота уменьшается вдвое, после каждого успешного запроса понемногу растет обратно.
+
+    :param rate: начальная частота (запросов в секунду).
+    :param burst: сколько запросов можно отправить подряд без ожидания.
+    :param max_rate: максимальная частота (по умолчанию - начальная).
+    :param min_rate: минимальная частота (по умолчанию - 1/16 начальной).
+    """
+
+    def __init__(self, rate: float, burst: float, max_rate: float | None = None, min_rate: float | None = None):
+        self.rate: float = rate
+        """Текущая частота (запросов в секунду)."""
+        self.burst: float = burst
+        """Сколько запросов можно отправить подряд без ожидания."""
+        self.max_rate: float = max_rate or rate
+        """Максимальная частота."""
+        self.min_rate: float = min_rate or rate / 16
+        """Минимальная частота."""
+        self.__tokens: float = burst
+        self.__last_update: float = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Резервирует место для одного запроса.
+
+        :return: сколько секунд нужно подождать перед запросом.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__last_update) * self.rate)
+            self.__last_update = now
+            self.__tokens -= 1
+            return 0 if self.__tokens >= 0 else -self.__tokens / self.rate
+
+    def penalize(self):
+        """
+        Уменьшает частоту вдвое и сбрасывает накопленные токены (FunPay ответил 429 / ошибкой флуда).
+        """
+        with self.__lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.__tokens = min(self.__tokens, 0)
+
+    def reward(self):
+        """
+        Понемногу увеличивает частоту после успешного запроса (за ~20 успешных запросов на каждую единицу max_rate
+        частота восстанавливается полностью).
+        """
+        with self.__lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов аккаунта: отдельный :class:`TokenBucket` для каждого типа запросов.
+
+    :param limits: частоты и burst'ы по типам запросов ({тип: (запросов в секунду, burst)}). Не указанные типы
+        берутся из :attr:`RateLimiter.DEFAULT_LIMITS`.
+    """
+
+    DEFAULT_LIMITS: dict[RequestTypes, tuple[float, float]] = {
+        RequestTypes.PAGE: (4, 8),
+        RequestTypes.RUNNER: (2, 4),
+        RequestTypes.CHAT_MESSAGE: (1, 3),
+        RequestTypes.OFFER_SAVE: (1, 3),
+        RequestTypes.IMAGE_UPLOAD: (1, 3),
+        RequestTypes.OTHER: (2, 4),
+    }
+    """Лимиты по умолчанию: {тип запроса: (запросов в секунду, burst)}."""
+
+    def __init__(self, limits: dict[RequestTypes, tuple[float, float]] | None = None):
+        limits = {**self.DEFAULT_LIMITS, **(limits or {})}
+        self.buckets: dict[RequestTypes, TokenBucket] = {t: TokenBucket(rate, burst)
+                                                          for t, (rate, burst) in limits.items()}
+        """Token bucket'ы по типам запросов."""
+
+    @staticmethod
+    def classify(request_method: str, api_method: str, payload) -> RequestTypes:
+        """
+        Определяет тип запроса.
+
+        :param request_method: метод запроса ("get" / "post").
+        :param api_method: метод API / полная ссылка.
+        :param payload: полезная нагрузка.
+
+        :return: тип запроса.
+        """
+        if request_method == "get":
+            return RequestTypes.PAGE
+        if "runner/" in api_method:
+            if isinstance(payload, dict) and payload.get("request"):
+                return RequestTypes.CHAT_MESSAGE
+            return RequestTypes.RUNNER
+        if "lots/offerSave" in api_method:
+            return RequestTypes.OFFER_SAVE
+        if "file/add" in api_method:
+            return RequestTypes.IMAGE_UPLOAD
+        return RequestTypes.OTHER
+
+    def reserve(self, request_type: RequestTypes) -> float:
+        """
+        Резервирует место для запроса указанного типа.
+
+        :return: сколько секунд нужно подождать перед запросом.
+        """
+        return self.buckets[request_type].reserve()
+
+    def penalize(self, request_type: RequestTypes):
+        """
+        Уменьшает частоту запросов указанного типа.
+        """
+        self.buckets[request_type].penalize()
+
+    def reward(self, request_type: RequestTypes):
+        """
+        Понемногу увеличивает частоту запросов указанного типа.
+        """
+        self.buckets[request_type].reward()
+
+
+class LRUDict(OrderedDict):
+    """
+    Словарь ограниченного размера: при превышении `maxsize` удаляются записи, которые дольше всех не использовались
+    (запись считается использованной при каждом присваивании и чтении значения по ключу: d[key], d.get(key)).
+    Поэтому во время перебора словаря (for key in d) читать значения через d[key] нельзя - используйте d.items().
+
+    :param maxsize: макс. кол-во записей (None - без ограничений).
+    """
+
+    def __init__(self, maxsize: int | None = None, *args, **kwargs):
+        self.maxsize: int | None = maxsize
+        """Макс. кол-во записей."""
+        super(LRUDict, self).__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        super(LRUDict, self).__setitem__(key, value)
+        self.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self) > self.maxsize:
+                self.popitem(last=False)
+
+    def __getitem__(self, key):
+        value = super(LRUDict, self).__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+
+class PollScheduler:
+    """
+    Адаптивный интервал опроса runner/: сразу после активности (новые сообщения, изменение счетчиков заказов)
+    опрашивает чаще, в период затишья - постепенно реже.
+    В течение `penalty_window` секунд после ошибки 429 интервал не бывает меньше `delay` и не сокращается
+    на время выполнения запроса.
+
+    :param delay: обычная задержка между запросами (в секундах).
+    :param min_delay: задержка сразу после активности (по умолчанию - `delay`).
+    :param max_delay: максимальная задержка в период затишья (по умолчанию - `delay`).
+    :param backoff: во сколько раз увеличивается задержка после каждого запроса без событий.
+    :param penalty_window: сколько секунд после ошибки 429 действует ограничение.
+    """
+
+    def __init__(self, delay: float, min_delay: float | None = None, max_delay: float | None = None,
+                 backoff: float = 1.5, penalty_window: float = 60):
+        self.delay: float = delay
+        """Обычная задержка между запросами."""
+        self.min_delay: float = delay if min_delay is None else min_delay
+        """Задержка сразу после активности."""
+        self.max_delay: float = max(delay if max_delay is None else max_delay, self.min_delay)
+        """Максимальная задержка в период затишья."""
+        self.backoff: float = backoff
+        """Во сколько раз увеличивается задержка после каждого запроса без событий."""
+        self.penalty_window: float = penalty_window
+        """Сколько секунд после ошибки 429 действует ограничение."""
+        self.interval: float = min(max(delay, self.min_delay), self.max_delay)
+        """Текущий интервал опроса (в секундах)."""
+
+    def update(self, activity: bool) -> float:
+        """
+        Пересчитывает интервал опроса по результату очередного запроса.
+
+        :param activity: были ли новые события.
+
+        :return: новый интервал опроса.
+        """
+        if activity:
+            self.interval = self.min_delay
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_delay)
+        return self.interval
+
+    def next_delay(self, iteration_time: float, last_429_time: float) -> float:
+        """
+        Возвращает паузу перед следующим запросом.
+
+        :param iteration_time: длительность текущей итерации (в секундах).
+        :param last_429_time: время последней ошибки 429 (timestamp).
+        """
+        if time.time() - last_429_time <= self.penalty_window:
+            return max(self.interval, self.delay)
+        return max(self.interval - iteration_time, 0)
+
+
 def parse_currency(s: str) -> Currency:
     return {"₽": Currency.RUB,
             "€": Currency.EUR,
@@ -95,6 +307,10 @@ class RegularExpressions(object):
         return getattr(cls, "instance")
 
     def __init__(self):
+        if hasattr(self, "SYSTEM_MESSAGE"):
+            # singleton уже инициализирован, не компилируем регулярные выражения повторно
+            return
+
         self.ORDER_PURCHASED = \
             re.compile(r"(Покупатель|The buyer) [a-zA-Z0-9]+ (оплатил заказ|has paid for order) #[A-Z0-9]{8}\.")
         """
@@ -226,3 +442,76 @@ class RegularExpressions(object):
         """
         Скомпилированное регулярное выражение, описывающее фразу о смене валюты.
         """
+
+        self.SYSTEM_MESSAGE_PURCHASED2 = re.compile(
+            self.__with_named_groups("ORDER_PURCHASED2", self.ORDER_PURCHASED2.pattern))
+        """
+        ORDER_PURCHASED2 с именованной группой ORDER_PURCHASED2_user1 (проверяется отдельно, т.к. начинается
+        с никнейма и замедлила бы поиск по SYSTEM_MESSAGE).
+        """
+
+        self.SYSTEM_MESSAGE = re.compile("|".join(
+            f"(?P<{name}>{self.__with_named_groups(name, getattr(self, name).pattern)})"
+            for name in self.SYSTEM_MESSAGE_PRIORITY))
+        """
+        Скомпилированное регулярное выражение, объединяющее регулярные выражения системных сообщений
+        (группа с названием регулярного выражения, внутри - группы <название>_order и <название>_user1, 2...).
+        """
+
+        groups = self.SYSTEM_MESSAGE.groupindex
+        self.__system_groups = {
+            name: (f"{name}_order" if f"{name}_order" in groups else None,
+                   tuple(sorted((i for i in groups if i.startswith(f"{name}_user")), key=groups.get)))
+            for name in self.SYSTEM_MESSAGE_PRIORITY
+        }
+        """Названия групп с ID заказа и никнеймами для каждого системного сообщения."""
+
+    SYSTEM_MESSAGE_PRIORITY = ["DISCORD", "DEAR_VENDORS", "ORDER_PURCHASED", "ORDER_CONFIRMED", "NEW_FEEDBACK",
+                               "NEW_FEEDBACK_ANSWER", "FEEDBACK_CHANGED", "FEEDBACK_DELETED", "REFUND",
+                               "FEEDBACK_ANSWER_CHANGED", "FEEDBACK_ANSWER_DELETED", "ORDER_CONFIRMED_BY_ADMIN",
+                               "PARTIAL_REFUND", "ORDER_REOPENED", "REFUND_BY_ADMIN"]
+    """
+    Названия регулярных выражений системных сообщений (и типов сообщений) в порядке альтернатив SYSTEM_MESSAGE
+    (от самых приоритетных и часто-используемых к самым редко-используемым).
+    """
+
+    @staticmethod
+    def __with_named_groups(name: str, pattern: str) -> str:
+        """
+        Делает группы регулярного выражения незахватывающими, а никнеймы и ID заказа - именованными группами
+        (<name>_user1, <name>_user2, ..., <name>_order).
+        """
+        pattern = re.sub(r"\((?!\?)", "(?:", pattern)
+        pattern = pattern.replace("#[A-Z0-9]{8}", f"#(?P<{name}_order>[A-Z0-9]{{8}})")
+        parts = pattern.split("[a-zA-Z0-9]+")
+        return parts[0] + "".join(f"(?P<{name}_user{n}>[a-zA-Z0-9]+){part}" for n, part in enumerate(parts[1:], 1))
+
+    def classify_message(self, text: str) -> tuple[MessageTypes, str | None, list[str]]:
+        """
+        Определяет тип сообщения за один проход по тексту (вместо поочередной проверки каждого регулярного выражения)
+        и извлекает из системного сообщения ID заказа и никнеймы.
+        Если в тексте несколько системных сообщений, определяется первое из них.
+
+        :param text: текст сообщения.
+
+        :return: тип сообщения, ID заказа (или None), никнеймы пользователей в порядке упоминания.
+        """
+        # во всех системных сообщениях, кроме DISCORD и DEAR_VENDORS, есть ID заказа
+        if "#" not in text and "Discord" not in text and "vendors" not in text and "продавцы" not in text:
+            return MessageTypes.NON_SYSTEM, None, []
+
+        # первое (самое левое) системное сообщение в тексте; ORDER_PURCHASED считается только вместе с ORDER_PURCHASED2
+        position = 0
+        while match := self.SYSTEM_MESSAGE.search(text, position):
+            name = match.lastgroup
+            order_group, user_groups = self.__system_groups[name]
+            order_id = match.group(order_group) if order_group else None
+            usernames = list(match.group(*user_groups)) if len(user_groups) > 1 else \
+                [match.group(i) for i in user_groups]
+            if name == "ORDER_PURCHASED":
+                if not (purchased2 := self.SYSTEM_MESSAGE_PURCHASED2.search(text, match.end())):
+                    position = match.end()
+                    continue
+                usernames.append(purchased2.group("ORDER_PURCHASED2_user1"))
+            return MessageTypes[name], order_id, usernames
+        return MessageTypes.NON_SYSTEM, None, []
@@ -67,6 +67,10 @@ class ChatShortcut(BaseOrderInfo):
         """ID последнего сообщения в чате."""
         self.user_msg_id: int = user_msg_id
         """ID последнего прочитанного сообщения."""
+        self.last_message_order_id: str | None = None
+        """ID заказа из последнего сообщения, если оно системное (определяется вместе с типом сообщения)."""
+        self.last_message_usernames: list[str] = []
+        """Никнеймы из последнего сообщения, если оно системное (определяются вместе с типом сообщения)."""
         self.last_message_type: MessageTypes | None = None if not determine_msg_type else self.get_last_message_type()
         """Тип последнего сообщения."""
         self.html: str = html
@@ -81,44 +85,14 @@ class ChatShortcut(BaseOrderInfo):
         основан на сравнении с регулярными выражениями.
         Возможны "ложные срабатывание", если пользователь напишет "поддельное" сообщение, которое совпадет с одним из
         регулярных выражений.
+        Вместе с типом заполняет :attr:`last_message_order_id` и :attr:`last_message_usernames`.
 
         :return: тип последнего сообщения.
         :rtype: :class:`FunPayAPI.common.enums.MessageTypes`
         """
-        res = RegularExpressions()
-        if res.DISCORD.search(self.last_message_text):
-            return MessageTypes.DISCORD
-
-        if res.DEAR_VENDORS.search(self.last_message_text):
-            return MessageTypes.DEAR_VENDORS
-
-        if res.ORDER_PURCHASED.findall(self.last_message_text) and res.ORDER_PURCHASED2.findall(self.last_message_text):
-            return MessageTypes.ORDER_PURCHASED
-
-        if res.ORDER_ID.search(self.last_message_text) is None:
-            return MessageTypes.NON_SYSTEM
-
-        # Регулярные выражения выставлены в порядке от самых часто-используемых к самым редко-используемым
-        sys_msg_types = {
-            MessageTypes.ORDER_CONFIRMED: res.ORDER_CONFIRMED,
-            MessageTypes.NEW_FEEDBACK: res.NEW_FEEDBACK,
-            MessageTypes.NEW_FEEDBACK_ANSWER: res.NEW_FEEDBACK_ANSWER,
-            MessageTypes.FEEDBACK_CHANGED: res.FEEDBACK_CHANGED,
-            MessageTypes.FEEDBACK_DELETED: res.FEEDBACK_DELETED,
-            MessageTypes.REFUND: res.REFUND,
-            MessageTypes.FEEDBACK_ANSWER_CHANGED: res.FEEDBACK_ANSWER_CHANGED,
-            MessageTypes.FEEDBACK_ANSWER_DELETED: res.FEEDBACK_ANSWER_DELETED,
-            MessageTypes.ORDER_CONFIRMED_BY_ADMIN: res.ORDER_CONFIRMED_BY_ADMIN,
-            MessageTypes.PARTIAL_REFUND: res.PARTIAL_REFUND,
-            MessageTypes.ORDER_REOPENED: res.ORDER_REOPENED,
-            MessageTypes.REFUND_BY_ADMIN: res.REFUND_BY_ADMIN
-        }
-
-        for i in sys_msg_types:
-            if sys_msg_types[i].search(self.last_message_text):
-                return i
-        else:
-            return MessageTypes.NON_SYSTEM
+        message_type, self.last_message_order_id, self.last_message_usernames = \
+            RegularExpressions().classify_message(self.last_message_text)
+        return message_type
 
     def __str__(self):
         return self.last_message_text
@@ -232,6 +206,10 @@ class Message(BaseOrderInfo):
         """ID собеседника"""
         self.buyer_viewing: BuyerViewing | None = None
         """Лот, который смотрит собеседник (если включена настройка)"""
+        self.order_id: str | None = None
+        """ID заказа, если сообщение системное (определяется вместе с типом сообщения)."""
+        self.usernames: list[str] = []
+        """Никнеймы пользователей в порядке упоминания, если сообщение системное (определяются вместе с типом)."""
         self.type: MessageTypes | None = None if not determine_msg_type else self.get_message_type()
         """Тип сообщения."""
         self.author: str | None = author
@@ -279,6 +257,7 @@ class Message(BaseOrderInfo):
         регулярными выражениями. Возможно ложное "срабатывание", если пользователь напишет "поддельное" сообщение,
         которое совпадет с одним из регулярных выражений.
         Рекомендуется делать проверку на author_id == 0.
+        Вместе с типом заполняет :attr:`order_id` и :attr:`usernames`.
 
         :return: тип последнего сообщения в чате.
         :rtype: :class:`FunPayAPI.common.enums.MessageTypes`
@@ -286,39 +265,8 @@ class Message(BaseOrderInfo):
         if not self.text:
             return MessageTypes.NON_SYSTEM
 
-        res = RegularExpressions()
-        if res.DISCORD.search(self.text):
-            return MessageTypes.DISCORD
-        if res.DEAR_VENDORS.search(self.text):
-            return MessageTypes.DEAR_VENDORS
-
-        if res.ORDER_PURCHASED.findall(self.text) and res.ORDER_PURCHASED2.findall(self.text):
-            return MessageTypes.ORDER_PURCHASED
-
-        if res.ORDER_ID.search(self.text) is None:
-            return MessageTypes.NON_SYSTEM
-
-        # Регулярные выражения выставлены в порядке от самых часто-используемых к самым редко-используемым
-        sys_msg_types = {
-            MessageTypes.ORDER_CONFIRMED: res.ORDER_CONFIRMED,
-            MessageTypes.NEW_FEEDBACK: res.NEW_FEEDBACK,
-            MessageTypes.NEW_FEEDBACK_ANSWER: res.NEW_FEEDBACK_ANSWER,
-            MessageTypes.FEEDBACK_CHANGED: res.FEEDBACK_CHANGED,
-            MessageTypes.FEEDBACK_DELETED: res.FEEDBACK_DELETED,
-            MessageTypes.REFUND: res.REFUND,
-            MessageTypes.FEEDBACK_ANSWER_CHANGED: res.FEEDBACK_ANSWER_CHANGED,
-            MessageTypes.FEEDBACK_ANSWER_DELETED: res.FEEDBACK_ANSWER_DELETED,
-            MessageTypes.ORDER_CONFIRMED_BY_ADMIN: res.ORDER_CONFIRMED_BY_ADMIN,
-            MessageTypes.PARTIAL_REFUND: res.PARTIAL_REFUND,
-            MessageTypes.ORDER_REOPENED: res.ORDER_REOPENED,
-            MessageTypes.REFUND_BY_ADMIN: res.REFUND_BY_ADMIN
-        }
-
-        for i in sys_msg_types:
-            if sys_msg_types[i].search(self.text):
-                return i
-        else:
-            return MessageTypes.NON_SYSTEM
+        message_type, self.order_id, self.usernames = RegularExpressions().classify_message(self.text)
+        return message_type
 
     def __str__(self):
         return self.text if self.text is not None else self.image_link if self.image_link is not None else ""
@@ -785,6 +733,71 @@ class LotFields:
         return self
 
 
+class LotFormTemplate:
+    """
+    Класс, описывающий форму создания лота в подкатегории
+    (https://funpay.com/lots/offerEdit?offer=0&node=XXXXXXXXXX).
+
+    :param subcategory_id: ID подкатегории.
+    :type subcategory_id: :obj:`int`
+
+    :param fields: значения полей формы по умолчанию ({имя поля: значение}): input, textarea и выбранные
+        варианты select.
+    :type fields: :obj:`dict` {:obj:`str`: :obj:`str`}
+
+    :param required: обязательные поля.
+    :type required: :obj:`set` of :obj:`str`
+
+    :param options: варианты select ({имя поля: {значение: текст}}).
+    :type options: :obj:`dict`
+
+    :param hidden: поля из скрытых групп формы (не относящиеся к выбранным вариантам других полей).
+    :type hidden: :obj:`set` of :obj:`str`
+
+    :param checked: отмеченные по умолчанию checkbox'ы.
+    :type checked: :obj:`set` of :obj:`str`
+
+    :param html: HTML код страницы формы.
+    :type html: :obj:`str`
+    """
+
+    def __init__(self, subcategory_id: int, fields: dict[str, str], required: set[str],
+                 options: dict[str, dict[str, str]], hidden: set[str], checked: set[str], html: str):
+        self.subcategory_id: int = subcategory_id
+        """ID подкатегории."""
+        self.fields: dict[str, str] = fields
+        """Значения полей формы по умолчанию."""
+        self.required: set[str] = required
+        """Обязательные поля."""
+        self.options: dict[str, dict[str, str]] = options
+        """Варианты select."""
+        self.hidden: set[str] = hidden
+        """Поля из скрытых групп формы."""
+        self.checked: set[str] = checked
+        """Отмеченные по умолчанию checkbox'ы."""
+        self.html: str = html
+        """HTML код страницы формы."""
+
+    @property
+    def names(self) -> set[str]:
+        """
+        Имена всех полей формы.
+        """
+        return set(self.fields) | set(self.options)
+
+    def defaults(self) -> dict[str, str]:
+        """
+        Возвращает новый словарь полей для создания лота: значения по умолчанию без select'ов из скрытых групп,
+        отмеченные checkbox'ы - "on". Словарь можно изменять, шаблон при этом не меняется.
+
+        :return: поля нового лота.
+        :rtype: :obj:`dict` {:obj:`str`: :obj:`str`}
+        """
+        result = {k: v for k, v in self.fields.items() if not (k in self.options and k in self.hidden)}
+        result.update({name: "on" for name in self.checked})
+        return result
+
+
 class ChipOffer:
     def __init__(self, lot_id: str, active: bool = False, server: str | None = None,
                  side: str | None = None, price: float | None = None, amount: int | None = None):
@@ -1110,6 +1123,11 @@ class UserProfile:
             SubCategoryTypes.COMMON: {},
             SubCategoryTypes.CURRENCY: {}
         }
+        self.truncated_subcategories: set[SubCategory] = set()
+        """
+        Подкатегории, лоты которых показаны на странице пользователя не полностью
+        (полный список - только в таблице лотов подкатегории).
+        """
 
     def get_lot(self, lot_id: int | str) -> LotShortcut | None:
         """
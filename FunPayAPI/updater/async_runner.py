@@ -0,0 +1,137 @@
+"""
+В данном модуле описан асинхронный Runner (для :class:`FunPayAPI.async_account.AsyncAccount`).
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, AsyncGenerator, Optional
+import inspect
+import asyncio
+import logging
+
+if TYPE_CHECKING:
+    from ..async_account import AsyncAccount
+    from .checkpoint import RunnerCheckpoint
+
+from .runner import Runner, _Parallel, _Flow, _T
+from .outbox import OutgoingMessage
+from .events import *
+
+logger = logging.getLogger("FunPayAPI.async_runner")
+
+
+class AsyncRunner(Runner):
+    """
+    Асинхронная версия :class:`FunPayAPI.updater.runner.Runner` для :class:`FunPayAPI.async_account.AsyncAccount`.
+
+    Методы :meth:`get_updates`, :meth:`parse_updates`, :meth:`parse_chat_updates`,
+    :meth:`generate_new_message_events` и :meth:`parse_order_updates` возвращают корутины,
+    :meth:`listen` - асинхронный генератор событий (`async for`). События те же, что и у
+    :class:`FunPayAPI.updater.runner.Runner`: оба класса выполняют одни и те же сценарии (Runner._*_flow).
+
+    В рамках одного запроса к runner/ обновление списка заказов и получение историй чатов выполняются
+    одновременно, поэтому задержка между получением события FunPay и его выдачей определяется самым долгим
+    из этих запросов, а не их суммой.
+
+    Параметры конструктора те же, что и у :class:`FunPayAPI.updater.runner.Runner`.
+    """
+
+    _sleep = staticmethod(asyncio.sleep)
+
+    def __init__(self, account: AsyncAccount, disable_message_requests: bool = False,
+                 disabled_order_requests: bool = False,
+                 disabled_buyer_viewing_requests: bool = True, checkpoint: RunnerCheckpoint | None = None,
+                 checkpoint_interval: int | float = 60):
+        super(AsyncRunner, self).__init__(account, disable_message_requests, disabled_order_requests,
+                                          disabled_buyer_viewing_requests, checkpoint, checkpoint_interval)
+        self.__sending: set[asyncio.Task] = set()
+        """Сообщения, отправляемые отдельными запросами (urgent)."""
+
+    async def _execute(self, flow: _Flow[_T]) -> _T:
+        """
+        Асинхронная версия :meth:`FunPayAPI.updater.runner.Runner._execute`.
+        Независимые сценарии (:class:`FunPayAPI.updater.runner._Parallel`) выполняются одновременно.
+        """
+        try:
+            call = next(flow)
+            while True:
+                try:
+                    if isinstance(call, _Parallel):
+                        result = await self.__gather(call.flows)
+                    else:
+                        result = call.func(*call.args, **call.kwargs)
+                        if inspect.isawaitable(result):
+                            result = await result
+                except Exception as e:
+                    call = flow.throw(e)
+                else:
+                    call = flow.send(result)
+        except StopIteration as e:
+            return e.value
+
+    async def __gather(self, flows: list[_Flow]) -> list:
+        # дожидаемся всех сценариев, даже если один из них упал, чтобы не оставлять запросы без присмотра
+        results = await asyncio.gather(*(self._execute(i) for i in flows), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+
+    def queue_message(self, chat_id: int | str, text: Optional[str] = None, chat_name: Optional[str] = None,
+                      interlocutor_id: Optional[int] = None, image_id: Optional[int] = None,
+                      add_to_ignore_list: bool = True, update_last_saved_message: bool = False,
+                      leave_as_unread: bool = False, priority: int = 0,
+                      urgent: bool = False) -> asyncio.Future[types.Message]:
+        """
+        Асинхронная версия :meth:`FunPayAPI.updater.runner.Runner.queue_message`
+        (возвращает :class:`asyncio.Future`, вызывать внутри event loop'а).
+        """
+        return asyncio.wrap_future(super(AsyncRunner, self).queue_message(
+            chat_id, text, chat_name, interlocutor_id, image_id, add_to_ignore_list, update_last_saved_message,
+            leave_as_unread, priority, urgent))
+
+    def _send_now(self, message: OutgoingMessage):
+        """
+        Асинхронная версия :meth:`FunPayAPI.updater.runner.Runner._send_now` (отправляет сообщение в фоне).
+        """
+        task = asyncio.ensure_future(self.__send_now(message))
+        self.__sending.add(task)
+        task.add_done_callback(self.__sending.discard)
+
+    async def __send_now(self, message: OutgoingMessage):
+        if not message.future.set_running_or_notify_cancel():
+            return
+        try:
+            message.future.set_result(await self.account.send_message(**message.send_kwargs()))
+        except Exception as e:
+            message.future.set_exception(e)
+
+    async def listen(self, requests_delay: int | float = 6.0,
+                     ignore_exceptions: bool = True, min_delay: int | float | None = None,
+                     max_delay: int | float | None = None) -> AsyncGenerator[InitialChatEvent | ChatsListChangedEvent |
+                                                                       LastChatMessageChangedEvent |
+                                                                       NewMessageEvent | InitialOrderEvent |
+                                                                       OrdersListChangedEvent | NewOrderEvent |
+                                                                       OrderStatusChangedEvent, None]:
+        """
+        Асинхронная версия :meth:`FunPayAPI.updater.runner.Runner.listen` (async for).
+        """
+        self.poll_scheduler = utils.PollScheduler(requests_delay, min_delay, max_delay)
+        events = []
+        while True:
+            start_time = time.time()
+            activity = False
+            try:
+                ready, events = await self._execute(self._poll_flow(events))
+                activity = bool(ready or events or len(self.outbox))
+                for event in ready:
+                    yield event
+                self.buyers_viewing = {}
+                self._maybe_save_checkpoint(events)
+            except Exception as e:
+                if not ignore_exceptions:
+                    raise e
+                else:
+                    logger.error("Произошла ошибка при получении событий. "
+                                 "(ничего страшного, если это сообщение появляется нечасто).")
+                    logger.debug("TRACEBACK", exc_info=True)
+            await asyncio.sleep(self._next_delay(activity, time.time() - start_time))
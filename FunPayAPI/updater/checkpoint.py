@@ -0,0 +1,86 @@
+"""
+В данном модуле описано хранилище контрольных точек Runner'а (SQLite).
+"""
+from __future__ import annotations
+
+from contextlib import closing
+import threading
+import sqlite3
+import logging
+import json
+import time
+
+logger = logging.getLogger("FunPayAPI.checkpoint")
+
+
+class RunnerCheckpoint:
+    """
+    Хранилище состояния :class:`FunPayAPI.updater.runner.Runner` в файле SQLite.
+    Runner периодически сохраняет в него свое состояние (теги последних событий, последние сообщения чатов,
+    статусы заказов), а после перезапуска продолжает с сохраненного места: без Initial* событий по всем чатам
+    и заказам и с получением сообщений, пришедших, пока бот был выключен.
+
+    В одном файле можно хранить состояния нескольких аккаунтов.
+
+    :param path: путь к файлу SQLite.
+    :type path: :obj:`str`
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        """Путь к файлу SQLite."""
+        self.__lock = threading.Lock()
+        with self.__lock, closing(self.__connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS runner_state (account_id INTEGER PRIMARY KEY, "
+                         "state TEXT NOT NULL, saved_at REAL NOT NULL)")
+
+    def __connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    def load(self, account_id: int) -> dict | None:
+        """
+        Загружает сохраненное состояние Runner'а.
+
+        :param account_id: ID аккаунта.
+        :type account_id: :obj:`int`
+
+        :return: состояние Runner'а или None, если оно не сохранялось (или файл поврежден).
+        :rtype: :obj:`dict` or :obj:`None`
+        """
+        try:
+            with self.__lock, closing(self.__connect()) as conn:
+                row = conn.execute("SELECT state FROM runner_state WHERE account_id = ?", (account_id,)).fetchone()
+            return json.loads(row[0]) if row else None
+        except (sqlite3.Error, ValueError):
+            logger.warning(f"Не удалось загрузить состояние Runner'а из {self.path}.")
+            logger.debug("TRACEBACK", exc_info=True)
+            return None
+
+    def save(self, account_id: int, state: dict):
+        """
+        Сохраняет состояние Runner'а.
+
+        :param account_id: ID аккаунта.
+        :type account_id: :obj:`int`
+
+        :param state: состояние Runner'а.
+        :type state: :obj:`dict`
+        """
+        data = json.dumps(state, ensure_ascii=False, separators=(",", ":"))
+        try:
+            with self.__lock, closing(self.__connect()) as conn, conn:
+                conn.execute("INSERT OR REPLACE INTO runner_state (account_id, state, saved_at) VALUES (?, ?, ?)",
+                             (account_id, data, time.time()))
+        except sqlite3.Error:
+            logger.warning(f"Не удалось сохранить состояние Runner'а в {self.path}.")
+            logger.debug("TRACEBACK", exc_info=True)
+
+    def delete(self, account_id: int):
+        """
+        Удаляет сохраненное состояние Runner'а (следующий запуск начнется с Initial* событий).
+
+        :param account_id: ID аккаунта.
+        :type account_id: :obj:`int`
+        """
+        with self.__lock, closing(self.__connect()) as conn, conn:
+            conn.execute("DELETE FROM runner_state WHERE account_id = ?", (account_id,))
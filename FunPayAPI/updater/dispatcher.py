@@ -0,0 +1,300 @@
+"""
+В данном модуле описаны диспетчеры событий Runner'а: обработка событий пулом потоков / корутин
+с сохранением порядка событий одного чата / заказа.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable, Iterable
+from collections import deque
+import threading
+import functools
+import inspect
+import asyncio
+import logging
+
+from ..common.enums import EventTypes
+from .events import *
+
+logger = logging.getLogger("FunPayAPI.dispatcher")
+
+
+class _KeyedQueue:
+    """
+    Очередь событий с цепочками по ключам: события с одним ключом выдаются строго по одному и по порядку,
+    события с разными ключами - по очереди (не больше одного события каждого ключа в обработке).
+    Не потокобезопасна: синхронизацию обеспечивает диспетчер.
+    """
+
+    def __init__(self):
+        self.chains: dict[Hashable, deque] = {}
+        """Ожидающие обработки события по ключам (ключ есть, пока есть ожидающие или обрабатываемые события)."""
+        self.ready: deque[Hashable] = deque()
+        """Ключи, следующее событие которых можно обрабатывать."""
+        self.size: int = 0
+        """Кол-во ожидающих и обрабатываемых событий."""
+
+    def put(self, key: Hashable, item: Any):
+        self.size += 1
+        if key in self.chains:
+            self.chains[key].append(item)
+        else:
+            self.chains[key] = deque([item])
+            self.ready.append(key)
+
+    def take(self) -> tuple[Hashable, Any]:
+        key = self.ready.popleft()
+        return key, self.chains[key].popleft()
+
+    def done(self, key: Hashable):
+        self.size -= 1
+        if self.chains[key]:
+            self.ready.append(key)
+        else:
+            del self.chains[key]
+
+
+class _BaseDispatcher:
+    """
+    Общая часть диспетчеров: обработчики и ключи упорядочивания событий.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 1000):
+        self.workers: int = workers
+        """Кол-во обработчиков, работающих одновременно."""
+        self.max_pending: int = max_pending
+        """Макс. кол-во событий в очереди (при заполнении dispatch ждет освобождения места)."""
+        self.handlers: list[tuple[set[EventTypes] | None, Callable]] = []
+        """Обработчики событий: (типы событий (None - все), обработчик)."""
+
+    def add_handler(self, handler: Callable, event_types: Iterable[EventTypes] | None = None):
+        """
+        Добавляет обработчик событий. Обработчик вызывается с событием и доп. аргументами, переданными в dispatch.
+
+        :param handler: обработчик.
+        :type handler: :obj:`Callable`
+
+        :param event_types: типы событий, которые нужно передавать обработчику (None - все).
+        :type event_types: :obj:`list` of :class:`FunPayAPI.common.enums.EventTypes` or :obj:`None`, опционально
+        """
+        self.handlers.append((set(event_types) if event_types is not None else None, handler))
+
+    def _handlers_for(self, event: BaseEvent) -> list[Callable]:
+        return [handler for types_, handler in self.handlers if types_ is None or event.type in types_]
+
+    @staticmethod
+    def event_key(event: BaseEvent) -> Hashable:
+        """
+        Возвращает ключ упорядочивания события: события с одинаковым ключом обрабатываются строго по одному
+        и в порядке поступления.
+
+        * События чатов - ID чата.
+        * События заказов - ID заказа.
+        * OrdersListChangedEvent и ChatsListChangedEvent - тип события.
+        """
+        if event.type == EventTypes.NEW_MESSAGE:
+            return "chat", event.message.chat_id
+        if event.type in (EventTypes.INITIAL_CHAT, EventTypes.LAST_CHAT_MESSAGE_CHANGED):
+            return "chat", event.chat.id
+        if event.type in (EventTypes.INITIAL_ORDER, EventTypes.NEW_ORDER, EventTypes.ORDER_STATUS_CHANGED):
+            return "order", event.order.id
+        return event.type
+
+
+class EventDispatcher(_BaseDispatcher):
+    """
+    Диспетчер событий на пуле потоков: цикл получения событий (:meth:`FunPayAPI.updater.runner.Runner.listen`)
+    только передает события в :meth:`dispatch`, а обработчики выполняются в `workers` потоках. Долгий обработчик
+    (загрузка изображения, запрос заказа) не задерживает ни получение событий, ни обработку других чатов.
+
+    События одного чата / заказа (см. :meth:`event_key`) обрабатываются строго по одному и в порядке получения.
+    Если в очереди `max_pending` событий, :meth:`dispatch` ждет освобождения места.
+
+    Пример::
+
+        dispatcher = EventDispatcher(workers=8)
+        dispatcher.add_handler(on_message, [EventTypes.NEW_MESSAGE])
+        dispatcher.start()
+        for event in runner.listen():
+            dispatcher.dispatch(event)
+
+    :param workers: кол-во потоков-обработчиков.
+    :type workers: :obj:`int`, опционально
+
+    :param max_pending: макс. кол-во событий в очереди.
+    :type max_pending: :obj:`int`, опционально
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 1000):
+        super(EventDispatcher, self).__init__(workers, max_pending)
+        self.__queue = _KeyedQueue()
+        self.__condition = threading.Condition()
+        self.__threads: list[threading.Thread] = []
+        self.__stopping: bool = False
+
+    def start(self):
+        """
+        Запускает потоки-обработчики.
+        """
+        with self.__condition:
+            self.__stopping = False
+        for i in range(self.workers - len(self.__threads)):
+            thread = threading.Thread(target=self.__worker, name=f"FunPayAPI-dispatcher-{len(self.__threads)}",
+                                      daemon=True)
+            thread.start()
+            self.__threads.append(thread)
+
+    def dispatch(self, event: BaseEvent, *args, timeout: float | None = None) -> bool:
+        """
+        Ставит событие в очередь на обработку. Если очередь заполнена, ждет освобождения места.
+
+        :param event: событие.
+        :type event: :class:`FunPayAPI.updater.events.BaseEvent`
+
+        :param args: доп. аргументы для обработчиков (например, Runner аккаунта).
+
+        :param timeout: сколько ждать места в очереди (в секундах, None - без ограничений).
+        :type timeout: :obj:`float` or :obj:`None`, опционально
+
+        :return: True, если событие поставлено в очередь, False, если место в очереди не освободилось.
+        :rtype: :obj:`bool`
+        """
+        key = self.event_key(event)
+        with self.__condition:
+            if not self.__condition.wait_for(lambda: self.__queue.size < self.max_pending, timeout):
+                return False
+            self.__queue.put(key, (event, args))
+            self.__condition.notify_all()
+        return True
+
+    def join(self, timeout: float | None = None) -> bool:
+        """
+        Ждет обработки всех событий в очереди.
+
+        :return: True, если все события обработаны.
+        :rtype: :obj:`bool`
+        """
+        with self.__condition:
+            return self.__condition.wait_for(lambda: not self.__queue.size, timeout)
+
+    def stop(self, wait: bool = True):
+        """
+        Останавливает потоки-обработчики после обработки всех событий в очереди.
+
+        :param wait: дождаться ли остановки потоков?
+        :type wait: :obj:`bool`, опционально
+        """
+        with self.__condition:
+            self.__stopping = True
+            self.__condition.notify_all()
+        if wait:
+            for thread in self.__threads:
+                thread.join()
+        self.__threads = [i for i in self.__threads if i.is_alive()]
+
+    def __worker(self):
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(lambda: self.__queue.ready or (self.__stopping and not self.__queue.size))
+                if not self.__queue.ready:
+                    return
+                key, (event, args) = self.__queue.take()
+            try:
+                for handler in self._handlers_for(event):
+                    try:
+                        handler(event, *args)
+                    except Exception:
+                        logger.error(f"Произошла ошибка в обработчике {getattr(handler, '__name__', handler)} "
+                                     f"события {event.type.name}.")
+                        logger.debug("TRACEBACK", exc_info=True)
+            finally:
+                with self.__condition:
+                    self.__queue.done(key)
+                    self.__condition.notify_all()
+
+
+class AsyncEventDispatcher(_BaseDispatcher):
+    """
+    Асинхронная версия :class:`EventDispatcher` (для :class:`FunPayAPI.updater.async_runner.AsyncRunner` и
+    :class:`FunPayAPI.updater.host.RunnerHost`): обработчики выполняются в `workers` задачах event loop'а.
+    Асинхронные обработчики (async def) выполняются в event loop'е, обычные - в пуле потоков event loop'а,
+    чтобы не блокировать его.
+
+    Пример::
+
+        dispatcher = AsyncEventDispatcher(workers=32)
+        dispatcher.add_handler(on_message, [EventTypes.NEW_MESSAGE])
+        await dispatcher.start()
+        async for runner, event in host.listen():
+            await dispatcher.dispatch(event, runner)
+
+    Параметры конструктора те же, что и у :class:`EventDispatcher`.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 1000):
+        super(AsyncEventDispatcher, self).__init__(workers, max_pending)
+        self.__queue = _KeyedQueue()
+        self.__condition: asyncio.Condition | None = None
+        self.__tasks: list[asyncio.Task] = []
+        self.__stopping: bool = False
+
+    async def start(self):
+        """
+        Запускает задачи-обработчики (вызывать внутри event loop'а).
+        """
+        if self.__condition is None:
+            self.__condition = asyncio.Condition()
+        self.__stopping = False
+        for i in range(self.workers - len(self.__tasks)):
+            self.__tasks.append(asyncio.ensure_future(self.__worker()))
+
+    async def dispatch(self, event: BaseEvent, *args):
+        """
+        Асинхронная версия :meth:`EventDispatcher.dispatch` (ждет освобождения места в очереди).
+        """
+        key = self.event_key(event)
+        async with self.__condition:
+            await self.__condition.wait_for(lambda: self.__queue.size < self.max_pending)
+            self.__queue.put(key, (event, args))
+            self.__condition.notify_all()
+
+    async def join(self):
+        """
+        Ждет обработки всех событий в очереди.
+        """
+        async with self.__condition:
+            await self.__condition.wait_for(lambda: not self.__queue.size)
+
+    async def stop(self):
+        """
+        Останавливает задачи-обработчики после обработки всех событий в очереди.
+        """
+        async with self.__condition:
+            self.__stopping = True
+            self.__condition.notify_all()
+        await asyncio.gather(*self.__tasks)
+        self.__tasks = []
+
+    async def __worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            async with self.__condition:
+                await self.__condition.wait_for(lambda: self.__queue.ready or
+                                                (self.__stopping and not self.__queue.size))
+                if not self.__queue.ready:
+                    return
+                key, (event, args) = self.__queue.take()
+            try:
+                for handler in self._handlers_for(event):
+                    try:
+                        if inspect.iscoroutinefunction(handler):
+                            await handler(event, *args)
+                        else:
+                            await loop.run_in_executor(None, functools.partial(handler, event, *args))
+                    except Exception:
+                        logger.error(f"Произошла ошибка в обработчике {getattr(handler, '__name__', handler)} "
+                                     f"события {event.type.name}.")
+                        logger.debug("TRACEBACK", exc_info=True)
+            finally:
+                async with self.__condition:
+                    self.__queue.done(key)
+                    self.__condition.notify_all()
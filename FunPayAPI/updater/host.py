@@ -0,0 +1,256 @@
+"""
+В данном модуле описан хост Runner'ов: опрос множества аккаунтов в одном event loop'е.
+"""
+from __future__ import annotations
+
+from typing import AsyncGenerator
+import itertools
+import asyncio
+import logging
+import heapq
+import time
+
+import aiohttp
+
+from ..common import utils, enums
+from .async_runner import AsyncRunner
+from .events import *
+
+logger = logging.getLogger("FunPayAPI.host")
+
+
+class _ProxyGroup:
+    """
+    Ресурсы, общие для аккаунтов, работающих через один прокси (или без прокси):
+    пул соединений и лимиты частоты запросов (FunPay ограничивает частоту запросов с одного IP).
+    """
+
+    def __init__(self, rate_limits: dict[enums.RequestTypes, tuple[float, float]] | None = None):
+        self.rate_limiter: utils.RateLimiter = utils.RateLimiter(rate_limits)
+        """Общий ограничитель частоты запросов."""
+        self.session: aiohttp.ClientSession | None = None
+        """Общая HTTP-сессия aiohttp (создается при запуске :meth:`RunnerHost.listen`)."""
+
+
+class RunnerHost:
+    """
+    Хост для множества :class:`FunPayAPI.updater.async_runner.AsyncRunner`: опрашивает все аккаунты в одном
+    event loop'е вместо отдельного потока с :meth:`FunPayAPI.updater.runner.Runner.listen` на каждый аккаунт
+    и выдает события всех аккаунтов через один асинхронный генератор (:meth:`listen`).
+
+    * Запросы к runner/ выполняются по общему расписанию: первые запросы аккаунтов равномерно разнесены
+      внутри `requests_delay`, дальше у каждого аккаунта свой адаптивный интервал
+      (см. :class:`FunPayAPI.common.utils.PollScheduler`). Одновременно выполняется не больше
+      `max_concurrent_polls` итераций опроса.
+    * Аккаунты, работающие через один прокси, используют общий пул соединений aiohttp и общие лимиты частоты
+      запросов (`rate_limits`, см. :class:`FunPayAPI.common.utils.RateLimiter`).
+    * Следующий запрос аккаунта отправляется только после того, как все события его прошлого запроса выданы
+      из :meth:`listen`: медленная обработка событий притормаживает опрос, а не копит события в памяти.
+
+    :param requests_delay: задержка между запросами одного аккаунта (в секундах).
+    :type requests_delay: :obj:`int` or :obj:`float`, опционально
+
+    :param min_delay: задержка сразу после новых событий (см. :meth:`FunPayAPI.updater.runner.Runner.listen`).
+    :type min_delay: :obj:`int` or :obj:`float` or :obj:`None`, опционально
+
+    :param max_delay: максимальная задержка в период затишья
+        (см. :meth:`FunPayAPI.updater.runner.Runner.listen`).
+    :type max_delay: :obj:`int` or :obj:`float` or :obj:`None`, опционально
+
+    :param ignore_exceptions: игнорировать ошибки?
+    :type ignore_exceptions: :obj:`bool`, опционально
+
+    :param max_concurrent_polls: макс. кол-во одновременно выполняемых итераций опроса.
+    :type max_concurrent_polls: :obj:`int`, опционально
+
+    :param rate_limits: лимиты частоты запросов одного прокси ({тип запроса: (запросов в секунду, burst)}).
+    :type rate_limits: :obj:`dict` or :obj:`None`, опционально
+
+    :param connections_per_proxy: макс. кол-во соединений с FunPay через один прокси (общий пул соединений
+        всех аккаунтов прокси, настройки пулов самих аккаунтов не учитываются).
+    :type connections_per_proxy: :obj:`int`, опционально
+    """
+
+    def __init__(self, requests_delay: int | float = 6.0, min_delay: int | float | None = None,
+                 max_delay: int | float | None = None, ignore_exceptions: bool = True,
+                 max_concurrent_polls: int = 20,
+                 rate_limits: dict[enums.RequestTypes, tuple[float, float]] | None = None,
+                 connections_per_proxy: int = 100):
+        self.requests_delay: int | float = requests_delay
+        """Задержка между запросами одного аккаунта."""
+        self.min_delay: int | float | None = min_delay
+        """Задержка сразу после новых событий."""
+        self.max_delay: int | float | None = max_delay
+        """Максимальная задержка в период затишья."""
+        self.ignore_exceptions: bool = ignore_exceptions
+        """Игнорировать ли ошибки?"""
+        self.max_concurrent_polls: int = max_concurrent_polls
+        """Макс. кол-во одновременно выполняемых итераций опроса."""
+        self.rate_limits: dict[enums.RequestTypes, tuple[float, float]] | None = rate_limits
+        """Лимиты частоты запросов одного прокси."""
+        self.connections_per_proxy: int = connections_per_proxy
+        """Макс. кол-во соединений с FunPay через один прокси."""
+        self.runners: dict[int, AsyncRunner] = {}
+        """Runner'ы по ID аккаунтов."""
+
+        self.__groups: dict[str | None, _ProxyGroup] = {}
+        """Общие ресурсы по прокси."""
+        self.__schedule: list[tuple[float, int, int]] = []
+        """Очередь запросов (куча из (время запроса, номер записи, ID аккаунта))."""
+        self.__scheduled: dict[int, int] = {}
+        """Номера актуальных записей в очереди запросов ({ID аккаунта: номер записи})."""
+        self.__counter = itertools.count()
+        self.__added = itertools.count()
+        self.__pending: dict[int, list] = {}
+        """События, отложенные до следующего запроса, по ID аккаунтов."""
+        self.__batches: asyncio.Queue | None = None
+        """Результаты итераций опроса, ожидающие выдачи."""
+        self.__wakeup: asyncio.Event | None = None
+        self.__tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def __proxy_key(runner: AsyncRunner) -> str | None:
+        proxy = runner.account.proxy or {}
+        return proxy.get("https") or proxy.get("http")
+
+    def add(self, runner: AsyncRunner) -> AsyncRunner:
+        """
+        Добавляет Runner аккаунта (можно и во время работы :meth:`listen`).
+        Аккаунт начинает использовать общие для своего прокси лимиты частоты запросов и пул соединений.
+
+        :param runner: Runner аккаунта.
+        :type runner: :class:`FunPayAPI.updater.async_runner.AsyncRunner`
+
+        :return: переданный Runner.
+        :rtype: :class:`FunPayAPI.updater.async_runner.AsyncRunner`
+        """
+        account_id = runner.account.id
+        if account_id in self.runners:
+            raise ValueError(f"Аккаунт {account_id} уже добавлен.")
+        group = self.__groups.setdefault(self.__proxy_key(runner), _ProxyGroup(self.rate_limits))
+        runner.account.rate_limiter = group.rate_limiter
+        runner.poll_scheduler = utils.PollScheduler(self.requests_delay, self.min_delay, self.max_delay)
+        self.runners[account_id] = runner
+        self.__pending[account_id] = []
+        if self.__wakeup is not None:
+            self.__attach_session(runner)
+        # разносим первые запросы внутри requests_delay (последовательность золотого сечения равномерно
+        # заполняет интервал при любом кол-ве аккаунтов)
+        self.__schedule_poll(runner, self.requests_delay * ((next(self.__added) * 0.6180339887) % 1))
+        return runner
+
+    def remove(self, account_id: int) -> AsyncRunner | None:
+        """
+        Убирает Runner аккаунта.
+
+        :param account_id: ID аккаунта.
+        :type account_id: :obj:`int`
+
+        :return: убранный Runner или None, если его не было.
+        :rtype: :class:`FunPayAPI.updater.async_runner.AsyncRunner` or :obj:`None`
+        """
+        self.__scheduled.pop(account_id, None)
+        self.__pending.pop(account_id, None)
+        return self.runners.pop(account_id, None)
+
+    def __attach_session(self, runner: AsyncRunner):
+        group = self.__groups[self.__proxy_key(runner)]
+        if group.session is None or group.session.closed:
+            group.session = runner.account._new_aiohttp_session(self.connections_per_proxy)
+        runner.account.aiohttp_session = group.session
+
+    def __schedule_poll(self, runner: AsyncRunner, delay: float):
+        seq = next(self.__counter)
+        self.__scheduled[runner.account.id] = seq
+        heapq.heappush(self.__schedule, (time.time() + delay, seq, runner.account.id))
+        if self.__wakeup is not None:
+            self.__wakeup.set()
+
+    async def __scheduler(self):
+        semaphore = asyncio.Semaphore(self.max_concurrent_polls)
+        while True:
+            self.__wakeup.clear()
+            now = time.time()
+            while self.__schedule and self.__schedule[0][0] <= now:
+                _, seq, account_id = heapq.heappop(self.__schedule)
+                if self.__scheduled.get(account_id) != seq:
+                    continue  # аккаунт убран или перепланирован
+                del self.__scheduled[account_id]
+                task = asyncio.ensure_future(self.__poll(self.runners[account_id], semaphore))
+                self.__tasks.add(task)
+                task.add_done_callback(self.__tasks.discard)
+            timeout = self.__schedule[0][0] - now if self.__schedule else None
+            try:
+                await asyncio.wait_for(self.__wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def __poll(self, runner: AsyncRunner, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            start_time = time.time()
+            try:
+                ready, pending = await runner._execute(runner._poll_flow(self.__pending.get(runner.account.id, [])))
+                error = None
+            except Exception as e:
+                ready, pending, error = [], None, e
+        await self.__batches.put((runner, ready, pending, error, start_time))
+
+    async def listen(self) -> AsyncGenerator[tuple[AsyncRunner, InitialChatEvent | ChatsListChangedEvent |
+                                                   LastChatMessageChangedEvent | NewMessageEvent |
+                                                   InitialOrderEvent | OrdersListChangedEvent | NewOrderEvent |
+                                                   OrderStatusChangedEvent], None]:
+        """
+        Бесконечно опрашивает все добавленные аккаунты (async for).
+
+        :return: асинхронный генератор пар (Runner аккаунта, событие). События одного аккаунта выдаются в том же
+            порядке, что и :meth:`FunPayAPI.updater.async_runner.AsyncRunner.listen`.
+        """
+        self.__batches = asyncio.Queue()
+        self.__wakeup = asyncio.Event()
+        for runner in self.runners.values():
+            self.__attach_session(runner)
+            if runner.account.id not in self.__scheduled:
+                # итерация опроса была прервана при прошлой остановке listen
+                self.__schedule_poll(runner, 0)
+        scheduler = asyncio.ensure_future(self.__scheduler())
+        try:
+            while True:
+                runner, ready, pending, error, start_time = await self.__batches.get()
+                account_id = runner.account.id
+                if self.runners.get(account_id) is not runner:
+                    continue
+                activity = False
+                if error is None:
+                    activity = bool(ready or pending or len(runner.outbox))
+                    for event in ready:
+                        yield runner, event
+                    runner.buyers_viewing = {}
+                    runner._maybe_save_checkpoint(pending)
+                    self.__pending[account_id] = pending
+                elif not self.ignore_exceptions:
+                    raise error
+                else:
+                    logger.error(f"Произошла ошибка при получении событий аккаунта {runner.account.username}. "
+                                 "(ничего страшного, если это сообщение появляется нечасто).")
+                    logger.debug("TRACEBACK", exc_info=error)
+                if self.runners.get(account_id) is runner:
+                    self.__schedule_poll(runner, runner._next_delay(activity, time.time() - start_time))
+        finally:
+            scheduler.cancel()
+            for task in list(self.__tasks):
+                task.cancel()
+            self.__wakeup = None
+
+    async def close(self) -> None:
+        """
+        Закрывает общие HTTP-сессии aiohttp.
+        """
+        for group in self.__groups.values():
+            if group.session is not None and not group.session.closed:
+                await group.session.close()
+
+    async def __aenter__(self) -> RunnerHost:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
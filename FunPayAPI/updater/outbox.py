@@ -0,0 +1,195 @@
+"""
+В данном модуле описана очередь исходящих сообщений Runner'а.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+from concurrent.futures import Future
+import threading
+import logging
+import itertools
+import time
+
+from ..common import exceptions, utils
+
+if TYPE_CHECKING:
+    from .. import types
+
+logger = logging.getLogger("FunPayAPI.outbox")
+
+
+class OutgoingMessage:
+    """
+    Сообщение в очереди на отправку. Параметры те же, что и у :meth:`FunPayAPI.account.Account.send_message`.
+
+    :param priority: приоритет (сообщения с бОльшим приоритетом отправляются раньше, например, выдача товара
+        раньше приветствий).
+    :type priority: :obj:`int`, опционально
+    """
+
+    def __init__(self, chat_id: int | str, text: Optional[str] = None, chat_name: Optional[str] = None,
+                 interlocutor_id: Optional[int] = None, image_id: Optional[int] = None,
+                 add_to_ignore_list: bool = True, update_last_saved_message: bool = False,
+                 leave_as_unread: bool = False, priority: int = 0):
+        self.chat_id: int | str = chat_id
+        """ID чата."""
+        self.text: str | None = text
+        """Текст сообщения."""
+        self.chat_name: str | None = chat_name
+        """Название чата."""
+        self.interlocutor_id: int | None = interlocutor_id
+        """ID собеседника."""
+        self.image_id: int | None = image_id
+        """ID изображения."""
+        self.add_to_ignore_list: bool = add_to_ignore_list
+        """Добавлять ли ID отправленного сообщения в игнорируемый список Runner'а?"""
+        self.update_last_saved_message: bool = update_last_saved_message
+        """Обновлять ли последнее сохраненное сообщение на отправленное в Runner'е?"""
+        self.leave_as_unread: bool = leave_as_unread
+        """Оставлять ли сообщение непрочитанным при отправке?"""
+        self.priority: int = priority
+        """Приоритет."""
+        self.future: Future[types.Message] = Future()
+        """Результат отправки: экземпляр отправленного сообщения или исключение."""
+        self.attempts: int = 0
+        """Кол-во неудачных попыток отправки."""
+        self.not_before: float = 0
+        """Время (time.monotonic()), раньше которого сообщение не отправляется (пауза перед повторной попыткой)."""
+
+    def send_kwargs(self) -> dict:
+        """
+        Возвращает аргументы для :meth:`FunPayAPI.account.Account.send_message`.
+        """
+        return {"chat_id": self.chat_id, "text": self.text, "chat_name": self.chat_name,
+                "interlocutor_id": self.interlocutor_id, "image_id": self.image_id,
+                "add_to_ignore_list": self.add_to_ignore_list,
+                "update_last_saved_message": self.update_last_saved_message,
+                "leave_as_unread": self.leave_as_unread}
+
+
+class Outbox:
+    """
+    Очередь исходящих сообщений с учетом ограничений FunPay на частоту сообщений.
+    Runner прикрепляет следующее сообщение из очереди к очередному запросу к runner/ (поле "request"),
+    поэтому отдельный запрос на отправку не нужен.
+
+    * Сообщения с бОльшим приоритетом отправляются раньше, с одинаковым - в порядке добавления.
+    * Тексты, подряд добавленные в один и тот же чат, пока они ждут отправки, склеиваются в одно сообщение
+      (не длиннее `max_coalesced_length`).
+    * Интервалы между сообщениями в один чат и между сообщениями разным пользователям подстраиваются под ошибки
+      флуда FunPay: после ошибки интервал удваивается, после каждой успешной отправки понемногу уменьшается.
+    * Сообщения, не отправленные из-за ошибки флуда или ответа 429, отправляются повторно
+      (не больше `max_attempts` попыток).
+    """
+
+    max_coalesced_length: int = 2000
+    """Макс. длина склеенного сообщения."""
+    max_attempts: int = 5
+    """Макс. кол-во попыток отправки одного сообщения."""
+    max_interval: float = 60
+    """Макс. интервал между сообщениями (в секундах)."""
+
+    def __init__(self):
+        self.chat_interval: float = 0
+        """Текущий мин. интервал между сообщениями в один чат (в секундах)."""
+        self.multiuser_interval: float = 0
+        """Текущий мин. интервал между сообщениями разным пользователям (в секундах)."""
+        self.__queue: list[OutgoingMessage] = []
+        self.__order: dict[int, int] = {}
+        """Порядковые номера сообщений в очереди ({id(сообщения): номер})."""
+        self.__counter = itertools.count()
+        self.__last_sent: dict[int | str, float] = utils.LRUDict(1000)
+        """Время последней отправки по чатам ({ID чата: time.monotonic()})."""
+        self.__last_chat_id: int | str | None = None
+        self.__last_send_time: float = 0
+        self.__lock = threading.Lock()
+
+    def put(self, message: OutgoingMessage) -> OutgoingMessage:
+        """
+        Добавляет сообщение в очередь.
+
+        :return: сообщение в очереди: переданное или то, с которым оно было склеено
+            (результат отправки - в его future).
+        """
+        with self.__lock:
+            if (merged := self.__coalesce(message)) is not None:
+                return merged
+            self.__queue.append(message)
+            self.__order[id(message)] = next(self.__counter)
+            return message
+
+    def __coalesce(self, message: OutgoingMessage) -> OutgoingMessage | None:
+        if message.image_id is not None or not message.text:
+            return None
+        last = next((i for i in reversed(self.__queue) if i.chat_id == message.chat_id), None)
+        if last is None or last.image_id is not None or not last.text or last.future.running() \
+                or last.future.cancelled() or len(last.text) + len(message.text) + 1 > self.max_coalesced_length \
+                or (last.add_to_ignore_list, last.update_last_saved_message, last.leave_as_unread) != \
+                (message.add_to_ignore_list, message.update_last_saved_message, message.leave_as_unread):
+            return None
+        last.text = f"{last.text}\n{message.text}"
+        last.priority = max(last.priority, message.priority)
+        return last
+
+    def pop(self) -> OutgoingMessage | None:
+        """
+        Достает из очереди сообщение, которое можно отправить прямо сейчас (None, если таких нет).
+        Сообщения, отправка которых была отменена (future.cancel()), пропускаются.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            ready = [i for i in self.__queue if i.not_before <= now
+                     and now - self.__last_sent.get(i.chat_id, float("-inf")) >= self.chat_interval
+                     and (i.chat_id == self.__last_chat_id
+                          or now - self.__last_send_time >= self.multiuser_interval)]
+            ready.sort(key=lambda i: (-i.priority, self.__order[id(i)]))
+            for message in ready:
+                self.__queue.remove(message)
+                del self.__order[id(message)]
+                if message.future.running() or message.future.set_running_or_notify_cancel():
+                    return message
+            return None
+
+    def sent(self, message: OutgoingMessage, result: types.Message):
+        """
+        Отмечает сообщение как отправленное.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__last_sent[message.chat_id] = now
+            self.__last_chat_id = message.chat_id
+            self.__last_send_time = now
+            self.chat_interval *= 0.9
+            self.multiuser_interval *= 0.9
+        message.future.set_result(result)
+
+    def failed(self, message: OutgoingMessage, error: Exception) -> bool:
+        """
+        Обрабатывает ошибку отправки: после ошибки флуда увеличивает интервалы и возвращает сообщение в очередь.
+
+        :return: True, если сообщение будет отправлено повторно.
+        """
+        retry = False
+        with self.__lock:
+            if isinstance(error, exceptions.MessageNotDeliveredError) and (error.flood or error.multiuser_flood):
+                if error.flood:
+                    self.chat_interval = min(max(self.chat_interval * 2, 1), self.max_interval)
+                if error.multiuser_flood:
+                    self.multiuser_interval = min(max(self.multiuser_interval * 2, 1), self.max_interval)
+                retry = True
+            elif isinstance(error, exceptions.RequestFailedError) and error.status_code == 429:
+                retry = True
+            message.attempts += 1
+            if retry and message.attempts < self.max_attempts:
+                message.not_before = time.monotonic() + max(self.chat_interval, self.multiuser_interval,
+                                                            2 ** message.attempts)
+                self.__queue.append(message)
+                self.__order[id(message)] = next(self.__counter)
+                logger.info(f"Не удалось отправить сообщение в чат {message.chat_id}, повторная попытка через "
+                            f"{message.not_before - time.monotonic():.1f} с.")
+                return True
+        message.future.set_exception(error)
+        return False
+
+    def __len__(self) -> int:
+        return len(self.__queue)
@@ -1,20 +1,51 @@
 from __future__ import annotations
 
 import re
-from typing import TYPE_CHECKING, Generator
+from typing import TYPE_CHECKING, Generator, Callable, Any, TypeVar, Optional
+from concurrent.futures import Future
 
 if TYPE_CHECKING:
     from ..account import Account
+    from .checkpoint import RunnerCheckpoint
 
 import json
 import logging
 from bs4 import BeautifulSoup
 
 from ..common import exceptions
+from .outbox import Outbox, OutgoingMessage
 from .events import *
 
 logger = logging.getLogger("FunPayAPI.runner")
 
+_T = TypeVar("_T")
+
+
+class _Call:
+    """
+    Отложенный вызов (метода аккаунта или паузы между попытками) из сценария Runner'а.
+    Сценарии (методы Runner._*_flow) возвращают его через yield и получают обратно результат вызова.
+    """
+
+    def __init__(self, func: Callable, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+
+class _Parallel:
+    """
+    Независимые друг от друга сценарии Runner'а, которые можно выполнить одновременно.
+    Сценарий, вернувший его через yield, получает обратно список их результатов (в том же порядке).
+    """
+
+    def __init__(self, flows: list[_Flow]):
+        self.flows = flows
+
+
+_Flow = Generator[_Call | _Parallel, Any, _T]
+"""Сценарий Runner'а: генератор, который отдает :class:`_Call` / :class:`_Parallel` и возвращает результат метода."""
+
 
 class Runner:
     """
@@ -39,11 +70,39 @@ class Runner:
         Из событий, связанных с заказами, будет возвращаться только
         :class:`FunPayAPI.updater.events.OrdersListChangedEvent`.
     :type disabled_order_requests: :obj:`bool`, опционально
+
+    :param checkpoint: хранилище контрольных точек. Если указано, Runner продолжит с сохраненного в нем состояния
+        (без Initial* событий) и будет периодически сохранять в него свое состояние
+        (см. :meth:`FunPayAPI.updater.runner.Runner.save_checkpoint`).
+    :type checkpoint: :class:`FunPayAPI.updater.checkpoint.RunnerCheckpoint` or :obj:`None`, опционально
+
+    :param checkpoint_interval: как часто сохранять состояние (в секундах).
+    :type checkpoint_interval: :obj:`int` or :obj:`float`, опционально
+    """
+
+    _sleep = staticmethod(time.sleep)
+    """Пауза между попытками запросов (в :class:`FunPayAPI.updater.async_runner.AsyncRunner` - asyncio.sleep)."""
+    chats_memory_limit: int | None = 10000
+    """
+    Сколько последних активных чатов помнит Runner (runner_last_messages, last_messages_ids, by_bot_ids).
+    Чаты, которые дольше всех не обновлялись, забываются (None - помнить все).
+    """
+    hot_chats_ttl: int | float = 5 * 60
+    """
+    Сколько секунд после последнего нового сообщения история чата запрашивается вместе с основным запросом
+    к runner/ (если в нем есть место, см. runner_len): новые сообщения таких чатов приходят без доп. запроса.
+    """
+    orders_refresh_delay: int | float = 5
+    """
+    Мин. интервал между запросами списка продаж (в секундах). Если счетчики заказов меняются чаще
+    (пачка оплат / подтверждений), список продаж запрашивается один раз по истечении интервала,
+    OrdersListChangedEvent при этом возвращаются сразу.
     """
 
     def __init__(self, account: Account, disable_message_requests: bool = False,
                  disabled_order_requests: bool = False,
-                 disabled_buyer_viewing_requests: bool = True):
+                 disabled_buyer_viewing_requests: bool = True, checkpoint: RunnerCheckpoint | None = None,
+                 checkpoint_interval: int | float = 60):
         # todo добавить события и исключение событий о новых покупках (не продажах!)
         if not account.is_initiated:
             raise exceptions.AccountNotInitiatedError()
@@ -64,14 +123,14 @@ class Runner:
         self.saved_orders: dict[str, types.OrderShortcut] = {}
         """Сохраненные состояния заказов ({ID заказа: экземпляр types.OrderShortcut})."""
 
-        self.runner_last_messages: dict[int, list[int, int, str | None]] = {}
-        """ID последний сообщений {ID чата: [ID последего сообщения чата, ID последнего прочитанного сообщения чата, 
-        текст последнего сообщения или None, если это изображение]}."""
+        self.runner_last_messages: dict[int, tuple[int, int, str | None]] = utils.LRUDict(self.chats_memory_limit)
+        """ID последний сообщений {ID чата: (ID последего сообщения чата, ID последнего прочитанного сообщения чата, 
+        текст последнего сообщения или None, если это изображение)}."""
 
-        self.by_bot_ids: dict[int, list[int]] = {}
+        self.by_bot_ids: dict[int, list[int]] = utils.LRUDict(self.chats_memory_limit)
         """ID сообщений, отправленных с помощью self.account.send_message ({ID чата: [ID сообщения, ...]})."""
 
-        self.last_messages_ids: dict[int, int] = {}
+        self.last_messages_ids: dict[int, int] = utils.LRUDict(self.chats_memory_limit)
         """ID последних сообщений в чатах ({ID чата: ID последнего сообщения})."""
 
         self.buyers_viewing: dict[int, types.BuyerViewing] = {}
@@ -81,6 +140,11 @@ class Runner:
         """Количество событий, на которое успешно отвечает funpay.com/runner/"""
         self.__interlocutor_ids: set = set()
         """Айди собеседников, у которых будет получено поле "Покупатель смотрит\""""
+        self.outbox: Outbox = Outbox()
+        """Очередь исходящих сообщений (см. :meth:`FunPayAPI.updater.runner.Runner.queue_message`)."""
+        self.__hot_chats: dict[int, list[str, str | None, float]] = utils.LRUDict(self.runner_len - 2)
+        """Чаты, история которых запрашивается в основном запросе к runner/ ({ID чата: [тег, никнейм собеседника,
+        время последнего нового сообщения]})."""
 
         self.account: Account = account
         """Экземпляр аккаунта, к которому привязан Runner."""
@@ -88,6 +152,57 @@ class Runner:
 
         self.__msg_time_re = re.compile(r"\d{2}:\d{2}")
 
+        self.poll_scheduler: utils.PollScheduler | None = None
+        """Планировщик интервала опроса runner/ (создается в :meth:`FunPayAPI.updater.runner.Runner.listen`)."""
+
+        self.checkpoint: RunnerCheckpoint | None = checkpoint
+        """Хранилище контрольных точек."""
+        self.checkpoint_interval: int | float = checkpoint_interval
+        """Как часто сохранять состояние (в секундах)."""
+        self.__last_checkpoint_time: float = time.time()
+        self.__restored_orders: dict[str, types.OrderStatuses] = {}
+        """Статусы заказов из контрольной точки (до первого обновления списка заказов)."""
+        self.__last_orders_refresh: float = 0
+        """Время последнего запроса списка продаж."""
+        self.__orders_dirty: bool = False
+        """Изменились ли счетчики заказов после последнего запроса списка продаж."""
+        if checkpoint and (state := checkpoint.load(account.id)):
+            self._load_state(state)
+
+    @property
+    def poll_interval(self) -> float | None:
+        """
+        Текущий интервал опроса runner/ в секундах (None, если :meth:`FunPayAPI.updater.runner.Runner.listen`
+        еще не запущен).
+        """
+        return self.poll_scheduler.interval if self.poll_scheduler else None
+
+    def _execute(self, flow: _Flow[_T]) -> _T:
+        """
+        Выполняет сценарий Runner'а: выполняет каждый отложенный вызов и передает результат обратно в сценарий.
+        Независимые сценарии (:class:`_Parallel`) выполняются по очереди.
+        Вся логика создания событий живет в сценариях, поэтому её используют и
+        :class:`FunPayAPI.updater.runner.Runner`, и :class:`FunPayAPI.updater.async_runner.AsyncRunner`.
+
+        :param flow: сценарий Runner'а.
+
+        :return: результат сценария.
+        """
+        try:
+            call = next(flow)
+            while True:
+                try:
+                    if isinstance(call, _Parallel):
+                        result = [self._execute(i) for i in call.flows]
+                    else:
+                        result = call.func(*call.args, **call.kwargs)
+                except Exception as e:
+                    call = flow.throw(e)
+                else:
+                    call = flow.send(result)
+        except StopIteration as e:
+            return e.value
+
     def get_updates(self) -> dict:
         """
         Запрашивает список событий FunPay.
@@ -95,6 +210,9 @@ class Runner:
         :return: ответ FunPay.
         :rtype: :obj:`dict`
         """
+        return self._execute(self._get_updates_flow())
+
+    def _get_updates_flow(self) -> _Flow[dict]:
         orders = {
             "type": "orders_counters",
             "id": self.account.id,
@@ -111,9 +229,28 @@ class Runner:
                    "id": str(buyer),
                    "tag": utils.random_tag(),
                    "data": False} for buyer in self.__interlocutor_ids or []]
+        # следующее сообщение из очереди отправляется этим же запросом
+        outgoing = self.outbox.pop()
+        nodes = []
+        if outgoing and not outgoing.leave_as_unread:
+            # узел чата нужен для получения ID отправленного сообщения (и помечает чат прочитанным)
+            if hot_chat := self.__hot_chats.get(outgoing.chat_id):
+                nodes.append(self.account._chat_node_object(outgoing.chat_id, hot_chat[0],
+                                                            self.last_messages_ids.get(outgoing.chat_id, -1)))
+            else:
+                nodes.append(self.account._chat_node_object(outgoing.chat_id))
+        if self.make_msg_requests and (free := self.runner_len - 2 - len(buyers) - len(nodes)) > 0:
+            for chat_id in [k for k, v in self.__hot_chats.items() if time.time() - v[2] > self.hot_chats_ttl]:
+                del self.__hot_chats[chat_id]
+            # чат исходящего сообщения уже добавлен или (leave_as_unread) не должен помечаться прочитанным
+            hot_chats = [(chat_id, tag) for chat_id, (tag, _, _) in self.__hot_chats.items()
+                         if not outgoing or chat_id != outgoing.chat_id]
+            nodes.extend(self.account._chat_node_object(chat_id, tag, self.last_messages_ids.get(chat_id, -1))
+                         for chat_id, tag in hot_chats[-free:])
         payload = {
-            "objects": json.dumps([orders, chats, *buyers]),
-            "request": False,
+            "objects": json.dumps([orders, chats, *buyers, *nodes]),
+            "request": json.dumps(self.account._message_request(outgoing.chat_id, outgoing.text, outgoing.image_id))
+            if outgoing else False,
             "csrf_token": self.account.csrf_token
         }
         headers = {
@@ -122,7 +259,21 @@ class Runner:
             "x-requested-with": "XMLHttpRequest"
         }
 
-        response = self.account.method("post", "runner/", headers, payload, raise_not_200=True)
+        try:
+            response = yield _Call(self.account.method, "post", "runner/", headers, payload, raise_not_200=True)
+        except Exception as e:
+            if outgoing:
+                self.outbox.failed(outgoing, e)
+            raise
+        if outgoing:
+            try:
+                message = self.account._parse_sent_message(
+                    response, outgoing.chat_id, outgoing.text, outgoing.chat_name, outgoing.interlocutor_id,
+                    outgoing.add_to_ignore_list, outgoing.update_last_saved_message, outgoing.leave_as_unread)
+            except Exception as e:
+                self.outbox.failed(outgoing, e)
+            else:
+                self.outbox.sent(outgoing, message)
         json_response = response.json()
         logger.debug(f"Получены данные о событиях: {json_response}")
         return json_response
@@ -145,16 +296,36 @@ class Runner:
             :class:`FunPayAPI.updater.events.NewOrderEvent`,
             :class:`FunPayAPI.updater.events.OrderStatusChangedEvent`
         """
+        return self._execute(self._parse_updates_flow(updates))
+
+    def _parse_updates_flow(self, updates: dict) -> _Flow[list]:
         events = []
+        flows, buyers = [], []
+        prefetched = {}
+        orders_updated = False
+        for obj in updates["objects"]:
+            if obj.get("type") == "chat_node" and (hot_chat := self.__hot_chats.get(obj.get("id"))):
+                hot_chat[0] = obj.get("tag")
+                if obj.get("data"):
+                    prefetched[obj.get("id")] = self.account.parse_chat_node(obj, hot_chat[1])
         # сортируем в т.ч. для того, корректно реагировало на сообщения покупателей сразу после оплаты (плагины автовыдачи)
         for obj in sorted(updates["objects"], key=lambda x: x.get("type") == "orders_counters", reverse=True):
             if obj.get("type") == "chat_bookmarks":
-                events.extend(self.parse_chat_updates(obj))
+                flows.append(self._parse_chat_updates_flow(obj, prefetched))
             elif obj.get("type") == "orders_counters":
-                events.extend(self.parse_order_updates(obj))
+                flows.append(self._parse_order_updates_flow(obj))
+                orders_updated = True
             elif obj.get("type") == "c-p-u":
-                bv = self.account.parse_buyer_viewing(obj)
-                self.buyers_viewing[bv.buyer_id] = bv
+                buyers.append(obj)
+        if not orders_updated and self.__orders_dirty and \
+                time.time() - self.__last_orders_refresh >= self.orders_refresh_delay:
+            flows.insert(0, self._refresh_orders_flow())
+        # обновление списка заказов и получение историй чатов друг от друга не зависят
+        for result in (yield _Parallel(flows)):
+            events.extend(result)
+        for obj in buyers:
+            bv = self.account.parse_buyer_viewing(obj)
+            self.buyers_viewing[bv.buyer_id] = bv
         if self.__first_request:
             self.__first_request = False
         return events
@@ -174,6 +345,14 @@ class Runner:
             :class:`FunPayAPI.updater.events.LastChatMessageChangedEvent`,
             :class:`FunPayAPI.updater.events.NewMessageEvent`
         """
+        return self._execute(self._parse_chat_updates_flow(obj))
+
+    def _parse_chat_updates_flow(self, obj, prefetched: dict[int, list[types.Message]] | None = None) -> _Flow[list]:
+        """
+        Сценарий :meth:`FunPayAPI.updater.runner.Runner.parse_chat_updates`.
+
+        :param prefetched: истории чатов, полученные в том же запросе к runner/ ({ID чата: [сообщения]}).
+        """
         events, lcmc_events = [], []
         self.__last_msg_event_tag = obj.get("tag")
         parser = BeautifulSoup(obj["data"]["html"], "lxml")
@@ -199,13 +378,13 @@ class Runner:
                 last_msg_text = last_msg_text[1:]
                 by_vertex = True
             # если сообщение отправлено непрочитанным и вкл старый режим, то [0, 0, None] или [0, 0, "text"]
-            prev_node_msg_id, prev_user_msg_id, prev_text = self.runner_last_messages.get(chat_id) or [-1, -1, None]
+            prev_node_msg_id, prev_user_msg_id, prev_text = self.runner_last_messages.get(chat_id) or (-1, -1, None)
             last_msg_text_or_none = None if last_msg_text in ("Изображение", "Зображення", "Image") else last_msg_text
             if node_msg_id <= prev_node_msg_id:
                 continue
             elif not prev_node_msg_id and not prev_user_msg_id and prev_text == last_msg_text_or_none:
                 # значит сообщение отправлено ботом и оставлено непрочитанным - просто обновляем инфу
-                self.runner_last_messages[chat_id] = [node_msg_id, user_msg_id, last_msg_text_or_none]
+                self.runner_last_messages[chat_id] = (node_msg_id, user_msg_id, last_msg_text_or_none)
                 continue
             unread = True if "unread" in chat.get("class") else False
 
@@ -217,7 +396,7 @@ class Runner:
                 chat_obj.last_by_vertex = by_vertex
 
             self.account.add_chats([chat_obj])
-            self.runner_last_messages[chat_id] = [node_msg_id, user_msg_id, last_msg_text_or_none]
+            self.runner_last_messages[chat_id] = (node_msg_id, user_msg_id, last_msg_text_or_none)
             if self.__first_request:
                 events.append(InitialChatEvent(self.__last_msg_event_tag, chat_obj))
                 if self.make_msg_requests:
@@ -250,6 +429,17 @@ class Runner:
                                                                      for i in lcmc_events_with_new_mess if
                                                                      i.chat.id in self.account.interlocutor_ids])
 
+        # если история чата уже пришла вместе с основным запросом и в ней есть последнее сообщение,
+        # доп. запрос не нужен
+        prefetched = prefetched or {}
+        hot_pack = [i for i in lcmc_events_with_new_mess
+                    if (msgs := prefetched.get(i.chat.id)) and msgs[-1].id >= i.chat.node_msg_id]
+        if hot_pack:
+            lcmc_events_with_new_mess = [i for i in lcmc_events_with_new_mess if i not in hot_pack]
+            new_msg_events = self._new_message_events({i.chat.id: prefetched[i.chat.id] for i in hot_pack},
+                                                      {i.chat.id: i.chat.name for i in hot_pack})
+            self.__add_new_message_events(events, hot_pack, new_msg_events)
+
         while lcmc_events_with_new_mess or len(self.__interlocutor_ids) >= self.runner_len - 2:
             chats_pack = lcmc_events_with_new_mess[:self.runner_len]
             del lcmc_events_with_new_mess[:self.runner_len]
@@ -261,22 +451,25 @@ class Runner:
                     bv_pack.append(interlocutor_id)
 
             chats_data = {i.chat.id: i.chat.name for i in chats_pack}
-            new_msg_events = self.generate_new_message_events(chats_data, bv_pack)
-
-            if self.make_buyer_viewing_requests:
-                # Если раньше айди не знали, то добавляем
-                for chat_id, msgs in new_msg_events.items():
-                    if chat_id not in self.account.interlocutor_ids and msgs and msgs[0].message.interlocutor_id:
-                        self.account.interlocutor_ids[chat_id] = msgs[0].message.interlocutor_id
-                        self.__interlocutor_ids.add(msgs[0].message.interlocutor_id)
-
-            # [LastChatMessageChanged, NewMSG, NewMSG ..., LastChatMessageChanged, NewMSG, NewMSG ...]
-            for i in chats_pack:
-                events.append(i)
-                if new_msg_events.get(i.chat.id):
-                    events.extend(new_msg_events[i.chat.id])
+            new_msg_events = yield from self._generate_new_message_events_flow(chats_data, bv_pack)
+            self.__add_new_message_events(events, chats_pack, new_msg_events)
         return events
 
+    def __add_new_message_events(self, events: list, chats_pack: list[LastChatMessageChangedEvent],
+                                 new_msg_events: dict[int, list[NewMessageEvent]]):
+        if self.make_buyer_viewing_requests:
+            # Если раньше айди не знали, то добавляем
+            for chat_id, msgs in new_msg_events.items():
+                if chat_id not in self.account.interlocutor_ids and msgs and msgs[0].message.interlocutor_id:
+                    self.account.interlocutor_ids[chat_id] = msgs[0].message.interlocutor_id
+                    self.__interlocutor_ids.add(msgs[0].message.interlocutor_id)
+
+        # [LastChatMessageChanged, NewMSG, NewMSG ..., LastChatMessageChanged, NewMSG, NewMSG ...]
+        for i in chats_pack:
+            events.append(i)
+            if new_msg_events.get(i.chat.id):
+                events.extend(new_msg_events[i.chat.id])
+
     def generate_new_message_events(self, chats_data: dict[int, str],
                                     interlocutor_ids: list[int] | None = None) -> dict[int, list[NewMessageEvent]]:
         """
@@ -290,28 +483,42 @@ class Runner:
         :return: словарь с событиями новых сообщений в формате {ID чата: [список событий]}
         :rtype: :obj:`dict` {:obj:`int`: :obj:`list` of :class:`FunPayAPI.updater.events.NewMessageEvent`}
         """
+        return self._execute(self._generate_new_message_events_flow(chats_data, interlocutor_ids))
+
+    def _generate_new_message_events_flow(self, chats_data: dict[int, str], interlocutor_ids: list[int] | None = None) \
+            -> _Flow[dict[int, list[NewMessageEvent]]]:
         attempts = 3
         while attempts:
             attempts -= 1
             try:
-                chats = self.account.get_chats_histories(chats_data, interlocutor_ids)
+                chats = yield _Call(self.account.get_chats_histories, chats_data, interlocutor_ids)
                 break
             except exceptions.RequestFailedError as e:
                 logger.error(e)
-            except:
+            except Exception:
                 logger.error(f"Не удалось получить истории чатов {list(chats_data.keys())}.")
                 logger.debug("TRACEBACK", exc_info=True)
-            time.sleep(1)
+            yield _Call(self._sleep, 1)
         else:
             logger.error(f"Не удалось получить истории чатов {list(chats_data.keys())}: превышено кол-во попыток.")
             return {}
+        return self._new_message_events(chats, chats_data)
+
+    def _new_message_events(self, chats: dict[int, list[types.Message]],
+                            chats_data: dict[int, str]) -> dict[int, list[NewMessageEvent]]:
+        """
+        Генерирует события новых сообщений по историям чатов.
+
+        :param chats: истории чатов ({ID чата: [сообщения]}).
+        :param chats_data: ID чатов и никнеймы собеседников.
 
+        :return: словарь с событиями новых сообщений в формате {ID чата: [список событий]}
+        """
         result = {}
 
         for cid in chats:
             messages = chats[cid]
             result[cid] = []
-            self.by_bot_ids[cid] = self.by_bot_ids.get(cid) or []
 
             # Удаляем все сообщения, у которых ID меньше сохраненного последнего сообщения
             if self.last_messages_ids.get(cid):
@@ -333,12 +540,19 @@ class Runner:
                             m.id > min(self.last_messages_ids.values(), default=10 ** 20)] or messages[-1:]
 
             self.last_messages_ids[cid] = messages[-1].id  # Перезаписываем ID последнего сообщение
-            self.by_bot_ids[cid] = [i for i in self.by_bot_ids[cid] if i > self.last_messages_ids[cid]]  # чистим память
+            # чистим память
+            if by_bot_ids := [i for i in self.by_bot_ids.get(cid, []) if i > self.last_messages_ids[cid]]:
+                self.by_bot_ids[cid] = by_bot_ids
+            else:
+                self.by_bot_ids.pop(cid, None)
 
             for msg in messages:
                 event = NewMessageEvent(self.__last_msg_event_tag, msg, stack)
                 stack.add_events([event])
                 result[cid].append(event)
+
+            hot_chat = self.__hot_chats.get(cid)
+            self.__hot_chats[cid] = [hot_chat[0] if hot_chat else "00000000", chats_data.get(cid), time.time()]
         return result
 
     def parse_order_updates(self, obj) -> list[InitialOrderEvent | OrdersListChangedEvent | NewOrderEvent |
@@ -356,6 +570,9 @@ class Runner:
             :class:`FunPayAPI.updater.events.NewOrderEvent`,
             :class:`FunPayAPI.updater.events.OrderStatusChangedEvent`
         """
+        return self._execute(self._parse_order_updates_flow(obj))
+
+    def _parse_order_updates_flow(self, obj) -> _Flow[list]:
         events = []
         self.__last_order_event_tag = obj.get("tag")
         if not self.__first_request:
@@ -363,27 +580,45 @@ class Runner:
                                                  obj["data"]["buyer"], obj["data"]["seller"]))
         if not self.make_order_requests:
             return events
+        if not self.__first_request and time.time() - self.__last_orders_refresh < self.orders_refresh_delay:
+            # список продаж запросим позже одним запросом (см. _parse_updates_flow)
+            self.__orders_dirty = True
+            return events
+        events.extend((yield from self._refresh_orders_flow()))
+        return events
 
+    def _refresh_orders_flow(self) -> _Flow[list]:
+        """
+        Запрашивает список продаж и сравнивает его с сохраненным.
+        """
+        events = []
+        self.__last_orders_refresh = time.time()
+        self.__orders_dirty = False
         attempts = 3
         while attempts:
             attempts -= 1
             try:
-                orders_list = self.account.get_sales()  # todo добавить возможность реакции на подтверждение очень старых заказов
+                orders_list = yield _Call(self.account.get_sales)  # todo добавить возможность реакции на подтверждение очень старых заказов
                 break
             except exceptions.RequestFailedError as e:
                 logger.error(e)
-            except:
+            except Exception:
                 logger.error("Не удалось обновить список заказов.")
                 logger.debug("TRACEBACK", exc_info=True)
-            time.sleep(1)
+            yield _Call(self._sleep, 1)
         else:
             logger.error("Не удалось обновить список продаж: превышено кол-во попыток.")
+            self.__orders_dirty = True
             return events
 
         saved_orders = {}
         for order in orders_list[1]:
             saved_orders[order.id] = order
-            if order.id not in self.saved_orders:
+            if order.id in self.saved_orders:
+                prev_status = self.saved_orders[order.id].status
+            else:
+                prev_status = self.__restored_orders.get(order.id)
+            if prev_status is None:
                 if self.__first_request:
                     events.append(InitialOrderEvent(self.__last_order_event_tag, order))
                 else:
@@ -391,11 +626,110 @@ class Runner:
                     if order.status == types.OrderStatuses.CLOSED:
                         events.append(OrderStatusChangedEvent(self.__last_order_event_tag, order))
 
-            elif order.status != self.saved_orders[order.id].status:
+            elif order.status != prev_status:
                 events.append(OrderStatusChangedEvent(self.__last_order_event_tag, order))
         self.saved_orders = saved_orders
+        self.__restored_orders = {}
         return events
 
+    def queue_message(self, chat_id: int | str, text: Optional[str] = None, chat_name: Optional[str] = None,
+                      interlocutor_id: Optional[int] = None, image_id: Optional[int] = None,
+                      add_to_ignore_list: bool = True, update_last_saved_message: bool = False,
+                      leave_as_unread: bool = False, priority: int = 0,
+                      urgent: bool = False) -> Future[types.Message]:
+        """
+        Ставит сообщение в очередь на отправку. Сообщения из очереди отправляются по одному вместе с очередными
+        запросами :meth:`FunPayAPI.updater.runner.Runner.listen` к runner/ (без отдельного запроса на отправку).\n
+        Параметры те же, что и у :meth:`FunPayAPI.account.Account.send_message`.
+
+        Очередь учитывает ограничения FunPay на частоту сообщений, склеивает тексты, подряд отправляемые в один чат,
+        и повторяет отправку после ошибок флуда (см. :class:`FunPayAPI.updater.outbox.Outbox`).
+
+        Не дожидайтесь результата внутри обработчика событий :meth:`FunPayAPI.updater.runner.Runner.listen`:
+        сообщение будет отправлено только на следующей итерации.
+
+        :param priority: приоритет (сообщения с бОльшим приоритетом отправляются раньше, например,
+            выдача товара раньше приветствий).
+        :type priority: :obj:`int`, опционально
+
+        :param urgent: отправить сообщение сразу отдельным запросом (через
+            :meth:`FunPayAPI.account.Account.send_message`), не дожидаясь очередного запроса к runner/.
+        :type urgent: :obj:`bool`, опционально
+
+        :return: результат отправки (экземпляр отправленного сообщения или исключение
+            :class:`FunPayAPI.common.exceptions.MessageNotDeliveredError`).
+        :rtype: :class:`concurrent.futures.Future` of :class:`FunPayAPI.types.Message`
+        """
+        message = OutgoingMessage(chat_id, text, chat_name, interlocutor_id, image_id, add_to_ignore_list,
+                                  update_last_saved_message, leave_as_unread, priority)
+        if urgent:
+            self._send_now(message)
+            return message.future
+        return self.outbox.put(message).future
+
+    def _send_now(self, message: OutgoingMessage):
+        """
+        Отправляет сообщение отдельным запросом (см. :meth:`FunPayAPI.updater.runner.Runner.queue_message`).
+        """
+        if not message.future.set_running_or_notify_cancel():
+            return
+        try:
+            message.future.set_result(self.account.send_message(**message.send_kwargs()))
+        except Exception as e:
+            message.future.set_exception(e)
+
+    def save_checkpoint(self):
+        """
+        Сохраняет состояние Runner'а в :attr:`FunPayAPI.updater.runner.Runner.checkpoint` (если оно указано).\n
+        :meth:`FunPayAPI.updater.runner.Runner.listen` вызывает его сам раз в `checkpoint_interval` секунд
+        после того, как все полученные события были отданы обработчикам.
+        """
+        self.__last_checkpoint_time = time.time()
+        if self.checkpoint:
+            self.checkpoint.save(self.account.id, self._dump_state())
+
+    def _maybe_save_checkpoint(self, pending_events: list):
+        """
+        Сохраняет состояние Runner'а, если пора и нет событий, отложенных до следующей итерации
+        (иначе после перезапуска они будут потеряны).
+
+        :param pending_events: события, отложенные до следующей итерации.
+        """
+        if self.checkpoint and not pending_events and not self.__first_request \
+                and time.time() - self.__last_checkpoint_time >= self.checkpoint_interval:
+            self.save_checkpoint()
+
+    def _dump_state(self) -> dict:
+        """
+        Возвращает состояние Runner'а для контрольной точки.
+        """
+        orders = {i.id: i.status.name for i in self.saved_orders.values()} if self.saved_orders \
+            else {k: v.name for k, v in self.__restored_orders.items()}
+        return {
+            "msg_tag": self.__last_msg_event_tag,
+            "order_tag": self.__last_order_event_tag,
+            "orders": orders,
+            "runner_last_messages": self.runner_last_messages,
+            "last_messages_ids": self.last_messages_ids,
+            "by_bot_ids": self.by_bot_ids
+        }
+
+    def _load_state(self, state: dict):
+        """
+        Восстанавливает состояние Runner'а из контрольной точки.
+        """
+        self.__last_msg_event_tag = state["msg_tag"]
+        self.__last_order_event_tag = state["order_tag"]
+        self.__restored_orders = {k: types.OrderStatuses[v] for k, v in state["orders"].items()}
+        self.runner_last_messages = utils.LRUDict(self.chats_memory_limit, ((int(k), tuple(v)) for k, v in
+                                                                            state["runner_last_messages"].items()))
+        self.last_messages_ids = utils.LRUDict(self.chats_memory_limit, ((int(k), v) for k, v in
+                                                                         state["last_messages_ids"].items()))
+        self.by_bot_ids = utils.LRUDict(self.chats_memory_limit, ((int(k), v) for k, v in state["by_bot_ids"].items()))
+        self.__first_request = False
+        logger.info(f"Состояние Runner'а восстановлено из контрольной точки ({len(self.runner_last_messages)} чатов, "
+                    f"{len(self.__restored_orders)} заказов).")
+
     def update_last_message(self, chat_id: int, message_id: int, message_text: str | None):
         """
         Обновляет сохраненный ID последнего сообщения чата.
@@ -409,7 +743,7 @@ class Runner:
         :param message_text: текст сообщения или None, если это изображение.
         :type message_text: :obj:`str` or :obj:`None`
         """
-        self.runner_last_messages[chat_id] = [message_id, message_id, message_text]
+        self.runner_last_messages[chat_id] = (message_id, message_id, message_text)
 
     def mark_as_by_bot(self, chat_id: int, message_id: int):
         """
@@ -427,7 +761,8 @@ class Runner:
             self.by_bot_ids[chat_id].append(message_id)
 
     def listen(self, requests_delay: int | float = 6.0,
-               ignore_exceptions: bool = True) -> Generator[InitialChatEvent | ChatsListChangedEvent |
+               ignore_exceptions: bool = True, min_delay: int | float | None = None,
+               max_delay: int | float | None = None) -> Generator[InitialChatEvent | ChatsListChangedEvent |
                                                             LastChatMessageChangedEvent | NewMessageEvent |
                                                             InitialOrderEvent | OrdersListChangedEvent | NewOrderEvent |
                                                             OrderStatusChangedEvent]:
@@ -440,6 +775,15 @@ class Runner:
         :param ignore_exceptions: игнорировать ошибки?
         :type ignore_exceptions: :obj:`bool`, опционально
 
+        :param min_delay: задержка сразу после новых событий (в секундах). Если не указана - `requests_delay`.\n
+            После каждого запроса без событий задержка увеличивается в 1.5 раза, но не больше `max_delay`.
+            В течение минуты после ошибки 429 задержка не бывает меньше `requests_delay`.
+            Текущая задержка доступна в :attr:`FunPayAPI.updater.runner.Runner.poll_interval`.
+        :type min_delay: :obj:`int` or :obj:`float` or :obj:`None`, опционально
+
+        :param max_delay: максимальная задержка в период затишья (в секундах). Если не указана - `requests_delay`.
+        :type max_delay: :obj:`int` or :obj:`float` or :obj:`None`, опционально
+
         :return: генератор событий FunPay.
         :rtype: :obj:`Generator` of :class:`FunPayAPI.updater.events.InitialChatEvent`,
             :class:`FunPayAPI.updater.events.ChatsListChangedEvent`,
@@ -449,27 +793,18 @@ class Runner:
             :class:`FunPayAPI.updater.events.NewOrderEvent`,
             :class:`FunPayAPI.updater.events.OrderStatusChangedEvent`
         """
+        self.poll_scheduler = utils.PollScheduler(requests_delay, min_delay, max_delay)
         events = []
         while True:
             start_time = time.time()
+            activity = False
             try:
-                self.__interlocutor_ids = set([event.message.interlocutor_id for event in events
-                                               if event.type == EventTypes.NEW_MESSAGE])
-                updates = self.get_updates()
-                events.extend(self.parse_updates(updates))
-                next_events = []
-                for event in events:
-                    if self.make_msg_requests and self.make_buyer_viewing_requests \
-                            and event.type == EventTypes.NEW_MESSAGE \
-                            and event.message.interlocutor_id is not None:
-                        event.message.buyer_viewing = self.buyers_viewing.get(event.message.interlocutor_id)
-                        if event.message.buyer_viewing is None:
-                            next_events.append(event)
-                            continue
-
+                ready, events = self._execute(self._poll_flow(events))
+                activity = bool(ready or events or len(self.outbox))
+                for event in ready:
                     yield event
-                events = next_events
                 self.buyers_viewing = {}
+                self._maybe_save_checkpoint(events)
             except Exception as e:
                 if not ignore_exceptions:
                     raise e
@@ -477,10 +812,40 @@ class Runner:
                     logger.error("Произошла ошибка при получении событий. "
                                  "(ничего страшного, если это сообщение появляется нечасто).")
                     logger.debug("TRACEBACK", exc_info=True)
-            iteration_time = time.time() - start_time
-            if time.time() - self.account.last_429_err_time > 60:
-                rt = requests_delay - iteration_time
-                if rt > 0:
-                    time.sleep(rt)
-            else:
-                time.sleep(requests_delay)
+            time.sleep(self._next_delay(activity, time.time() - start_time))
+
+    def _next_delay(self, activity: bool, iteration_time: float) -> float:
+        """
+        Пересчитывает интервал опроса и возвращает паузу перед следующим запросом
+        :meth:`FunPayAPI.updater.runner.Runner.listen`.
+
+        :param activity: были ли новые события.
+        :param iteration_time: длительность текущей итерации (в секундах).
+        """
+        interval = self.poll_scheduler.update(activity)
+        logger.debug(f"Интервал опроса runner/: {interval:.2f} с.")
+        return self.poll_scheduler.next_delay(iteration_time, self.account.last_429_err_time)
+
+    def _poll_flow(self, events: list) -> _Flow[tuple[list, list]]:
+        """
+        Сценарий одной итерации :meth:`FunPayAPI.updater.runner.Runner.listen`: получает и парсит новые события.
+
+        :param events: события, отложенные на прошлой итерации (ожидающие поля "Покупатель смотрит").
+
+        :return: события, готовые к выдаче, и события, отложенные до следующей итерации.
+        """
+        self.__interlocutor_ids = set([event.message.interlocutor_id for event in events
+                                       if event.type == EventTypes.NEW_MESSAGE])
+        updates = yield from self._get_updates_flow()
+        events = events + (yield from self._parse_updates_flow(updates))
+        ready, next_events = [], []
+        for event in events:
+            if self.make_msg_requests and self.make_buyer_viewing_requests \
+                    and event.type == EventTypes.NEW_MESSAGE \
+                    and event.message.interlocutor_id is not None:
+                event.message.buyer_viewing = self.buyers_viewing.get(event.message.interlocutor_id)
+                if event.message.buyer_viewing is None:
+                    next_events.append(event)
+                    continue
+            ready.append(event)
+        return ready, next_events
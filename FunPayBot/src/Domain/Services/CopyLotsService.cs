@@ -1,7 +1,6 @@
 ﻿using FunPayBot.src.Application.DTOs.Responses;
 using FunPayBot.src.Domain.Entities;
 using FunPayBot.src.Domain.Services;
-using HtmlAgilityPack;
 using Microsoft.Extensions.Options;
 using System.Globalization;
 using System.Text.Json;
@@ -45,7 +44,7 @@ namespace FunPayBot.src.Domain.Services
             }
 
             var authData = await authResponse.Content.ReadFromJsonAsync<AuthResponse>();
-            string csrfToken = authData.CsrfToken;
+            _logger.LogInformation("Authenticated as {Username}", authData?.Username);
 
             if (!parameters.TryGetValue("lots", out var lotsObj))
             {
@@ -61,82 +60,87 @@ namespace FunPayBot.src.Domain.Services
             }
 
             var createdLots = new List<LotResponse>();
+            // Поля всех лотов отправляются одним запросом: FastAPI сам берет шаблоны форм подкатегорий
+            // и сохраняет лоты одной сессией FunPay
+            var lotsFields = new List<Dictionary<string, string>>();
 
             foreach (var lot in userLots)
             {
-                try
-                {
-                    // Запрос полей для нового лота
-                    string getFieldsUrl = $"lots/offerEdit?offer=0&node={lot.SubcategoryId}&golden_key={_funPaySettings.GoldenKey}";
-                    _logger.LogInformation("Requesting fields for SubcategoryId: {SubcategoryId}, URL: {Url}", lot.SubcategoryId, getFieldsUrl);
-                    var fieldsResponse = await _pythonApiClient.GetAsync(getFieldsUrl);
-                    if (!fieldsResponse.IsSuccessStatusCode)
-                    {
-                        var errorContent = await fieldsResponse.Content.ReadAsStringAsync();
-                        _logger.LogError("Failed to get lot fields: {StatusCode} - {Error}",
-                            fieldsResponse.StatusCode, errorContent);
-
-                        if (fieldsResponse.StatusCode == System.Net.HttpStatusCode.UnprocessableEntity)
-                        {
-                            _logger.LogWarning("422 Error - likely invalid subcategory or insufficient permissions for SubcategoryId: {SubcategoryId}",
-                                lot.SubcategoryId);
-                            // Можно попробовать пропустить этот лот или использовать другую подкатегорию
-                            continue;
-                        }
-
-                        throw new Exception($"Failed to get lot fields: {fieldsResponse.StatusCode} - {errorContent}");
-                    }
-
-                    var htmlContent = await fieldsResponse.Content.ReadAsStringAsync();
-                    var fields = ParseLotFieldsFromHtml(htmlContent);
-
-                    // Заполнение полей
-                    fields["csrf_token"] = csrfToken;
-                    fields["offer_id"] = "0";
-                    fields["node_id"] = lot.SubcategoryId.ToString();
-                    fields["price"] = lot.Price.ToString().Replace(",", ".");
-
-                    // Краткие и подробные описания
-                    fields["fields[summary][ru]"] = lot.Title ?? "";
-                    //fields["fields[summary][en]"] = lot.Title ?? "";
-                    fields["fields[summary][en]"] = lot.TitleEn ?? "";
-                    fields["fields[desc][ru]"] = lot.Description ?? "";
-                    fields["fields[desc][en]"] = lot.DescriptionEn ?? lot.TitleEn ?? "";
+                var fields = new Dictionary<string, object>();
+
+                // Заполнение полей
+                fields["offer_id"] = "0";
+                fields["node_id"] = lot.SubcategoryId.ToString();
+                fields["price"] = lot.Price.ToString().Replace(",", ".");
+
+                // Краткие и подробные описания
+                fields["fields[summary][ru]"] = lot.Title ?? "";
+                //fields["fields[summary][en]"] = lot.Title ?? "";
+                fields["fields[summary][en]"] = lot.TitleEn ?? "";
+                fields["fields[desc][ru]"] = lot.Description ?? "";
+                fields["fields[desc][en]"] = lot.DescriptionEn ?? lot.TitleEn ?? "";
+
+                // Динамически получаем ID для полей
+                fields["server_id"] = GetDynamicFieldValue(lot.Attributes, "server") ?? "";
+                fields["side_id"] = GetDynamicFieldValue(lot.Attributes, "side") ?? "";
+                fields["fields[level]"] = GetValueFromAttributes(lot.Attributes, "f-level") ?? "";
+                fields["fields[class]"] = GetDynamicFieldValue(lot.Attributes, "f-class") ?? "";
+
+                fields["param_0"] = lot.Server ?? "";
+                fields["amount"] = lot.Amount?.ToString() ?? "";
+                fields["auto_delivery"] = lot.AutoDelivery ? "on" : "";
+                fields["fields[attributes]"] = lot.Attributes != null ? string.Join(",", lot.Attributes.Select(kv => $"{kv.Key}:{kv.Value}")) : "";
+                fields["fields[class]"] = "%Заклинатель-Spiritmaster";
+
+                lotsFields.Add(fields.ToDictionary(kvp => kvp.Key, kvp => kvp.Value?.ToString() ?? ""));
+            }
 
-                    // Динамически получаем ID для полей
-                    fields["server_id"] = GetDynamicFieldValue(lot.Attributes, "server") ?? "";
-                    fields["side_id"] = GetDynamicFieldValue(lot.Attributes, "side") ?? "";
-                    fields["fields[level]"] = GetValueFromAttributes(lot.Attributes, "f-level") ?? "";
-                    fields["fields[class]"] = GetDynamicFieldValue(lot.Attributes, "f-class") ?? "";
+            using var bulkRequest = new HttpRequestMessage(HttpMethod.Post,
+                $"lots/bulk-create?golden_key={_funPaySettings.GoldenKey}")
+            {
+                Content = JsonContent.Create(new { lots = lotsFields })
+            };
+            // Результаты приходят по мере сохранения лотов (NDJSON, по строке на лот)
+            using var bulkResponse = await _pythonApiClient.SendAsync(bulkRequest, HttpCompletionOption.ResponseHeadersRead);
+            if (!bulkResponse.IsSuccessStatusCode)
+            {
+                var errorContent = await bulkResponse.Content.ReadAsStringAsync();
+                _logger.LogError("FastAPI error while creating lots: {StatusCode} - {Error}", bulkResponse.StatusCode, errorContent);
+                throw new Exception($"Failed to create lots: {bulkResponse.StatusCode} - {errorContent}");
+            }
 
-                    fields["param_0"] = lot.Server ?? "";
-                    fields["amount"] = lot.Amount?.ToString() ?? "";
-                    fields["auto_delivery"] = lot.AutoDelivery ? "on" : "";
-                    fields["fields[attributes]"] = lot.Attributes != null ? string.Join(",", lot.Attributes.Select(kv => $"{kv.Key}:{kv.Value}")) : "";
-                    fields["fields[class]"] = "%Заклинатель-Spiritmaster";
-                    var formContent = new FormUrlEncodedContent(fields.Select(kvp =>
-                        new KeyValuePair<string, string>(kvp.Key, kvp.Value?.ToString() ?? "")));
+            var jsonOptions = new JsonSerializerOptions(JsonSerializerDefaults.Web);
+            using var stream = await bulkResponse.Content.ReadAsStreamAsync();
+            using var reader = new StreamReader(stream);
+            string? line;
+            while ((line = await reader.ReadLineAsync()) != null)
+            {
+                if (string.IsNullOrWhiteSpace(line))
+                {
+                    continue;
+                }
 
-                    var createResponse = await _pythonApiClient.PostAsync(
-                        $"create-lot-from-fields?golden_key={_funPaySettings.GoldenKey}",
-                        formContent
-                    );
-                    if (!createResponse.IsSuccessStatusCode)
+                try
+                {
+                    var result = JsonSerializer.Deserialize<BulkCreateResult>(line, jsonOptions);
+                    if (result == null || result.Index < 0 || result.Index >= userLots.Length)
                     {
-                        var errorContent = await createResponse.Content.ReadAsStringAsync();
-                        _logger.LogError("FastAPI error while creating lot: {StatusCode} - {Error}", createResponse.StatusCode, errorContent);
                         continue;
                     }
 
-                    var createdLot = await createResponse.Content.ReadFromJsonAsync<LotResponse>();
-                    if (createdLot != null)
+                    var lot = userLots[result.Index];
+                    if (result.Success)
+                    {
+                        createdLots.Add(lot);
+                    }
+                    else
                     {
-                        createdLots.Add(createdLot);
+                        _logger.LogError("FastAPI error while creating lot ID: {LotId} - {Error}", lot.Id, result.Error);
                     }
                 }
-                catch (Exception ex)
+                catch (JsonException ex)
                 {
-                    _logger.LogError(ex, "Error copying lot ID: {LotId}", lot.Id);
+                    _logger.LogError(ex, "Failed to parse lot creation result: {Line}", line);
                 }
             }
 
@@ -149,31 +153,6 @@ namespace FunPayBot.src.Domain.Services
                 return null;
             return attrValue?.ToString();
         }
-        private Dictionary<string, string> ParseSelectOptions(string html, string selectName)
-        {
-            var doc = new HtmlDocument();
-            doc.LoadHtml(html);
-
-            var select = doc.DocumentNode
-                .SelectSingleNode($"//select[@name='{selectName}']");
-
-            if (select == null) return new Dictionary<string, string>();
-
-            var options = new Dictionary<string, string>();
-            foreach (var option in select.SelectNodes(".//option"))
-            {
-                var value = option.GetAttributeValue("value", "");
-                var text = option.InnerText?.Trim().ToLower();
-
-                if (!string.IsNullOrEmpty(value) && !string.IsNullOrEmpty(text))
-                {
-                    options[text] = value;
-                }
-            }
-
-            return options;
-        }
-
         private string? GetValueFromAttributes(Dictionary<string, object>? attributes, string key)
         {
             if (attributes != null && attributes.TryGetValue(key, out var value))
@@ -188,78 +167,12 @@ namespace FunPayBot.src.Domain.Services
             public int Id { get; set; }
             public string CsrfToken { get; set; }
         }
-        // Метод для парсинга HTML и извлечения полей
-        private Dictionary<string, object> ParseLotFieldsFromHtml(string htmlContent)
+        // Строка ответа /lots/bulk-create
+        public class BulkCreateResult
         {
-            var fields = new Dictionary<string, object>();
-            var doc = new HtmlDocument();
-            doc.LoadHtml(htmlContent);
-
-            // Парсинг input полей
-            var inputs = doc.DocumentNode.SelectNodes("//input");
-            if (inputs != null)
-            {
-                foreach (var input in inputs)
-                {
-                    var name = input.GetAttributeValue("name", null);
-                    if (name != null)
-                    {
-                        fields[name] = input.GetAttributeValue("value", "");
-                    }
-                }
-            }
-
-            // Парсинг textarea
-            var textareas = doc.DocumentNode.SelectNodes("//textarea");
-            if (textareas != null)
-            {
-                foreach (var textarea in textareas)
-                {
-                    var name = textarea.GetAttributeValue("name", null);
-                    if (name != null)
-                    {
-                        fields[name] = textarea.InnerText.Trim();
-                    }
-                }
-            }
-
-            // Парсинг select
-            var selects = doc.DocumentNode.SelectNodes("//select");
-            if (selects != null)
-            {
-                foreach (var select in selects)
-                {
-                    var name = select.GetAttributeValue("name", null);
-                    if (name != null)
-                    {
-                        var parent = select.ParentNode;
-                        if (parent != null && !parent.GetClasses().Contains("hidden"))
-                        {
-                            var selectedOption = select.SelectSingleNode(".//option[@selected]");
-                            if (selectedOption != null)
-                            {
-                                fields[name] = selectedOption.GetAttributeValue("value", "");
-                            }
-                        }
-                    }
-                }
-            }
-
-            // Парсинг checkbox
-            var checkboxes = doc.DocumentNode.SelectNodes("//input[@type='checkbox']");
-            if (checkboxes != null)
-            {
-                foreach (var checkbox in checkboxes)
-                {
-                    var name = checkbox.GetAttributeValue("name", null);
-                    if (name != null && checkbox.GetAttributeValue("checked", null) != null)
-                    {
-                        fields[name] = "on";
-                    }
-                }
-            }
-
-            return fields;
+            public int Index { get; set; }
+            public bool Success { get; set; }
+            public string? Error { get; set; }
         }
     }
 }
\ No newline at end of file
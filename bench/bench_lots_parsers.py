@@ -0,0 +1,77 @@
+"""
+Сравнение скорости парсеров таблицы лотов подкатегории (BeautifulSoup, lxml и потоковый).
+
+Страница собирается из лотов tests/fixtures/subcategory_lots.html, повторенных до нужного количества.
+
+    python bench/bench_lots_parsers.py [кол-во лотов] [кол-во повторов]
+"""
+from pathlib import Path
+import itertools
+import time
+import sys
+import io
+import re
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+
+from FunPayAPI import types
+from FunPayAPI.account import Account
+from FunPayAPI.common.enums import SubCategoryTypes
+
+FIXTURE = (Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "subcategory_lots.html").read_text("utf-8")
+SUBCATEGORY = types.SubCategory(10, "Аккаунты", SubCategoryTypes.COMMON, types.Category(1, "Game"))
+
+
+def build_listing(count: int) -> bytes:
+    offers = re.findall(r'<a href="https://funpay.com/lots/offer\?id=\d+".*?</a>', FIXTURE, re.S)
+    start, end = FIXTURE.index(offers[0]), FIXTURE.index(offers[-1]) + len(offers[-1])
+    body = "\n".join(re.sub(r"id=\d+", f"id={i}", offer, count=1)
+                     for i, offer in zip(range(1, count + 1), itertools.cycle(offers)))
+    return (FIXTURE[:start] + body + FIXTURE[end:]).encode()
+
+
+class BenchAccount(Account):
+    page: bytes = b""
+
+    def method(self, *args, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        if kwargs.get("stream"):
+            response.raw = io.BytesIO(self.page)
+        else:
+            response._content = self.page
+        return response
+
+    def get_subcategory(self, subcategory_type, subcategory_id):
+        return SUBCATEGORY
+
+
+def main(count: int = 3000, repeats: int = 5):
+    account = BenchAccount("golden_key")
+    account._Account__initiated = True
+    account.page = build_listing(count)
+    print(f"{count} лотов, {len(account.page) / 1024 / 1024:.1f} МБ, лучшее из {repeats} повторов")
+
+    parsers = {
+        "bs4": lambda: account.get_subcategory_public_lots(SubCategoryTypes.COMMON, 10),
+        "lxml": lambda: account.get_subcategory_public_lots(SubCategoryTypes.COMMON, 10),
+        "stream": lambda: list(account.iter_subcategory_public_lots(SubCategoryTypes.COMMON, 10)),
+    }
+    results = {}
+    for name, parse in parsers.items():
+        account.lots_parser = "bs4" if name == "bs4" else "lxml"
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            lots = parse()
+            timings.append(time.perf_counter() - start)
+        assert len(lots) == count
+        results[name] = min(timings)
+    for name, seconds in results.items():
+        print(f"{name:>6}: {seconds * 1000:8.1f} мс  (x{results['bs4'] / seconds:.1f})")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
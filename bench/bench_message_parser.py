@@ -0,0 +1,61 @@
+"""
+Скорость разбора сообщений чатов (Account.__parse_messages) на сообщениях из tests/fixtures/chat_messages.json:
+10 чатов по 50 сообщений, как в одном ответе Runner'а с историями чатов.
+
+    python bench/bench_message_parser.py [--repeats N] [--package ПУТЬ]
+
+--package - каталог с другой версией FunPayAPI для сравнения, например, с парсером до перехода на lxml:
+
+    git worktree add /tmp/funpay-bs4 058450f~1
+    python bench/bench_message_parser.py --package /tmp/funpay-bs4
+"""
+from pathlib import Path
+import argparse
+import json
+import time
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+PAYLOAD = json.loads((ROOT / "tests" / "fixtures" / "chat_messages.json").read_text("utf-8"))
+CHATS, MESSAGES_PER_CHAT = 10, 50
+
+
+def build_histories() -> list[list[dict]]:
+    source = PAYLOAD["messages"]
+    histories = []
+    for chat in range(CHATS):
+        history = []
+        for n in range(MESSAGES_PER_CHAT):
+            message = dict(source[n % len(source)])
+            message["id"] = chat * MESSAGES_PER_CHAT + n + 1
+            history.append(message)
+        histories.append(history)
+    return histories
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--repeats", type=int, default=20)
+    args.add_argument("--package", default=str(ROOT))
+    args = args.parse_args()
+    sys.path.insert(0, args.package)
+    from FunPayAPI.account import Account
+
+    account = Account("golden_key")
+    account.id, account.username = PAYLOAD["account_id"], PAYLOAD["account_username"]
+    parse = account._Account__parse_messages
+    histories = build_histories()
+
+    timings = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        for history in histories:
+            parse(history, PAYLOAD["chat_id"], PAYLOAD["interlocutor_id"])
+        timings.append(time.perf_counter() - start)
+    total = CHATS * MESSAGES_PER_CHAT
+    print(f"{args.package}: {min(timings) * 1000:.1f} мс на {total} сообщений "
+          f"({min(timings) / total * 1e6:.0f} мкс на сообщение, лучшее из {args.repeats})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
 from fastapi import FastAPI, HTTPException, Depends, Query, Form, Request
+from fastapi.responses import StreamingResponse
 from FunPayAPI.account import Account
+from FunPayAPI.async_account import AsyncAccount
 from pydantic import BaseModel
 from FunPayAPI.common import enums
 from FunPayAPI.common.enums import SubCategoryTypes
 from FunPayAPI.types import LotFields, LotShortcut, LotPage
+from FunPayAPI.common import exceptions
+from FunPayAPI.common.image_cache import ImageCache
 import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from concurrent.futures import ThreadPoolExecutor
+import json
 import logging
+import os
+import time
 from typing import List, Optional
 from bs4 import BeautifulSoup
 import requests
@@ -18,6 +27,15 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
+# Каталог категорий FunPay общий для всех аккаунтов и сохраняется между перезапусками сервиса
+# (пустой путь - не сохранять на диск)
+CATEGORIES_CACHE_PATH = os.getenv("FUNPAY_CATEGORIES_CACHE_PATH", "funpay_categories.json")
+# ID выгруженных изображений по хэшу содержимого: одинаковые картинки лотов выгружаются аккаунтом один раз
+# (пустой путь - не кэшировать)
+IMAGE_CACHE_PATH = os.getenv("FUNPAY_IMAGE_CACHE_PATH", "funpay_images.sqlite")
+# Сколько изображений переносится (скачивание + выгрузка на FunPay) одновременно
+IMAGE_TRANSFER_CONCURRENCY = 4
+
 class AuthRequest(BaseModel):
     golden_key: str
     user_agent: str = "Mozilla/5.0"
@@ -32,6 +50,150 @@ class CopyLotsRequest(BaseModel):
     subcategory_id: Optional[int] = None
     golden_key: str
 
+class BulkCreateLotsRequest(BaseModel):
+    # поля формы каждого лота (node_id обязателен), остальные поля берутся из шаблона формы подкатегории
+    lots: List[dict]
+
+class AccountCache:
+    """
+    Общий для процесса кэш авторизованных аккаунтов по golden_key.
+
+    Аккаунт инициализируется (Account.get()) один раз, повторные запросы с тем же golden_key используют уже
+    полученные PHPSESSID и CSRF-токен. Раз в `ttl` секунд PHPSESSID и CSRF-токен обновляются, при переполнении
+    кэша вытесняется аккаунт, который дольше всех не использовался. Инициализация / обновление одного аккаунта
+    выполняется одним запросом, даже если его одновременно ждут несколько обработчиков.
+
+    :param account_class: класс аккаунта (Account или AsyncAccount).
+    :param maxsize: макс. кол-во аккаунтов в кэше.
+    :param ttl: через сколько секунд обновлять PHPSESSID и CSRF-токен.
+    """
+    def __init__(self, account_class: type[Account], maxsize: int = 256, ttl: int | float = 40 * 60):
+        self.account_class = account_class
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.__accounts: OrderedDict[tuple, tuple[Account, float]] = OrderedDict()
+        self.__locks: dict[tuple, tuple[asyncio.Lock, int]] = {}
+        """Блокировки инициализации аккаунтов и кол-во обработчиков, которые их держат / ждут."""
+
+    async def get(self, golden_key: str, user_agent: str | None = None) -> Account:
+        """
+        Возвращает инициализированный аккаунт из кэша (при необходимости создает / обновляет его).
+        """
+        key = (golden_key, user_agent)
+        entry = self.__accounts.get(key)
+        if entry and time.time() - entry[1] < self.ttl:
+            self.__accounts.move_to_end(key)
+            return entry[0]
+
+        async with self.__lock(key):
+            entry = self.__accounts.get(key)
+            if entry and time.time() - entry[1] < self.ttl:
+                self.__accounts.move_to_end(key)
+                return entry[0]
+            account = entry[0] if entry else self.account_class(golden_key, user_agent=user_agent)
+            try:
+                await self.__refresh(account)
+            except Exception:
+                await self.invalidate(golden_key, user_agent)
+                raise
+            self.__accounts[key] = (account, time.time())
+            self.__accounts.move_to_end(key)
+            while len(self.__accounts) > self.maxsize:
+                _, (old_account, _) = self.__accounts.popitem(last=False)
+                await self.__close(old_account)
+        return account
+
+    @asynccontextmanager
+    async def __lock(self, key: tuple):
+        """
+        Захватывает блокировку инициализации аккаунта. Блокировка удаляется, как только ее никто не держит и
+        не ждет, поэтому golden_key, которые FunPay не принял, не копятся в кэше.
+        """
+        lock, users = self.__locks.get(key, (None, 0))
+        lock = lock or asyncio.Lock()
+        self.__locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self.__locks[key]
+            if users > 1:
+                self.__locks[key] = (lock, users - 1)
+            else:
+                del self.__locks[key]
+
+    @asynccontextmanager
+    async def acquire(self, golden_key: str, user_agent: str | None = None):
+        """
+        То же, что и :meth:`get`, но в виде контекстного менеджера: если FunPay перестал принимать golden_key,
+        аккаунт удаляется из кэша.
+        """
+        account = await self.get(golden_key, user_agent)
+        try:
+            yield account
+        except exceptions.UnauthorizedError:
+            await self.invalidate(golden_key, user_agent)
+            raise
+
+    async def invalidate(self, golden_key: str, user_agent: str | None = None) -> None:
+        """
+        Удаляет аккаунт из кэша.
+        """
+        entry = self.__accounts.pop((golden_key, user_agent), None)
+        if entry:
+            await self.__close(entry[0])
+
+    async def clear(self) -> None:
+        """
+        Очищает кэш, закрывая HTTP-сессии всех аккаунтов.
+        """
+        while self.__accounts:
+            _, (account, _) = self.__accounts.popitem()
+            await self.__close(account)
+
+    @staticmethod
+    async def __refresh(account: Account) -> None:
+        # методы AsyncAccount - обычные (не async def) методы, возвращающие корутины, поэтому проверяем класс
+        # аккаунта, а не функцию
+        if isinstance(account, AsyncAccount):
+            await account.get()
+        else:
+            await asyncio.get_running_loop().run_in_executor(None, account.get)
+
+    @staticmethod
+    async def __close(account: Account) -> None:
+        if isinstance(account, AsyncAccount):
+            await account.close()
+        else:
+            account.session.close()
+
+
+async_accounts = AccountCache(AsyncAccount)
+"""Кэш асинхронных аккаунтов (для обработчиков, работающих в event loop'е)."""
+sync_accounts = AccountCache(Account)
+"""Кэш синхронных аккаунтов (для кода, выполняемого в ThreadPoolExecutor)."""
+
+LOT_PAGES_CONCURRENCY = 8
+"""Сколько страниц лотов одного продавца запрашивать одновременно."""
+BULK_CREATE_CONCURRENCY = 4
+"""Сколько лотов /lots/bulk-create сохраняет одновременно (частоту запросов дополнительно ограничивает аккаунт)."""
+bulk_create_tasks: set[asyncio.Task] = set()
+"""Выполняемые сохранения лотов /lots/bulk-create (в т.ч. после отключения клиента)."""
+
+
+@app.on_event("startup")
+async def configure_caches():
+    # файлы кэшей создаются при запуске сервиса, а не при импорте модуля
+    Account.categories_cache_path = CATEGORIES_CACHE_PATH or None
+    Account.image_cache = ImageCache(IMAGE_CACHE_PATH) if IMAGE_CACHE_PATH else None
+
+
+@app.on_event("shutdown")
+async def close_accounts():
+    await async_accounts.clear()
+    await sync_accounts.clear()
+
+
 # Dependency для получения аккаунта
 def get_account(golden_key: str) -> Account:
     try:
@@ -45,8 +207,7 @@ def get_account(golden_key: str) -> Account:
 @app.post("/auth")
 async def authenticate(request: AuthRequest):
     try:
-        account = Account(request.golden_key, user_agent=request.user_agent)
-        account.get()
+        account = await async_accounts.get(request.golden_key, request.user_agent)
         return {
             "username": account.username,
             "id": account.id,
@@ -62,11 +223,15 @@ async def get_offer_edit_fields(
     golden_key: str = Query(...)
 ):
     try:
-        account = Account(golden_key)
-        account.get()
-        
-        # Получаем HTML страницы редактирования лота
-        response = account.method("get", f"lots/offerEdit?offer={offer}&node={node}", {}, {})
+        async with async_accounts.acquire(golden_key) as account:
+            if offer == 0:
+                # форма нового лота одинакова для всей подкатегории - берем её из кэша аккаунта
+                template = await account.get_lot_form_template(node)
+                return {"fields": dict(template.fields), "csrf_token": account.csrf_token,
+                        "required": sorted(template.required), "options": template.options,
+                        "hidden": sorted(template.hidden)}
+            # Получаем HTML страницы редактирования лота
+            response = await account.method("get", f"lots/offerEdit?offer={offer}&node={node}", {}, {})
         html_content = response.content.decode()
         
         # Парсим поля формы
@@ -79,18 +244,9 @@ async def get_offer_edit_fields(
 @app.get("/lots/{subcategory_id}")
 async def get_lots(subcategory_id: int, golden_key: str):
     try:
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            account = Account(golden_key)
-            await loop.run_in_executor(executor, account.get)
-            
-            lots = await loop.run_in_executor(
-                executor, 
-                account.get_subcategory_public_lots, 
-                enums.SubCategoryTypes.COMMON,
-                subcategory_id
-            )
-            
+        async with async_accounts.acquire(golden_key) as account:
+            lots = await account.get_subcategory_public_lots(enums.SubCategoryTypes.COMMON, subcategory_id)
+
         logger.info(f"Retrieved {len(lots)} lots for subcategory {subcategory_id}")
         return [
             {
@@ -106,48 +262,43 @@ async def get_lots(subcategory_id: int, golden_key: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/lots-by-user/{subcategory_id}/{user_id}")
-async def get_lots_by_user(subcategory_id: int, user_id: int, golden_key: str):
+async def get_lots_by_user(subcategory_id: int, user_id: int, golden_key: str, cross_check: bool = True):
     try:
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            account = Account(golden_key)
-            await loop.run_in_executor(executor, account.get)
-            
-            lots = await loop.run_in_executor(
-                executor, 
-                account.get_subcategory_public_lots, 
-                enums.SubCategoryTypes.COMMON,
-                subcategory_id
-            )
-            
-        user_lots = []
-        for lot in lots:
-            if lot.seller and lot.seller.id == user_id:
+        async with async_accounts.acquire(golden_key) as account:
+            # лоты продавца берутся с его страницы, таблица лотов подкатегории загружается только при необходимости:
+            # по умолчанию (cross_check) - если у лотов на странице продавца нет атрибутов (сервер, сторона и т.д.),
+            # без них скопированные лоты (CopyLotsService) потеряли бы эти поля
+            seller_lots = await account.get_user_lots(user_id, enums.SubCategoryTypes.COMMON, subcategory_id,
+                                                      cross_check)
+
+            # EN-страницы запрашиваются одновременно (не больше LOT_PAGES_CONCURRENCY), язык закреплен за запросом
+            semaphore = asyncio.Semaphore(LOT_PAGES_CONCURRENCY)
+
+            async def get_en_page(lot: LotShortcut) -> LotPage | None:
+                async with semaphore:
+                    try:
+                        return await account.get_lot_page(lot.id, "en")
+                    except Exception as e:
+                        logger.warning(f"Failed to get English description or title for lot {lot.id}: {e}")
+                        return None
+
+            pages_en = await asyncio.gather(*(get_en_page(lot) for lot in seller_lots))
+
+            user_lots = []
+            for lot, lot_page_en in zip(seller_lots, pages_en):
                 description_ru = lot.description or ""
                 description_en = ""
                 title_en = ""
-                
-                try:
-                    lot_page_en = await loop.run_in_executor(
-                        executor,
-                        account.get_lot_page,
-                        lot.id,
-                        "en"
-                    )
-                    title_en = lot_page_en.description or ""
+                if lot_page_en:
+                    title_en = lot_page_en.short_description or ""
                     description_en = lot_page_en.full_description or ""
                     logger.info(f"Lot {lot.id}: RU='{description_ru[:50]}', EN='{description_en[:50]}', Title EN='{title_en[:50]}'")
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to get English description or title for lot {lot.id}: {e}")
-                    description_en = description_ru
-                    title_en = lot.title or ""
-                
+
                 if not description_en:
                     description_en = description_ru
                 if not title_en:
                     title_en = lot.title or ""
-                
+
                 lot_data = {
                     "Id": lot.id,
                     "Server": lot.server or "",
@@ -168,9 +319,9 @@ async def get_lots_by_user(subcategory_id: int, user_id: int, golden_key: str):
                     "Html": lot.html,
                     "PublicLink": lot.public_link
                 }
-                
+
                 user_lots.append(lot_data)
-        
+
         if not user_lots:
             logger.warning(f"No lots found for user {user_id} in subcategory {subcategory_id}")
             raise HTTPException(status_code=404, detail="No lots found for this user in the specified subcategory")
@@ -199,115 +350,206 @@ async def create_lot_from_fields(
         logger.info(f"Received fields: {list(fields.keys())}")
         logger.info(f"Fields content: {fields}")
         
-        account = Account(golden_key)
-        account.get()
-        
-        # Получаем эталонную форму для сравнения
-        subcategory_id = int(fields.get("node_id", 0))
-        try:
-            reference_response = account.method("get", f"lots/offerEdit?offer=0&node={subcategory_id}", {}, {})
-            reference_html = reference_response.content.decode()
-            
-            # Парсим эталонную форму
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(reference_html, "lxml")
-            
-            required_fields = set()
-            for field in soup.find_all("input"):
-                if "name" in field.attrs and field.get("required"):
-                    required_fields.add(field["name"])
-            
-            for field in soup.find_all("select"):
-                if "name" in field.attrs and field.get("required"):
-                    required_fields.add(field["name"])
-                    
-            for field in soup.find_all("textarea"):
-                if "name" in field.attrs and field.get("required"):
-                    required_fields.add(field["name"])
-            
-            logger.info(f"Required fields found: {required_fields}")
-            
-            # Проверяем какие поля отсутствуют
-            missing_fields = []
-            for req_field in required_fields:
-                if req_field not in fields or not fields[req_field].strip():
-                    missing_fields.append(req_field)
-            
-            if missing_fields:
-                logger.error(f"Missing required fields: {missing_fields}")
-            
-            # Проверяем все поля формы
-            all_form_fields = set()
-            for field in soup.find_all(["input", "select", "textarea"]):
-                if "name" in field.attrs:
-                    all_form_fields.add(field["name"])
-            
-            logger.info(f"All form fields: {all_form_fields}")
-            logger.info(f"Our fields: {set(fields.keys())}")
-            logger.info(f"Missing from our request: {all_form_fields - set(fields.keys())}")
-            
-        except Exception as e:
-            logger.warning(f"Could not parse reference form: {e}")
+        async with async_accounts.acquire(golden_key) as account:
+            # Получаем эталонную форму для сравнения (из кэша шаблонов форм аккаунта)
+            subcategory_id = int(fields.get("node_id", 0))
+            try:
+                template = await account.get_lot_form_template(subcategory_id)
+                required_fields = template.required
+                logger.info(f"Required fields found: {required_fields}")
+
+                # Проверяем какие поля отсутствуют
+                missing_fields = []
+                for req_field in required_fields:
+                    if req_field not in fields or not fields[req_field].strip():
+                        missing_fields.append(req_field)
+
+                if missing_fields:
+                    logger.error(f"Missing required fields: {missing_fields}")
+
+                # Проверяем все поля формы
+                all_form_fields = template.names
+                logger.info(f"All form fields: {all_form_fields}")
+                logger.info(f"Our fields: {set(fields.keys())}")
+                logger.info(f"Missing from our request: {all_form_fields - set(fields.keys())}")
+
+            except Exception as e:
+                logger.warning(f"Could not parse reference form: {e}")
+
+            # Обновляем CSRF и отправляем
+            fields["csrf_token"] = account.csrf_token
+
+            if "price" in fields:
+                fields["price"] = fields["price"].replace(",", ".")
+
+            headers = {
+                "accept": "*/*",
+                "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
+                "x-requested-with": "XMLHttpRequest",
+            }
+
+            logger.info(f"Sending to FunPay: {fields}")
+
+            response = await account.method("post", "lots/offerSave", headers, fields, raise_not_200=False)
+
+            logger.info(f"FunPay response status: {response.status_code}")
+            logger.info(f"FunPay response content: {response.content.decode()[:500]}")
+
+            if response.status_code != 200:
+                error_content = response.content.decode()
+                raise HTTPException(status_code=400, detail=f"FunPay API error: {response.status_code} - {error_content}")
+
+            try:
+                json_response = response.json()
+                if json_response.get("error") or json_response.get("errors"):
+                    # форма подкатегории могла измениться - следующий запрос получит её заново
+                    account.invalidate_lot_form_template(subcategory_id)
+                if json_response.get("error"):
+                    logger.error(f"FunPay returned error: {json_response}")
+                    raise HTTPException(status_code=400, detail=f"FunPay validation error: {json_response.get('error')}")
+                if json_response.get("errors"):
+                    logger.error(f"FunPay returned errors: {json_response}")
+                    # Детальные ошибки валидации
+                    error_details = []
+                    if isinstance(json_response["errors"], list):
+                        for error_item in json_response["errors"]:
+                            if isinstance(error_item, list) and len(error_item) == 2:
+                                field_name, error_msg = error_item
+                                error_details.append(f"{field_name}: {error_msg}")
+                    raise HTTPException(status_code=400, detail=f"FunPay validation errors: {'; '.join(error_details)}")
+            except ValueError:
+                pass
+
+            return {
+                "success": True,
+                "message": "Lot created successfully",
+                "subcategory_id": subcategory_id,
+                "seller_id": account.id,
+                "seller_username": account.username
+            }
         
-        # Обновляем CSRF и отправляем
+    except Exception as e:
+        logger.error(f"Error creating lot: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+@app.post("/lots/bulk-create")
+async def bulk_create_lots(request: BulkCreateLotsRequest, golden_key: str = Query(...)):
+    """
+    Создает несколько лотов за один запрос. Шаблон формы запрашивается один раз на подкатегорию, лоты
+    сохраняются одновременно (не больше BULK_CREATE_CONCURRENCY) одним аккаунтом.
+
+    Ответ - NDJSON: по строке на лот в порядке завершения,
+    {"index": номер лота в запросе, "success": ..., "subcategory_id": ..., "error": ...}.
+    """
+    lots = [{key: "" if value is None else str(value) for key, value in lot.items()} for lot in request.lots]
+    # без корректного node_id лот нельзя сопоставить с шаблоном формы - такой запрос не выполняется целиком
+    invalid = [index for index, lot in enumerate(lots) if not lot.get("node_id", "").strip().isdigit()]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Missing or non-numeric node_id in lots: {invalid}")
+
+    try:
+        account = await async_accounts.get(golden_key)
+    except Exception as e:
+        logger.error(f"Auth error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # шаблоны форм всех подкатегорий запрашиваются до сохранения лотов (ошибка шаблона - ошибка всех его лотов)
+    subcategory_ids = list(dict.fromkeys(int(lot["node_id"]) for lot in lots))
+    fetched = await asyncio.gather(*(account.get_lot_form_template(i) for i in subcategory_ids),
+                                   return_exceptions=True)
+    templates = dict(zip(subcategory_ids, fetched))
+    if any(isinstance(i, exceptions.UnauthorizedError) for i in fetched):
+        # сессия в кэше устарела - следующий запрос авторизуется заново
+        await async_accounts.invalidate(golden_key)
+        raise HTTPException(status_code=400, detail="Authentication failed: FunPay session expired")
+
+    headers = {
+        "accept": "*/*",
+        "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
+        "x-requested-with": "XMLHttpRequest",
+    }
+    semaphore = asyncio.Semaphore(BULK_CREATE_CONCURRENCY)
+    disconnected = asyncio.Event()
+
+    async def create(index: int, lot: dict) -> dict:
+        result = await save(index, lot)
+        if not result["success"]:
+            logger.error(f"Error creating lot #{index}: {result['error']}")
+        return result
+
+    async def save(index: int, lot: dict) -> dict:
+        subcategory_id = int(lot["node_id"])
+        result = {"index": index, "success": False, "subcategory_id": subcategory_id}
+        template = templates[subcategory_id]
+        if isinstance(template, Exception):
+            result["error"] = f"Could not get lot form: {template}"
+            return result
+
+        fields = template.defaults()
+        fields.update(lot)
         fields["csrf_token"] = account.csrf_token
-        
+        fields.setdefault("offer_id", "0")
+        fields["node_id"] = str(subcategory_id)
         if "price" in fields:
             fields["price"] = fields["price"].replace(",", ".")
-        
-        headers = {
-            "accept": "*/*",
-            "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "x-requested-with": "XMLHttpRequest",
-        }
-        
-        logger.info(f"Sending to FunPay: {fields}")
-        
-        response = account.method("post", "lots/offerSave", headers, fields, raise_not_200=False)
-        
-        logger.info(f"FunPay response status: {response.status_code}")
-        logger.info(f"FunPay response content: {response.content.decode()[:500]}")
-        
+
+        try:
+            async with semaphore:
+                if disconnected.is_set():
+                    result["error"] = "Skipped: client disconnected"
+                    return result
+                response = await account.method("post", "lots/offerSave", headers, fields, raise_not_200=False)
+        except exceptions.UnauthorizedError as e:
+            await async_accounts.invalidate(golden_key)
+            result["error"] = str(e)
+            return result
+        except Exception as e:
+            result["error"] = str(e)
+            return result
+
         if response.status_code != 200:
-            error_content = response.content.decode()
-            raise HTTPException(status_code=400, detail=f"FunPay API error: {response.status_code} - {error_content}")
-        
+            result["error"] = f"FunPay API error: {response.status_code} - {response.content.decode()[:500]}"
+            return result
         try:
             json_response = response.json()
-            if json_response.get("error"):
-                logger.error(f"FunPay returned error: {json_response}")
-                raise HTTPException(status_code=400, detail=f"FunPay validation error: {json_response.get('error')}")
-            if json_response.get("errors"):
-                logger.error(f"FunPay returned errors: {json_response}")
-                # Детальные ошибки валидации
-                error_details = []
-                if isinstance(json_response["errors"], list):
-                    for error_item in json_response["errors"]:
-                        if isinstance(error_item, list) and len(error_item) == 2:
-                            field_name, error_msg = error_item
-                            error_details.append(f"{field_name}: {error_msg}")
-                raise HTTPException(status_code=400, detail=f"FunPay validation errors: {'; '.join(error_details)}")
         except ValueError:
-            pass
-        
-        return {
-            "success": True,
-            "message": "Lot created successfully",
-            "subcategory_id": subcategory_id,
-            "seller_id": account.id,
-            "seller_username": account.username
-        }
-        
-    except Exception as e:
-        logger.error(f"Error creating lot: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
+            json_response = {}
+        if json_response.get("error") or json_response.get("errors"):
+            # форма подкатегории могла измениться - следующий запрос получит её заново
+            account.invalidate_lot_form_template(subcategory_id)
+            errors = json_response.get("errors")
+            if isinstance(errors, list):
+                result["error"] = "; ".join(f"{i[0]}: {i[1]}" for i in errors if isinstance(i, list) and len(i) == 2)
+            result["error"] = result.get("error") or str(json_response.get("error") or errors)
+            return result
+        result["success"] = True
+        return result
+
+    async def stream():
+        tasks = [asyncio.ensure_future(create(index, lot)) for index, lot in enumerate(lots)]
+        for task in tasks:
+            # задачи должны дожить до конца, даже если клиент отключится и генератор будет закрыт
+            bulk_create_tasks.add(task)
+            task.add_done_callback(bulk_create_tasks.discard)
+        created = 0
+        try:
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                created += result["success"]
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            # клиент мог отключиться: лоты, которые еще не начали сохраняться, пропускаем, а уже отправленные
+            # запросы lots/offerSave не прерываем (лот на FunPay мог уже создаться, результат попадет в лог)
+            disconnected.set()
+        logger.info(f"Bulk create: {created}/{len(lots)} lots created for {account.username}")
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @app.post("/copy-lots")
 async def copy_lots_endpoint(request: CopyLotsRequest) -> dict:
     try:
         loop = asyncio.get_event_loop()
         with ThreadPoolExecutor(max_workers=4) as executor:
-            account = Account(golden_key=request.golden_key)
-            await loop.run_in_executor(executor, account.get)
+            account = await sync_accounts.get(request.golden_key)
             
             result = await loop.run_in_executor(
                 executor, 
@@ -374,44 +616,57 @@ def get_user_subcategories(user_id: int, golden_key: str) -> List[int]:
         logger.error(f"Error getting user subcategories: {e}")
         return []
 
+def transfer_images(account: Account, urls: List[str]) -> dict[str, int]:
+    """
+    Скачивает изображения и выгружает их на FunPay (как изображения лотов), IMAGE_TRANSFER_CONCURRENCY
+    изображений одновременно. Повторяющиеся ссылки обрабатываются один раз, одинаковые по содержимому
+    изображения не выгружаются повторно (см. Account.image_cache).
+
+    :return: {ссылка: ID изображения на FunPay} для успешно перенесенных изображений.
+    """
+    def transfer(url: str) -> int:
+        response = account.session.get(url, timeout=account.requests_timeout, proxies=account.proxy or {})
+        response.raise_for_status()
+        return account.upload_image(response.content, "offer")
+
+    urls = list(dict.fromkeys(urls))
+    result = {}
+    if not urls:
+        return result
+    with ThreadPoolExecutor(max_workers=min(IMAGE_TRANSFER_CONCURRENCY, len(urls))) as executor:
+        futures = {url: executor.submit(transfer, url) for url in urls}
+        for url, future in futures.items():
+            try:
+                result[url] = future.result()
+            except requests.RequestException as e:
+                logger.warning(f"Failed to download image {url}: {e}")
+            except Exception as e:
+                logger.warning(f"Failed to upload image: {e}")
+    return result
+
+
 def copy_lots_from_subcategory(user_id: int, subcat: int, account: Account) -> List[dict]:
     try:
-        lots = account.get_subcategory_public_lots(SubCategoryTypes.COMMON, subcat, locale="ru")
-        user_lots: List[LotShortcut] = [lot for lot in lots if lot.seller and lot.seller.id == user_id]
+        user_lots: List[LotShortcut] = account.get_user_lots(user_id, SubCategoryTypes.COMMON, subcat,
+                                                             cross_check=True, locale="ru")
         created = []
 
+        # Сначала получаем страницы всех лотов, затем переносим все их изображения одним пулом потоков
+        pages: List[tuple[LotShortcut, LotPage]] = []
         for lot in user_lots:
             try:
-                lot_page: LotPage = account.get_lot_page(lot.id, locale="ru")
-                
+                pages.append((lot, account.get_lot_page(lot.id, locale="ru")))
+            except Exception as e:
+                logger.error(f"Error copying individual lot {lot.id}: {e}")
+        photo_ids = transfer_images(account, [url for _, page in pages if page for url in page.image_urls or []])
+
+        for lot, lot_page in pages:
+            try:
                 # Получаем подкатегорию для category_name
                 subcategory = lot.subcategory if lot.subcategory else account.get_subcategory(SubCategoryTypes.COMMON, subcat)
                 
-                # Получаем пустые поля для нового лота
-                response = account.method("get", f"lots/offerEdit?offer=0&node={subcat}", {}, {}, raise_not_200=True)
-                bs = BeautifulSoup(response.content.decode(), "lxml")
-                fields = {}
-                
-                # Извлечение полей формы
-                for field in bs.find_all("input"):
-                    if "name" in field.attrs:
-                        fields[field["name"]] = field.get("value", "")
-                
-                for field in bs.find_all("textarea"):
-                    if "name" in field.attrs:
-                        fields[field["name"]] = field.get_text(strip=True)
-                
-                for field in bs.find_all("select"):
-                    if "name" in field.attrs:
-                        parent = field.find_parent(class_="form-group")
-                        if parent and "hidden" not in parent.get("class", []):
-                            selected = field.find("option", selected=True)
-                            if selected and "value" in selected.attrs:
-                                fields[field["name"]] = selected["value"]
-                
-                for field in bs.find_all("input", {"type": "checkbox"}):
-                    if "name" in field.attrs and field.get("checked"):
-                        fields[field["name"]] = "on"
+                # Получаем пустые поля для нового лота (шаблон формы запрашивается один раз на подкатегорию)
+                fields = account.get_lot_form_template(subcat).defaults()
 
                 # Заполняем поля из копируемого лота
                 fields["csrf_token"] = account.csrf_token
@@ -427,24 +682,10 @@ def copy_lots_from_subcategory(user_id: int, subcat: int, account: Account) -> L
                 fields["auto_delivery"] = "on" if lot.auto else ""
                 fields["fields[attributes]"] = ",".join(f"{k}:{v}" for k, v in (lot.attributes or {}).items())
 
-                # Обработка изображений
-                photo_ids = []
+                # Изображения уже перенесены (см. transfer_images), сохраняем их порядок
                 if lot_page and lot_page.image_urls:
-                    for idx, img_url in enumerate(lot_page.image_urls):
-                        try:
-                            response = requests.get(img_url, timeout=10)
-                            response.raise_for_status()
-                            img_data = response.content
-                            photo_id = account.upload_image(img_data, "offer")
-                            photo_ids.append(photo_id)
-                        except requests.RequestException as e:
-                            logger.warning(f"Failed to download image {img_url}: {e}")
-                            continue
-                        except Exception as e:
-                            logger.warning(f"Failed to upload image: {e}")
-                            continue
-                    
-                    for idx, pid in enumerate(photo_ids):
+                    ids = [photo_ids[url] for url in lot_page.image_urls if url in photo_ids]
+                    for idx, pid in enumerate(ids):
                         fields[f"photos[{idx}]"] = str(pid)
 
                 # Сохраняем новый лот
@@ -490,8 +731,7 @@ async def get_user_subcategories_endpoint(user_id: int, golden_key: str):
     try:
         loop = asyncio.get_event_loop()
         with ThreadPoolExecutor() as executor:
-            account = Account(golden_key)
-            await loop.run_in_executor(executor, account.get)
+            account = await sync_accounts.get(golden_key)
             
             subcategories = await loop.run_in_executor(
                 executor, get_user_subcategories, user_id, account
@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import requests
+from requests.cookies import cookiejar_from_dict
+
+from FunPayAPI.account import Account
+from FunPayAPI.async_account import AsyncAccount
+import main
+
+MAIN_PAGE = """<html><body data-app-data='{}'>
+<div class="user-link-name">seller</div>
+<a class="menu-item-logout" href="https://funpay.com/account/logout?token=t">Выйти</a>
+</body></html>""".format(json.dumps({"locale": "ru", "userId": 42, "csrf-token": "csrf"}))
+
+
+def main_page_response() -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = MAIN_PAGE.encode()
+    response.cookies = cookiejar_from_dict({"PHPSESSID": "session"})
+    return response
+
+
+class FakeAccount(Account):
+    def method(self, *args, **kwargs):
+        return main_page_response()
+
+
+class FakeAsyncAccount(AsyncAccount):
+    async def method(self, *args, **kwargs):
+        return main_page_response()
+
+
+def test_async_account_is_initiated():
+    async def run():
+        cache = main.AccountCache(FakeAsyncAccount)
+        account = await cache.get("golden_key")
+        assert isinstance(account, FakeAsyncAccount)
+        assert account.is_initiated
+        assert (account.id, account.username, account.csrf_token) == (42, "seller", "csrf")
+        assert await cache.get("golden_key") is account
+        await cache.clear()
+
+    asyncio.run(run())
+
+
+def test_sync_account_is_initiated():
+    async def run():
+        cache = main.AccountCache(FakeAccount)
+        account = await cache.get("golden_key")
+        assert account.is_initiated
+        assert account.phpsessid == "session"
+        await cache.clear()
+
+    asyncio.run(run())
+
+
+class RejectedAsyncAccount(AsyncAccount):
+    async def method(self, *args, **kwargs):
+        await asyncio.sleep(0)
+        response = requests.Response()
+        response.status_code = 403
+        response.request = requests.Request("get", "https://funpay.com/").prepare()
+        return response
+
+
+def test_rejected_golden_keys_leave_no_locks():
+    async def run():
+        cache = main.AccountCache(RejectedAsyncAccount)
+        results = await asyncio.gather(*(cache.get("bad_key") for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, Exception) for result in results)
+        for i in range(10):
+            try:
+                await cache.get(f"bad_key_{i}")
+            except Exception:
+                pass
+        assert cache._AccountCache__locks == {}
+        assert not cache._AccountCache__accounts
+
+    asyncio.run(run())
+
+
+def test_concurrent_gets_initiate_account_once():
+    class CountingAsyncAccount(FakeAsyncAccount):
+        calls = 0
+
+        async def method(self, *args, **kwargs):
+            CountingAsyncAccount.calls += 1
+            await asyncio.sleep(0)
+            return main_page_response()
+
+    async def run():
+        cache = main.AccountCache(CountingAsyncAccount)
+        accounts = await asyncio.gather(*(cache.get("golden_key") for _ in range(5)))
+        assert all(account is accounts[0] for account in accounts)
+        assert CountingAsyncAccount.calls == 1
+        assert cache._AccountCache__locks == {}
+        await cache.clear()
+
+    asyncio.run(run())
@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+import pytest
+import requests
+from fastapi import HTTPException
+
+from FunPayAPI.common import exceptions
+import main
+
+
+class FakeTemplate:
+    def defaults(self):
+        return {"fields[summary][ru]": "", "price": ""}
+
+
+class FakeAccount:
+    csrf_token = "csrf"
+    username = "seller"
+
+    def __init__(self, unauthorized=False):
+        self.unauthorized = unauthorized
+        self.started = []
+        self.finished = []
+        self.invalidated = []
+
+    async def get_lot_form_template(self, subcategory_id):
+        if self.unauthorized:
+            response = requests.Response()
+            response.status_code = 403
+            response.request = requests.Request("get", "https://funpay.com/lots/offerEdit").prepare()
+            raise exceptions.UnauthorizedError(response)
+        if subcategory_id == 2:
+            raise RuntimeError("no form")
+        return FakeTemplate()
+
+    def invalidate_lot_form_template(self, subcategory_id=None):
+        self.invalidated.append(subcategory_id)
+
+    async def method(self, request_method, api_method, headers, payload, raise_not_200=False):
+        self.started.append(payload)
+        await asyncio.sleep(0.05)
+        self.finished.append(payload)
+        response = requests.Response()
+        response.status_code = 200
+        errors = [["price", "wrong"]] if payload["price"] == "bad" else None
+        response._content = json.dumps({"done": not errors, "errors": errors}).encode()
+        return response
+
+
+@pytest.fixture
+def account(monkeypatch):
+    account = FakeAccount()
+    invalidated = []
+
+    async def get(golden_key, user_agent=None):
+        return account
+
+    async def invalidate(golden_key, user_agent=None):
+        invalidated.append(golden_key)
+
+    monkeypatch.setattr(main.async_accounts, "get", get)
+    monkeypatch.setattr(main.async_accounts, "invalidate", invalidate)
+    account.cache_invalidated = invalidated
+    return account
+
+
+def bulk_create(lots):
+    return main.bulk_create_lots(main.BulkCreateLotsRequest(lots=lots), golden_key="key")
+
+
+def test_bulk_create_results(account):
+    async def run():
+        response = await bulk_create([{"node_id": 1, "price": "1,5"}, {"node_id": "2"},
+                                      {"node_id": 1, "price": "bad"}])
+        return sorted([json.loads(line) async for line in response.body_iterator], key=lambda i: i["index"])
+
+    results = asyncio.run(run())
+    assert [i["success"] for i in results] == [True, False, False]
+    assert results[1]["error"] == "Could not get lot form: no form"
+    assert results[2]["error"] == "price: wrong"
+    assert account.finished[0] == {"fields[summary][ru]": "", "price": "1.5", "node_id": "1",
+                                   "csrf_token": "csrf", "offer_id": "0"}
+    assert account.invalidated == [1]
+
+
+def test_bulk_create_unauthorized_template(account):
+    account.unauthorized = True
+
+    async def run():
+        with pytest.raises(HTTPException):
+            await bulk_create([{"node_id": 1, "price": "1"}])
+
+    asyncio.run(run())
+    assert account.cache_invalidated == ["key"]
+
+
+def test_bulk_create_disconnect_finishes_started_saves(account):
+    lots = [{"node_id": 1, "price": str(i)} for i in range(main.BULK_CREATE_CONCURRENCY * 3)]
+
+    async def run():
+        response = await bulk_create(lots)
+        iterator = response.body_iterator
+        await iterator.__anext__()
+        await iterator.aclose()  # клиент отключился
+        await asyncio.gather(*main.bulk_create_tasks)
+
+    asyncio.run(run())
+    # запросы, отправленные до отключения, завершены, остальные лоты не сохранялись
+    assert account.started == account.finished
+    assert len(account.started) < len(lots)
+
+
+@pytest.mark.parametrize("node_id", [None, "", "abc", "1.5", "-1"])
+def test_bulk_create_rejects_invalid_node_id(account, node_id):
+    lot = {"price": "1"} if node_id is None else {"node_id": node_id, "price": "1"}
+
+    async def run():
+        with pytest.raises(HTTPException) as e:
+            await bulk_create([{"node_id": 1, "price": "1"}, lot])
+        return e.value
+
+    error = asyncio.run(run())
+    assert error.status_code == 400
+    assert "[1]" in error.detail
+    assert account.started == []
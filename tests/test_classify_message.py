@@ -0,0 +1,106 @@
+"""
+RegularExpressions.classify_message сверяется с прежней поочередной проверкой регулярных выражений
+(old_message_type) на системных сообщениях каждого типа на русском и английском.
+"""
+import pytest
+
+from FunPayAPI.common.enums import MessageTypes
+from FunPayAPI.common.utils import RegularExpressions
+
+RES = RegularExpressions()
+
+
+def old_message_type(text: str) -> MessageTypes:
+    """Определение типа сообщения до classify_message (types.ChatShortcut / types.Message)."""
+    if RES.DISCORD.search(text):
+        return MessageTypes.DISCORD
+    if RES.DEAR_VENDORS.search(text):
+        return MessageTypes.DEAR_VENDORS
+    if RES.ORDER_PURCHASED.findall(text) and RES.ORDER_PURCHASED2.findall(text):
+        return MessageTypes.ORDER_PURCHASED
+    if RES.ORDER_ID.search(text) is None:
+        return MessageTypes.NON_SYSTEM
+    for name in ["ORDER_CONFIRMED", "NEW_FEEDBACK", "NEW_FEEDBACK_ANSWER", "FEEDBACK_CHANGED", "FEEDBACK_DELETED",
+                 "REFUND", "FEEDBACK_ANSWER_CHANGED", "FEEDBACK_ANSWER_DELETED", "ORDER_CONFIRMED_BY_ADMIN",
+                 "PARTIAL_REFUND", "ORDER_REOPENED", "REFUND_BY_ADMIN"]:
+        if getattr(RES, name).search(text):
+            return MessageTypes[name]
+    return MessageTypes.NON_SYSTEM
+
+
+CASES = [
+    # текст, тип, ID заказа, никнеймы
+    ("Покупатель buyer1 оплатил заказ #ABCD1234. Лот, 5 шт. seller1, не забудьте потом нажать кнопку "
+     "«Подтвердить выполнение заказа».", MessageTypes.ORDER_PURCHASED, "ABCD1234", ["buyer1", "seller1"]),
+    ("The buyer buyer1 has paid for order #ABCD1234. Item. seller1, do not forget to press the "
+     "«Confirm currency receipt» button once you finish.", MessageTypes.ORDER_PURCHASED, "ABCD1234",
+     ["buyer1", "seller1"]),
+    ("Покупатель buyer1 подтвердил успешное выполнение заказа #ABCD1234 и отправил деньги продавцу seller1.",
+     MessageTypes.ORDER_CONFIRMED, "ABCD1234", ["buyer1", "seller1"]),
+    ("The buyer buyer1 has confirmed that order #ABCD1234 has been fulfilled successfully and that the seller "
+     "seller1 has been paid.", MessageTypes.ORDER_CONFIRMED, "ABCD1234", ["buyer1", "seller1"]),
+    ("Покупатель buyer1 написал отзыв к заказу #ABCD1234.", MessageTypes.NEW_FEEDBACK, "ABCD1234", ["buyer1"]),
+    ("The buyer buyer1 has given feedback to the order #ABCD1234.", MessageTypes.NEW_FEEDBACK, "ABCD1234",
+     ["buyer1"]),
+    ("Покупатель buyer1 изменил отзыв к заказу #ABCD1234.", MessageTypes.FEEDBACK_CHANGED, "ABCD1234", ["buyer1"]),
+    ("The buyer buyer1 has edited their feedback to the order #ABCD1234.", MessageTypes.FEEDBACK_CHANGED,
+     "ABCD1234", ["buyer1"]),
+    ("Покупатель buyer1 удалил отзыв к заказу #ABCD1234.", MessageTypes.FEEDBACK_DELETED, "ABCD1234", ["buyer1"]),
+    ("The buyer buyer1 has deleted their feedback to the order #ABCD1234.", MessageTypes.FEEDBACK_DELETED,
+     "ABCD1234", ["buyer1"]),
+    ("Продавец seller1 ответил на отзыв к заказу #ABCD1234.", MessageTypes.NEW_FEEDBACK_ANSWER, "ABCD1234",
+     ["seller1"]),
+    ("The seller seller1 has replied to their feedback to the order #ABCD1234.", MessageTypes.NEW_FEEDBACK_ANSWER,
+     "ABCD1234", ["seller1"]),
+    ("Продавец seller1 изменил ответ на отзыв к заказу #ABCD1234.", MessageTypes.FEEDBACK_ANSWER_CHANGED,
+     "ABCD1234", ["seller1"]),
+    ("The seller seller1 has edited a reply to their feedback to the order #ABCD1234.",
+     MessageTypes.FEEDBACK_ANSWER_CHANGED, "ABCD1234", ["seller1"]),
+    ("Продавец seller1 удалил ответ на отзыв к заказу #ABCD1234.", MessageTypes.FEEDBACK_ANSWER_DELETED,
+     "ABCD1234", ["seller1"]),
+    ("The seller seller1 has deleted a reply to their feedback to the order #ABCD1234.",
+     MessageTypes.FEEDBACK_ANSWER_DELETED, "ABCD1234", ["seller1"]),
+    ("Заказ #ABCD1234 открыт повторно.", MessageTypes.ORDER_REOPENED, "ABCD1234", []),
+    ("Order #ABCD1234 has been reopened.", MessageTypes.ORDER_REOPENED, "ABCD1234", []),
+    ("Продавец seller1 вернул деньги покупателю buyer1 по заказу #ABCD1234.", MessageTypes.REFUND, "ABCD1234",
+     ["seller1", "buyer1"]),
+    ("The seller seller1 has refunded the buyer buyer1 on order #ABCD1234.", MessageTypes.REFUND, "ABCD1234",
+     ["seller1", "buyer1"]),
+    ("Часть средств по заказу #ABCD1234 возвращена покупателю.", MessageTypes.PARTIAL_REFUND, "ABCD1234", []),
+    ("A part of the funds pertaining to the order #ABCD1234 has been refunded.", MessageTypes.PARTIAL_REFUND,
+     "ABCD1234", []),
+    ("Администратор admin1 подтвердил успешное выполнение заказа #ABCD1234 и отправил деньги продавцу seller1.",
+     MessageTypes.ORDER_CONFIRMED_BY_ADMIN, "ABCD1234", ["admin1", "seller1"]),
+    ("The administrator admin1 has confirmed that order #ABCD1234 has been fulfilled successfully and that "
+     "the seller seller1 has been paid.", MessageTypes.ORDER_CONFIRMED_BY_ADMIN, "ABCD1234", ["admin1", "seller1"]),
+    ("Администратор admin1 вернул деньги покупателю buyer1 по заказу #ABCD1234.", MessageTypes.REFUND_BY_ADMIN,
+     "ABCD1234", ["admin1", "buyer1"]),
+    ("The administrator admin1 has refunded the buyer buyer1 on order #ABCD1234.", MessageTypes.REFUND_BY_ADMIN,
+     "ABCD1234", ["admin1", "buyer1"]),
+    ("Вы можете перейти в Discord. Внимание: общение за пределами сервера FunPay считается нарушением правил.",
+     MessageTypes.DISCORD, None, []),
+    ("You can switch to Discord. However, note that friending someone is considered a violation rules.",
+     MessageTypes.DISCORD, None, []),
+    ("Уважаемые продавцы, не доверяйте сообщениям в чате! Перед выполнением заказа всегда проверяйте наличие "
+     "оплаты в разделе «Мои продажи».", MessageTypes.DEAR_VENDORS, None, []),
+    ("Dear vendors, do not rely on chat messages! Before you process an order, you should always check whether "
+     "you've been paid in «My sales» section.", MessageTypes.DEAR_VENDORS, None, []),
+    # оплата заказа без второй части сообщения - не системное сообщение
+    ("Покупатель buyer1 оплатил заказ #ABCD1234.", MessageTypes.NON_SYSTEM, None, []),
+    ("The buyer buyer1 has paid for order #ABCD1234. Item.", MessageTypes.NON_SYSTEM, None, []),
+    # не системные сообщения, в т.ч. с "#" и ID заказа
+    ("Привет! Где мой заказ #ABCD1234?", MessageTypes.NON_SYSTEM, None, []),
+    ("Hi, item #1 please", MessageTypes.NON_SYSTEM, None, []),
+    ("Покупатель buyer1 написал отзыв", MessageTypes.NON_SYSTEM, None, []),
+    ("", MessageTypes.NON_SYSTEM, None, []),
+]
+
+
+def test_cases_cover_all_message_types():
+    assert {case[1] for case in CASES} == set(MessageTypes)
+
+
+@pytest.mark.parametrize("text, message_type, order_id, usernames", CASES)
+def test_classify_message(text, message_type, order_id, usernames):
+    assert old_message_type(text) is message_type
+    assert RES.classify_message(text) == (message_type, order_id, usernames)
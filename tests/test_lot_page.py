@@ -0,0 +1,39 @@
+import requests
+
+from FunPayAPI.account import Account
+
+LOT_PAGE = """<html><body>
+<div class="user-link-name">buyer</div>
+<a class="js-back-link" href="https://funpay.com/en/lots/210/">Back</a>
+<div class="chat-header"><div class="media-user-name"><a href="https://funpay.com/en/users/7/">seller</a></div></div>
+<div class="param-item"><h5>Short description</h5><div>Short</div></div>
+<div class="param-item"><h5>Detailed description</h5><div>Detailed</div></div>
+<div class="param-item">
+  <h5> Images </h5>
+  <div class="attachments-list">
+    <a class="attachments-thumb" href="https://sfunpay.com/s/offer/1.jpg"></a>
+    <a class="attachments-thumb" href="https://sfunpay.com/s/offer/2.jpg"></a>
+  </div>
+</div>
+</body></html>"""
+
+
+class FakeAccount(Account):
+    def method(self, *args, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = LOT_PAGE.encode()
+        return response
+
+    def get_subcategory(self, subcategory_type, subcategory_id):
+        return None
+
+
+def test_lot_page_images():
+    account = FakeAccount("golden_key")
+    account._Account__initiated = True
+    page = account.get_lot_page(1, "en")
+    assert page.short_description == "Short"
+    assert page.full_description == "Detailed"
+    assert page.image_urls == ["https://sfunpay.com/s/offer/1.jpg", "https://sfunpay.com/s/offer/2.jpg"]
+    assert (page.seller_id, page.seller_username) == (7, "seller")
@@ -0,0 +1,116 @@
+"""
+Парсеры таблицы лотов подкатегории (BeautifulSoup, lxml и потоковый) должны давать одинаковые лоты.
+"""
+import io
+from pathlib import Path
+
+import pytest
+import requests
+
+from FunPayAPI import types
+from FunPayAPI.account import Account
+from FunPayAPI.common.enums import SubCategoryTypes
+
+LISTING = (Path(__file__).parent / "fixtures" / "subcategory_lots.html").read_bytes()
+SUBCATEGORY = types.SubCategory(10, "Аккаунты", SubCategoryTypes.COMMON, types.Category(1, "Game"))
+
+
+class FakeAccount(Account):
+    def __init__(self):
+        super(FakeAccount, self).__init__("golden_key")
+        self._Account__initiated = True
+        self.id, self.username, self.csrf_token = 777, "me", "csrf"
+
+    def method(self, *args, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        if kwargs.get("stream"):
+            response.raw = io.BytesIO(LISTING)
+        else:
+            response._content = LISTING
+        return response
+
+    def get_subcategory(self, subcategory_type, subcategory_id):
+        return SUBCATEGORY
+
+
+def lot_fields(lot) -> dict:
+    # html отличается только форматированием, объекты сравниваются поле за полем
+    fields = {k: v for k, v in vars(lot).items() if k not in ("html", "seller")}
+    fields["seller"] = {k: v for k, v in vars(lot.seller).items() if k != "html"}
+    return fields
+
+
+def parse(parser: str) -> tuple[list, Account]:
+    account = FakeAccount()
+    if parser == "stream":
+        lots = list(account.iter_subcategory_public_lots(SubCategoryTypes.COMMON, 10))
+    else:
+        account.lots_parser = parser
+        lots = account.get_subcategory_public_lots(SubCategoryTypes.COMMON, 10)
+    return lots, account
+
+
+def test_bs4_fixture():
+    lots, account = parse("bs4")
+    assert [lot.id for lot in lots] == [1001, 1002, 1003, 1004, 1005]
+    assert lots[0].subcategory is SUBCATEGORY
+    assert (lots[0].promo, lots[0].auto, lots[0].amount, lots[0].price) == (True, True, 1000, 150.5)
+    assert lots[0].attributes == {"server": 3, "f-level": 60}
+    assert lots[0].seller is lots[1].seller
+    assert (lots[2].server, lots[2].amount, lots[2].seller.username, lots[2].seller.stars) == \
+           (None, None, "NewSeller", None)
+    assert (lots[3].amount, lots[3].seller.stars, lots[3].seller.reviews) == (None, 3, 17)
+    assert account.csrf_token == "listing-csrf"
+
+
+@pytest.mark.parametrize("parser", ["lxml", "stream"])
+def test_parser_matches_bs4(parser):
+    expected, expected_account = parse("bs4")
+    lots, account = parse(parser)
+    assert len(lots) == len(expected)
+    for lot, reference in zip(lots, expected):
+        assert lot_fields(lot) == lot_fields(reference)
+    # продавцы одного лота - один и тот же объект, как и в BeautifulSoup-парсере
+    assert len({id(lot.seller) for lot in lots}) == len({id(lot.seller) for lot in expected})
+    assert (account.csrf_token, account.currency) == (expected_account.csrf_token, expected_account.currency)
+
+
+class TrackingRaw(io.BytesIO):
+    def __init__(self, content: bytes):
+        super(TrackingRaw, self).__init__(content)
+        self.released = False
+
+    def release_conn(self):
+        self.released = True
+
+
+class FakeSession:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.responses = []
+
+    def request(self, request_method, url, stream=False, **kwargs):
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.raw = TrackingRaw(b"<html>error</html>")
+        response.request = requests.Request(request_method, url).prepare()
+        self.responses.append(response)
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("status_code, error", [(403, "UnauthorizedError"), (500, "RequestFailedError")])
+def test_stream_error_response_is_released(status_code, error):
+    account = Account("golden_key")
+    account._Account__initiated = True
+    account.session = FakeSession(status_code)
+    lots = account.iter_subcategory_public_lots(SubCategoryTypes.COMMON, 10)
+    with pytest.raises(Exception) as e:
+        next(lots)
+    assert type(e.value).__name__ == error
+    response = account.session.responses[-1]
+    assert response.raw.released
+    assert response.text == "<html>error</html>"
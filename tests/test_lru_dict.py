@@ -0,0 +1,31 @@
+from FunPayAPI.account import Account
+from FunPayAPI.common.utils import LRUDict
+from FunPayAPI.updater.runner import Runner
+
+
+def test_reads_refresh_recency():
+    d = LRUDict(3)
+    d[1], d[2], d[3] = "a", "b", "c"
+    assert d[1] == "a"
+    assert d.get(2) == "b"
+    d[4] = "d"
+    assert list(d) == [1, 2, 4]
+    assert d.get(5, "missing") == "missing"
+
+
+def test_dict_copies():
+    d = LRUDict(3, [(1, "a"), (2, "b")])
+    assert dict(d) == {1: "a", 2: "b"}
+    assert dict(d.items()) == {1: "a", 2: "b"}
+
+
+def test_by_bot_ids_of_busy_chat_are_kept():
+    account = Account("golden_key")
+    account._Account__initiated = True
+    runner = Runner(account)
+    runner.by_bot_ids = LRUDict(2)
+    runner.mark_as_by_bot(1, 10)
+    runner.mark_as_by_bot(2, 20)
+    runner.mark_as_by_bot(1, 11)
+    runner.mark_as_by_bot(3, 30)
+    assert runner.by_bot_ids == {1: [10, 11], 3: [30]}
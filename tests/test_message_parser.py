@@ -0,0 +1,37 @@
+"""
+Разбор сообщений чата (Account.__parse_messages) сверяется с результатом прежнего двухпроходного
+BeautifulSoup-парсера на тех же сообщениях (tests/fixtures/chat_messages_expected.json).
+"""
+import json
+from pathlib import Path
+
+from FunPayAPI.account import Account
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PAYLOAD = json.loads((FIXTURES / "chat_messages.json").read_text("utf-8"))
+EXPECTED = json.loads((FIXTURES / "chat_messages_expected.json").read_text("utf-8"))
+
+
+def parse_messages() -> list:
+    account = Account("golden_key")
+    account.id, account.username = PAYLOAD["account_id"], PAYLOAD["account_username"]
+    return account._Account__parse_messages(PAYLOAD["messages"], PAYLOAD["chat_id"], PAYLOAD["interlocutor_id"])
+
+
+def test_messages_match_reference():
+    messages = parse_messages()
+    assert len(messages) == len(EXPECTED)
+    for message, expected in zip(messages, EXPECTED):
+        fields = {k: getattr(v, "name", v) for k, v in vars(message).items()}
+        # поля, появившиеся позже прежнего парсера, не сверяются
+        assert {k: fields[k] for k in expected} == expected, message.id
+
+
+def test_from_id():
+    account = Account("golden_key")
+    account.id, account.username = PAYLOAD["account_id"], PAYLOAD["account_username"]
+    messages = account._Account__parse_messages(PAYLOAD["messages"], PAYLOAD["chat_id"], PAYLOAD["interlocutor_id"],
+                                                from_id=1010)
+    assert [i.id for i in messages] == [i["id"] for i in EXPECTED if i["id"] >= 1010]
+    # автор без блока с ником берется из ранее известных (аккаунт)
+    assert messages[0].author == "me" and messages[0].by_bot
@@ -0,0 +1,70 @@
+import json
+import time
+
+from FunPayAPI.account import Account
+from FunPayAPI.updater.runner import Runner
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self.data = data
+        self.content = json.dumps(data).encode()
+
+    def json(self):
+        return self.data
+
+
+class FakeAccount(Account):
+    def __init__(self):
+        super(FakeAccount, self).__init__("golden_key")
+        self._Account__initiated = True
+        self.id, self.username, self.csrf_token = 1, "seller", "csrf"
+        self.payloads = []
+
+    def method(self, request_method, api_method, headers, payload, **kwargs):
+        # runner/ возвращает последнее сообщение каждого запрошенного чата
+        self.payloads.append(payload)
+        request = json.loads(payload["request"]) if payload["request"] else None
+        objects = []
+        for obj in json.loads(payload["objects"]):
+            if obj["type"] == "chat_node" and request:
+                html = f'<div class="chat-msg-item"><div class="chat-msg-text">{request["data"]["content"]}</div></div>'
+                objects.append({"type": "chat_node", "id": obj["id"], "tag": "new",
+                                "data": {"node": {"silent": True}, "messages": [{"id": 555, "html": html}]}})
+        return FakeResponse({"objects": objects, "response": {"error": None} if request else False})
+
+
+def make_runner() -> tuple[Runner, FakeAccount]:
+    account = FakeAccount()
+    runner = Runner(account)
+    hot_chats = runner._Runner__hot_chats
+    for chat_id in range(100, 100 + runner.runner_len):
+        hot_chats[chat_id] = ["tag", None, time.time()]
+    return runner, account
+
+
+def chat_nodes(payload: dict) -> list:
+    return [i["id"] for i in json.loads(payload["objects"]) if i["type"] == "chat_node"]
+
+
+def test_outgoing_hot_chat_node_always_sent():
+    runner, account = make_runner()
+    # запросы c-p-u занимают часть мест, самые старые горячие чаты в запрос не попадают
+    runner._Runner__interlocutor_ids = {1, 2, 3}
+    oldest = next(iter(runner._Runner__hot_chats))
+    future = runner.queue_message(oldest, "hello")
+    runner.get_updates()
+    nodes = chat_nodes(account.payloads[-1])
+    assert nodes.count(oldest) == 1
+    assert len(nodes) <= runner.runner_len - 2 - 3
+    assert future.result().id == 555
+
+
+def test_leave_as_unread_skips_chat_node():
+    runner, account = make_runner()
+    newest = list(runner._Runner__hot_chats)[-1]
+    runner.queue_message(newest, "hello", leave_as_unread=True)
+    runner.get_updates()
+    assert newest not in chat_nodes(account.payloads[-1])
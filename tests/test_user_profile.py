@@ -0,0 +1,19 @@
+from bs4 import BeautifulSoup
+import pytest
+
+from FunPayAPI.account import Account
+
+SECTION = """<div class="offer-list-title-container"><h3><a href="https://funpay.com/lots/210/">Аккаунты</a></h3></div>
+<div class="tc"><a href="https://funpay.com/lots/offer?id=1" class="tc-item">
+<div class="tc-desc"><div class="tc-desc-text more-info">Описание</div></div></a></div>{}"""
+
+
+@pytest.mark.parametrize("control, truncated", [
+    ("", False),
+    ('<div class="moreover text-more"></div>', False),
+    ('<a class="btn btn-default offer-list-more" href="#">Показать еще</a>', True),
+    ('<button class="btn show-more">Show more</button>', True),
+])
+def test_offer_list_truncated(control, truncated):
+    section = BeautifulSoup(f"<div>{SECTION.format(control)}</div>", "lxml").find("div")
+    assert Account._Account__is_offer_list_truncated(section) is truncated